@@ -0,0 +1,140 @@
+"""
+This class answers many queries about the simulated delivery day at once, without the menu. Each query asks for one
+package at a time, or for a report of all packages or of the miles driven at a time. The queries are sorted by time
+and answered with one pass through the delivery timeline, and each answer is written out as a line of JSON as soon as
+it is ready.
+"""
+import json
+import SimulationTime
+
+
+class BatchQuery:
+    # Reports that can be asked for at a time.
+    reports = ('all', 'miles')
+
+    """
+    This is the initializer for a batch query, taking the Loading and Delivery instance whose simulated day answers
+    the queries.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, program):
+        self.program = program
+
+    """
+    This method parses one line of the query file into a query dictionary with the line number, the time and either
+    the package id or the report. A line is either JSON, such as {"package": 9, "time": "10:30:00"} or
+    {"time": "10:30:00", "report": "miles"}, or two comma separated values, a package id and a time such as
+    9,10:30:00 or a time and a report such as 10:30:00,all. Anything else raises a ValueError.
+    This has a Big O space and time complexity of O(1).
+    """
+    def parse_query(self, line_number, line):
+        line = line.strip()
+        if line.startswith('{'):
+            try:
+                fields = json.loads(line)
+            except json.JSONDecodeError as error:
+                raise ValueError(f'The query is not valid JSON: {error.msg}.') from None
+            if not isinstance(fields, dict) or 'time' not in fields:
+                raise ValueError('The query needs a time.')
+            if 'package' in fields:
+                first = fields['package']
+            elif 'report' in fields:
+                first = fields['report']
+            else:
+                raise ValueError('The query needs a package or a report.')
+            second = fields['time']
+        else:
+            cells = [cell.strip() for cell in line.split(',')]
+            if len(cells) != 2:
+                raise ValueError('The query needs a package id and a time, or a time and a report.')
+            first, second = cells
+            if ':' in first:
+                first, second = second, first
+        query = {'line': line_number, 'time': SimulationTime.parse_clock(str(second))}
+        if isinstance(first, str) and first.strip().lower() in self.reports:
+            query['report'] = first.strip().lower()
+        else:
+            try:
+                query['package'] = int(first)
+            except (TypeError, ValueError):
+                raise ValueError(f'{first!r} is not a package id or a report.') from None
+        return query
+
+    """
+    This method reads the queries from the supplied stream of lines, skipping blank lines and lines starting with #.
+    Every line is returned as either a query dictionary or an error dictionary with the line number and the problem.
+    This has a Big O time and space complexity of O(Q), with Q being the number of queries.
+    """
+    def read_queries(self, lines):
+        queries = []
+        errors = []
+        for line_number, line in enumerate(lines, 1):
+            if line.strip() == '' or line.lstrip().startswith('#'):
+                continue
+            try:
+                queries.append(self.parse_query(line_number, line))
+            except ValueError as error:
+                errors.append({'line': line_number, 'error': str(error)})
+        return queries, errors
+
+    """
+    This method returns a dictionary of the details of the supplied package at the time of the supplied timeline
+    cursor, without changing the package.
+    This has a Big O space and time complexity of O(1).
+    """
+    @staticmethod
+    def package_record(package, cursor):
+        address = cursor.package_address(package.id)
+        if address is None:
+            address = (package.address, package.city, package.state, package.zip)
+        return {'id': package.id, 'address': address[0], 'city': address[1], 'state': address[2], 'zip': address[3],
+                'weight': package.weight, 'deadline': package.delivery_deadline,
+                'status': cursor.package_status(package.id)}
+
+    """
+    This method answers the supplied queries in order of time, with queries for the same time kept in the order they
+    were read, and yields an answer dictionary for each one. Every answer has the line number of its query so it can
+    be matched up.
+    This has a Big O time complexity of O(Q log Q + E), with Q being the number of queries and E the number of events
+    in the timeline, plus O(N) for every report of all N packages.
+    This has a Big O space complexity of O(Q) for the sorted queries.
+    """
+    def answer(self, queries):
+        program = self.program
+        cursor = program.delivery_timeline.cursor()
+        for query in sorted(queries, key=lambda query: query['time']):
+            cursor.advance(query['time'])
+            answer = {'line': query['line'], 'time': SimulationTime.format_clock(query['time'])}
+            report = query.get('report')
+            if report is None:
+                package = program.package_hash_table.search(query['package'])
+                if package is None:
+                    answer['error'] = f'Package {query["package"]} was not found.'
+                else:
+                    answer['package'] = self.package_record(package, cursor)
+            elif report == 'all':
+                answer['packages'] = [self.package_record(package, cursor)
+                                      for package in program.package_hash_table.packages()]
+            else:
+                truck_miles = {truck.name: cursor.truck_miles(truck.name) for truck in program.trucks}
+                answer['truck_miles'] = truck_miles
+                answer['total_miles'] = sum(truck_miles.values())
+            yield answer
+
+    """
+    This method reads every query from the supplied lines and writes one line of JSON to the output for each, the
+    errors for the lines that could not be read first and then the answers in order of time. Returns the number of
+    queries answered and the number of errors.
+    This has a Big O time complexity of O(Q log Q + E), the same as answer.
+    This has a Big O space complexity of O(Q).
+    """
+    def run(self, lines, output):
+        queries, errors = self.read_queries(lines)
+        for error in errors:
+            output.write(json.dumps(error) + '\n')
+        answered = 0
+        for answer in self.answer(queries):
+            output.write(json.dumps(answer) + '\n')
+            answered += 1
+        output.flush()
+        return answered, len(errors)
@@ -0,0 +1,341 @@
+"""
+This is the benchmark harness for the loading, routing and simulation hot paths. It generates synthetic package
+manifests and distance files of any size, times each stage of the Loading and Delivery class on them, and saves the
+wall time, per call latency percentiles and peak memory of every stage to a JSON file so the results of two versions
+can be compared.
+
+Run with: python Benchmark.py [--cases 100:27,1000:100] [--full] [--output results.json] [--compare old.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import CandidateNeighbors
+import HashTable
+import LazyPackageSource
+import LoadPlanner
+import LoadingAndDelivery
+import PackageIngest
+import SimulationTime
+import Truck
+
+
+class SyntheticData:
+    # Deadlines given to the synthetic packages, with EOD being the most common.
+    deadlines = ['EOD'] * 16 + ['10:30 AM'] * 3 + ['9:00 AM']
+    # Special notes given to a few of the synthetic packages.
+    notes = [''] * 47 + ['Delayed on flight---will not arrive to depot until 9:05 am'] * 2 + \
+            ['Can only be on truck 2']
+
+    """
+    This is the initializer for the synthetic data, taking the number of packages and locations and the random seed, so
+    the same arguments always make the same files. The locations are random points in a 20 mile square, with the hub
+    being the first.
+    This has a Big O time and space complexity of O(L), with L being the number of locations.
+    """
+    def __init__(self, package_count, location_count, seed=2021):
+        self.package_count = package_count
+        self.location_count = location_count
+        self.random = random.Random(seed)
+        self.points = [(self.random.uniform(0, 20), self.random.uniform(0, 20)) for _ in range(location_count)]
+
+    """
+    This method returns the address and zip of the synthetic location with the supplied number.
+    This has a Big O space and time complexity of O(1).
+    """
+    @staticmethod
+    def address(location):
+        return f'{location} Synthetic Ave', f'{84000 + location % 1000:05d}'
+
+    """
+    This method writes a lower triangular distance file in the same layout as distances.csv, with the straight line
+    miles between the locations rounded to a tenth of a mile.
+    This has a Big O time complexity of O(L^2), with L being the number of locations.
+    This has a Big O space complexity of O(L) for one row at a time.
+    """
+    def write_distances(self, filename):
+        with open(filename, 'w') as distances:
+            distances.write('line to skip\n')
+            for row in range(self.location_count):
+                if row == 0:
+                    key = 'HUB'
+                else:
+                    address, zip_code = self.address(row)
+                    key = f'{address} ({zip_code})'
+                x, y = self.points[row]
+                cells = [f'{math.hypot(x - other_x, y - other_y):.1f}' for other_x, other_y in self.points[:row + 1]]
+                cells += [''] * (self.location_count - row - 1)
+                distances.write(key + ',' + ','.join(cells) + '\n')
+
+    """
+    This method writes a package manifest in the same layout as packages.csv, with every package going to a random
+    location other than the hub.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(1).
+    """
+    def write_packages(self, filename):
+        with open(filename, 'w') as packages:
+            packages.write('Package ID,Address,City,State,Zip,Delivery Deadline,Mass KILO,Special Notes\n')
+            for package_id in range(1, self.package_count + 1):
+                address, zip_code = self.address(self.random.randrange(1, self.location_count))
+                packages.write(f'{package_id},{address},Salt Lake City,UT,{zip_code},'
+                               f'{self.random.choice(self.deadlines)},{self.random.randint(1, 90)},'
+                               f'{self.random.choice(self.notes)}\n')
+
+
+class Benchmark:
+    """
+    This is the initializer for the benchmark, taking the number of per call samples to time for the stages that are
+    timed call by call and whether to measure peak memory, which runs every stage a second time under tracemalloc.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, samples=200, measure_memory=True):
+        self.samples = samples
+        self.measure_memory = measure_memory
+
+    """
+    This method returns the 50th, 90th and 99th percentile and the largest of the supplied call latencies in
+    milliseconds.
+    This has a Big O time complexity of O(N log N), with N being the number of latencies, for the sort.
+    This has a Big O space complexity of O(N).
+    """
+    @staticmethod
+    def percentiles(latencies):
+        if len(latencies) == 0:
+            return {}
+        ordered = sorted(latencies)
+        result = {}
+        for name, fraction in (('p50_ms', 0.5), ('p90_ms', 0.9), ('p99_ms', 0.99)):
+            result[name] = ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+        result['max_ms'] = ordered[-1] * 1000
+        return result
+
+    """
+    This method runs the supplied stage and returns its result dictionary of wall time, call latency percentiles and
+    peak memory. The stage is a function that returns a list of the seconds taken by each call it made. When memory is
+    measured the setup function is run again and the stage is repeated under tracemalloc for its peak.
+    This has a Big O time complexity of the stage being run.
+    This has a Big O space complexity of the stage being run.
+    """
+    def measure(self, setup, stage):
+        setup()
+        start = time.perf_counter()
+        latencies = stage()
+        result = {'wall_seconds': time.perf_counter() - start, 'calls': len(latencies)}
+        result.update(self.percentiles(latencies))
+        if self.measure_memory:
+            setup()
+            tracemalloc.start()
+            try:
+                stage()
+                result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return result
+
+    """
+    This method benchmarks one case of the supplied numbers of packages and locations, writing its synthetic files to
+    the supplied directory, and returns the results for every stage.
+    This has a Big O time complexity of O(L^2 + N^2), with L being the number of locations and N the number of
+    packages, for the distance file and the loading of the trucks.
+    This has a Big O space complexity of O(L^2 + N).
+    """
+    def run_case(self, package_count, location_count, directory):
+        data = SyntheticData(package_count, location_count)
+        package_filename = os.path.join(directory, f'packages_{package_count}.csv')
+        distance_filename = os.path.join(directory, f'distances_{location_count}.csv')
+        data.write_packages(package_filename)
+        data.write_distances(distance_filename)
+        capacity = max(16, package_count // 20)
+        truck_count = math.ceil(package_count / capacity) + 2
+        with contextlib.redirect_stdout(io.StringIO()):
+            program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename,
+                                                            truck_count=truck_count, truck_capacity=capacity)
+        rng = random.Random(7)
+        stages = {}
+
+        def no_setup():
+            pass
+
+        def timed(function):
+            def stage():
+                start = time.perf_counter()
+                function()
+                return [time.perf_counter() - start]
+            return stage
+
+        stages['load_distance_data'] = self.measure(no_setup, timed(lambda: program.load_distance_data(
+            distance_filename)))
+        program.load_distance_data(distance_filename, use_cache=True)
+        stages['load_distance_data_cached'] = self.measure(no_setup, timed(lambda: program.load_distance_data(
+            distance_filename, use_cache=True)))
+
+        def reset_packages():
+            program.package_hash_table = HashTable.DirectHashTable()
+            program.manifest_ingestor = PackageIngest.ManifestIngestor()
+        stages['load_package_data'] = self.measure(reset_packages, timed(lambda: program.load_package_data(
+            package_filename)))
+
+        packages = list(program.package_hash_table.packages())
+        package_ids = [package.id for package in packages]
+
+        sources = []
+        stages['index_lazy_packages'] = self.measure(sources.clear, timed(lambda: sources.append(
+            LazyPackageSource.LazyPackageSource(package_filename, program.distance_matrix.key_index))))
+
+        def lazy_search_calls():
+            latencies = []
+            for _ in range(self.samples):
+                package_id = rng.choice(package_ids)
+                start = time.perf_counter()
+                sources[-1].search(package_id)
+                latencies.append(time.perf_counter() - start)
+            return latencies
+        stages['lazy_package_search'] = self.measure(no_setup, lazy_search_calls)
+
+        def nearest_neighbor_calls():
+            latencies = []
+            for _ in range(self.samples):
+                candidates = rng.sample(package_ids, min(len(package_ids), 100))
+                start = time.perf_counter()
+                program.nearest_neighbor(rng.choice(packages), candidates, 'No code')
+                latencies.append(time.perf_counter() - start)
+            return latencies
+        stages['nearest_neighbor'] = self.measure(no_setup, nearest_neighbor_calls)
+
+        planner = LoadPlanner.LoadPlanner(program.distance_matrix, program.hub_location, program.day_start,
+                                          program.address_corrections)
+        plans = planner.plan(packages, truck_count, capacity)
+
+        def priority_load_calls():
+            latencies = []
+            for plan in plans:
+                levels = [list(level) for level in plan.priority_levels]
+                start = time.perf_counter()
+                program.priority_load_levels(levels, Truck.Truck(), plan.departure_time)
+                latencies.append(time.perf_counter() - start)
+            return latencies
+        stages['priority_load_with_nearest_neighbor'] = self.measure(no_setup, priority_load_calls)
+
+        candidates = []
+        stages['build_candidate_neighbors'] = self.measure(candidates.clear, timed(lambda: candidates.append(
+            CandidateNeighbors.CandidateNeighbors(program.distance_matrix))))
+
+        def candidate_load_calls():
+            program.candidate_neighbors = candidates[-1]
+            try:
+                return priority_load_calls()
+            finally:
+                program.candidate_neighbors = None
+        stages['priority_load_with_candidates'] = self.measure(no_setup, candidate_load_calls)
+
+        def reset_trucks():
+            for truck in program.trucks:
+                truck.reset_truck()
+        stages['load_trucks_set_departure'] = self.measure(reset_trucks, timed(program.load_trucks_set_departure))
+        stages['build_delivery_timeline'] = self.measure(no_setup, timed(program.build_delivery_timeline))
+
+        def simulation_queries():
+            latencies = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(self.samples):
+                    query_time = rng.randrange(SimulationTime.clock(8), SimulationTime.clock(18))
+                    start = time.perf_counter()
+                    program.run_delivery_simulation(query_time, 'search', rng.choice(package_ids))
+                    latencies.append(time.perf_counter() - start)
+            return latencies
+        stages['run_delivery_simulation'] = self.measure(no_setup, simulation_queries)
+
+        return {'packages': package_count, 'locations': location_count, 'trucks': truck_count, 'stages': stages}
+
+    """
+    This method runs every supplied case, each a (packages, locations) tuple, in a temporary directory and returns the
+    full results with the version and machine they were measured on.
+    This has a Big O time and space complexity of the largest case.
+    """
+    def run(self, cases, label=None):
+        results = {'label': label or self.version(), 'python': platform.python_version(),
+                   'machine': platform.machine(), 'cases': []}
+        with tempfile.TemporaryDirectory() as directory:
+            for package_count, location_count in cases:
+                results['cases'].append(self.run_case(package_count, location_count, directory))
+        return results
+
+    """
+    This method returns the git commit of the source being benchmarked, or unknown when it is not in a git checkout.
+    This has a Big O space and time complexity of O(1).
+    """
+    @staticmethod
+    def version():
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return 'unknown'
+
+    """
+    This method formats the supplied results as a text table, and when older results are supplied adds how many times
+    slower or faster each stage is than it was.
+    This has a Big O time and space complexity of O(C * S), with C being the number of cases and S the stages.
+    """
+    @staticmethod
+    def format_results(results, baseline=None):
+        previous = {}
+        if baseline is not None:
+            for case in baseline['cases']:
+                previous[(case['packages'], case['locations'])] = case['stages']
+        lines = []
+        for case in results['cases']:
+            lines.append(f'{case["packages"]} packages, {case["locations"]} locations, {case["trucks"]} trucks')
+            old_stages = previous.get((case['packages'], case['locations']), {})
+            for name, stage in case['stages'].items():
+                line = f'  {name:<38} {stage["wall_seconds"]:>10.4f} s'
+                if 'p50_ms' in stage and stage['calls'] > 1:
+                    line += f'  p50 {stage["p50_ms"]:.3f} ms  p99 {stage["p99_ms"]:.3f} ms'
+                if 'peak_bytes' in stage:
+                    line += f'  peak {stage["peak_bytes"] / 1048576:.1f} MiB'
+                if name in old_stages and old_stages[name]['wall_seconds'] > 0:
+                    line += f'  x{stage["wall_seconds"] / old_stages[name]["wall_seconds"]:.2f}'
+                lines.append(line)
+        return '\n'.join(lines)
+
+
+# Cases run by default, and the full range of cases run with --full.
+default_cases = [(100, 27), (1000, 100), (5000, 500)]
+full_cases = [(100, 27), (1000, 100), (10000, 1000), (100000, 10000)]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the loading, routing and simulation hot paths.')
+    parser.add_argument('--cases', help='comma separated packages:locations cases, such as 100:27,1000:100')
+    parser.add_argument('--full', action='store_true', help='run the full range from 100 to 100,000 packages')
+    parser.add_argument('--samples', type=int, default=200, help='calls timed for the per call stages')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak memory pass')
+    parser.add_argument('--label', help='name saved with the results, the git commit by default')
+    parser.add_argument('--output', help='JSON file to save the results to')
+    parser.add_argument('--compare', help='JSON file of earlier results to compare against')
+    arguments = parser.parse_args()
+
+    if arguments.cases:
+        cases = [tuple(int(number) for number in case.split(':')) for case in arguments.cases.split(',')]
+    elif arguments.full:
+        cases = full_cases
+    else:
+        cases = default_cases
+    benchmark = Benchmark(arguments.samples, not arguments.no_memory)
+    benchmark_results = benchmark.run(cases, arguments.label)
+    baseline_results = None
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            baseline_results = json.load(baseline_file)
+    print(Benchmark.format_results(benchmark_results, baseline_results))
+    if arguments.output:
+        with open(arguments.output, 'w') as output_file:
+            json.dump(benchmark_results, output_file, indent=2)
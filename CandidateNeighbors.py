@@ -0,0 +1,153 @@
+"""
+This class holds the k nearest neighbors of every location in the distance matrix, built once when it is created. Route
+construction and route improvement then only look at the few locations close to a stop instead of every remaining
+stop, which keeps them near linear for large location sets. The neighbors are kept closest first in one flat array
+of location ids, k for each location. NumPy is used to build them when it is installed and the matrix is in memory.
+"""
+import array
+import heapq
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class CandidateNeighbors:
+    # Rows of the distance matrix handled at once when the neighbors are built with NumPy.
+    block_rows = 512
+
+    """
+    This is the initializer for the candidate neighbors, taking the distance matrix, the number of neighbors to keep
+    for each location, which is capped at the number of other locations, and the location ids to find the neighbors
+    among, or None for every location in the matrix.
+    This has a Big O time complexity of O(L^2), with L being the number of locations, to read the distance between
+    every pair of locations once.
+    This has a Big O space complexity of O(L * K), with K being the number of neighbors.
+    """
+    def __init__(self, distance_matrix, neighbor_count=8, locations=None):
+        if neighbor_count < 1:
+            raise ValueError('At least one neighbor is needed for each location.')
+        self.distance_matrix = distance_matrix
+        if locations is None:
+            self.locations = list(range(distance_matrix.size))
+            self.row_of = None
+        else:
+            self.locations = sorted(set(locations))
+            self.row_of = {location: row for row, location in enumerate(self.locations)}
+        self.neighbor_count = min(neighbor_count, max(len(self.locations) - 1, 0))
+        self.neighbor_ids = array.array('i')
+        if numpy is not None and distance_matrix.distances is not None:
+            self.build_vectorized()
+        else:
+            self.build()
+
+    """
+    This method returns candidate neighbors found among only the supplied location ids, such as the stops of one
+    route, keeping the same number of neighbors.
+    This has a Big O time complexity of O(R^2), with R being the number of supplied locations.
+    This has a Big O space complexity of O(R * K), with K being the number of neighbors.
+    """
+    def among(self, locations):
+        return CandidateNeighbors(self.distance_matrix, max(self.neighbor_count, 1), locations)
+
+    """
+    This method builds the neighbors of every location with a heap over its distances to the other locations. Ties
+    go to the lower location id.
+    This has a Big O time complexity of O(L^2 log K), with L being the number of locations and K the number of
+    neighbors.
+    This has a Big O space complexity of O(L) for one row at a time.
+    """
+    def build(self):
+        distance = self.distance_matrix.distance
+        for location in self.locations:
+            closest = heapq.nsmallest(self.neighbor_count + 1, self.locations,
+                                      key=lambda other: (distance(location, other), other))
+            self.neighbor_ids.extend([other for other in closest if other != location][:self.neighbor_count])
+
+    """
+    This method builds the neighbors of every location with NumPy, a block of rows at a time, by partitioning each row
+    around its k-th closest distance and sorting only the locations up to it. Ties go to the lower location id, the
+    same as build.
+    This has a Big O time complexity of O(L^2), with L being the number of locations, in vectorized passes.
+    This has a Big O space complexity of O(B * L), with B being the block rows.
+    """
+    def build_vectorized(self):
+        size = self.distance_matrix.size
+        count = self.neighbor_count
+        if count == 0:
+            return
+        matrix = numpy.frombuffer(self.distance_matrix.distances, dtype=numpy.float64).reshape(size, size)
+        locations = numpy.asarray(self.locations, dtype=numpy.intp)
+        for first in range(0, len(locations), self.block_rows):
+            if self.row_of is None:
+                block = numpy.array(matrix[first:first + self.block_rows])
+            else:
+                block = matrix[locations[first:first + self.block_rows]][:, locations]
+            rows = numpy.arange(len(block))
+            block[rows, rows + first] = numpy.inf
+            kth = numpy.partition(block, count - 1, axis=1)[:, count - 1]
+            for row, limit in zip(block, kth):
+                closest = numpy.flatnonzero(row <= limit)
+                closest = closest[numpy.argsort(row[closest], kind='stable')][:count]
+                self.neighbor_ids.extend(locations[closest].tolist())
+
+    """
+    This method returns the neighbors of the supplied location id, closest first, or nothing for a location the
+    neighbors were not found for.
+    This has a Big O time and space complexity of O(K), with K being the number of neighbors.
+    """
+    def neighbors(self, location):
+        row = location if self.row_of is None else self.row_of.get(location)
+        if row is None:
+            return ()
+        start = row * self.neighbor_count
+        return self.neighbor_ids[start:start + self.neighbor_count]
+
+    """
+    This method orders the candidate locations by nearest neighbor, starting from the start location and always
+    moving to the closest remaining candidate, and returns the positions of the candidates in the order they are
+    visited. Candidates at the same location are visited together, in the order they were supplied. The next stop is
+    the first remaining location in the neighbors of the current one, and only when none of them remain are all of
+    the remaining locations searched.
+    This has a Big O time complexity of O(N * K), with N being the number of candidates and K the number of neighbors,
+    when the next stop is usually among the neighbors, and O(N^2) at worst.
+    This has a Big O space complexity of O(N).
+    """
+    def nearest_neighbor_order(self, start_location, candidate_locations):
+        distance = self.distance_matrix.distance
+        positions_at = {}
+        for position, location in enumerate(candidate_locations):
+            positions_at.setdefault(location, []).append(position)
+        remaining = set(positions_at)
+        order = []
+        current_location = start_location
+        while len(remaining) > 0:
+            next_location = None
+            if current_location in remaining:
+                next_location = current_location
+            else:
+                for location in self.neighbors(current_location):
+                    if location in remaining:
+                        next_location = location
+                        break
+            if next_location is None:
+                next_location = min(remaining, key=lambda location: (distance(current_location, location), location))
+            remaining.discard(next_location)
+            order.extend(positions_at[next_location])
+            current_location = next_location
+        return order
+
+    """
+    This method returns the positions from the supplied dictionary of location id to route positions that are at the
+    supplied location or one of its neighbors, and are at least the low position and below the high position, in
+    order.
+    This has a Big O time complexity of O(K log K), with K being the number of neighbors, when each location is
+    visited once.
+    This has a Big O space complexity of O(K).
+    """
+    def positions_near(self, positions_at, location, low, high):
+        positions = [position for position in positions_at.get(location, ()) if low <= position < high]
+        for neighbor in self.neighbors(location):
+            positions.extend([position for position in positions_at.get(neighbor, ()) if low <= position < high])
+        positions.sort()
+        return positions
@@ -0,0 +1,269 @@
+"""
+This class holds the timeline of events for a simulated delivery day: truck departures, package deliveries, truck
+returns and address changes. The day is simulated once into the timeline, and then the state of any package or truck
+at a requested time is found with a binary search instead of re-running the simulation.
+"""
+import bisect
+import copy
+
+
+class DeliveryEvent:
+    """
+    This is the initializer for a delivery event, saving the time it happened, what kind of event it is, the truck
+    and package it belongs to, the total miles the truck had driven after it and the package status it results in.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, time, kind, truck, package_id=None, miles=0.0, status=None):
+        self.time = time
+        self.kind = kind
+        self.truck = truck
+        self.package_id = package_id
+        self.miles = miles
+        self.status = status
+
+
+class DeliveryTimeline:
+    """
+    This is the initializer for the delivery timeline, starting with no events.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self):
+        self.events = []
+        self.event_times = []
+        self.initial_status = {}
+        self.package_times = {}
+        self.package_statuses = {}
+        self.truck_times = {}
+        self.truck_miles_driven = {}
+        self.address_times = {}
+        self.addresses = {}
+        self.address_change_times = []
+        self.address_change_ids = []
+        self.delivered_at = {}
+        self.loaded_at = {}
+
+    """
+    This method saves the status a package has at the start of the day, before any event has happened to it.
+    This has a Big O space and time complexity of O(1).
+    """
+    def set_initial_status(self, package_id, status):
+        self.initial_status[package_id] = status
+
+    """
+    This method adds an event to the timeline. Events can be added in any order, they are sorted when the timeline is
+    finalized.
+    This has a Big O space and time complexity of O(1).
+    """
+    def add_event(self, time, kind, truck, package_id=None, miles=0.0, status=None):
+        self.events.append(DeliveryEvent(time, kind, truck, package_id, miles, status))
+
+    """
+    This method adds an address change for a package. The listed address is the one the package has before the
+    change is received, and the new address is the one it has from the time of the change onward. Each address is a
+    tuple of the address, city, state and zip.
+    This has a Big O space and time complexity of O(1).
+    """
+    def add_address_change(self, time, package_id, listed_address, new_address):
+        self.events.append(DeliveryEvent(time, 'address change', None, package_id))
+        self.address_times.setdefault(package_id, []).append(time)
+        self.addresses.setdefault(package_id, [listed_address]).append(new_address)
+
+    """
+    This method sorts the events by time and builds the per package and per truck lists that the time queries
+    binary search.
+    This has a Big O time complexity of O(N log N), with N being the number of events, for the sort.
+    This has a Big O space complexity of O(N) for the lists of event times.
+    """
+    def finalize(self):
+        self.events.sort(key=lambda event: event.time)
+        self.event_times = [event.time for event in self.events]
+        self.package_times = {}
+        self.package_statuses = {}
+        self.truck_times = {}
+        self.truck_miles_driven = {}
+        self.address_change_times = []
+        self.address_change_ids = []
+        self.delivered_at = {}
+        self.loaded_at = {}
+        for event in self.events:
+            if event.kind == 'delivery':
+                self.delivered_at[event.package_id] = event.time
+            if event.kind == 'loaded':
+                self.loaded_at[event.package_id] = event.time
+            if event.kind == 'address change':
+                self.address_change_times.append(event.time)
+                self.address_change_ids.append(event.package_id)
+            if event.status is not None:
+                self.package_times.setdefault(event.package_id, []).append(event.time)
+                self.package_statuses.setdefault(event.package_id, []).append(event.status)
+            if event.kind == 'delivery' or event.kind == 'return':
+                self.truck_times.setdefault(event.truck, []).append(event.time)
+                self.truck_miles_driven.setdefault(event.truck, []).append(event.miles)
+
+    """
+    This method returns the status of the supplied package at the supplied time, only counting events that happened
+    before that time.
+    This has a Big O time complexity of O(log N), with N being the number of events for the package.
+    This has a Big O space complexity of O(1).
+    """
+    def package_status(self, package_id, time):
+        times = self.package_times.get(package_id)
+        if times is None:
+            return self.initial_status.get(package_id)
+        position = bisect.bisect_left(times, time)
+        if position == 0:
+            return self.initial_status.get(package_id)
+        return self.package_statuses[package_id][position - 1]
+
+    """
+    This method returns the time the supplied package is delivered, or None if it is never delivered.
+    This has a Big O space and time complexity of O(1).
+    """
+    def delivery_time(self, package_id):
+        return self.delivered_at.get(package_id)
+
+    """
+    This method returns the time the trip carrying the supplied package leaves the hub, or None if it is never loaded.
+    This has a Big O space and time complexity of O(1).
+    """
+    def loaded_time(self, package_id):
+        return self.loaded_at.get(package_id)
+
+    """
+    This method returns the address tuple the supplied package has at the supplied time, or None when its address
+    never changes. An address change counts from the time it is received.
+    This has a Big O time complexity of O(log N), with N being the number of address changes for the package.
+    This has a Big O space complexity of O(1).
+    """
+    def package_address(self, package_id, time):
+        times = self.address_times.get(package_id)
+        if times is None:
+            return None
+        return self.addresses[package_id][bisect.bisect_right(times, time)]
+
+    """
+    This method returns the miles the supplied truck has driven by the supplied time, counting the deliveries and the
+    return to the hub that happened before that time.
+    This has a Big O time complexity of O(log N), with N being the number of events for the truck.
+    This has a Big O space complexity of O(1).
+    """
+    def truck_miles(self, truck, time):
+        times = self.truck_times.get(truck)
+        if times is None:
+            return 0.0
+        position = bisect.bisect_left(times, time)
+        if position == 0:
+            return 0.0
+        return self.truck_miles_driven[truck][position - 1]
+
+    """
+    This method returns the ids of the packages whose address changes have been received by the supplied time, in the
+    order they were received.
+    This has a Big O time complexity of O(log N + C), with N being the number of address changes and C the number
+    received by the time.
+    This has a Big O space complexity of O(C).
+    """
+    def address_changes_received(self, time):
+        return self.address_change_ids[:bisect.bisect_right(self.address_change_times, time)]
+
+    """
+    This method returns a copy of the supplied package with the delivery status and address it has at the supplied
+    time, leaving the package itself as it is.
+    This has a Big O time complexity of O(log N), with N being the number of events for the package.
+    This has a Big O space complexity of O(1).
+    """
+    def package_at(self, package, time):
+        package = copy.copy(package)
+        package.set_delivery_status(self.package_status(package.id, time))
+        address = self.package_address(package.id, time)
+        if address is not None:
+            package.change_delivery_address(*address)
+        return package
+
+    """
+    This method returns a cursor over the timeline, which answers queries for many times in increasing order with one
+    pass over the events instead of a binary search for every query.
+    This has a Big O space and time complexity of O(1).
+    """
+    def cursor(self):
+        return TimelineCursor(self)
+
+
+class TimelineCursor:
+    """
+    This is the initializer for a timeline cursor, starting before the first event of the supplied finalized timeline.
+    The cursor keeps the current status of every package that has had an event, the miles of every truck and the
+    address of every package with an address change, and moves forward through the events as it is advanced.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, timeline):
+        self.timeline = timeline
+        self.time = None
+        self.position = 0
+        self.address_position = 0
+        self.statuses = {}
+        self.miles = {}
+        self.address_indexes = {}
+        self.address_changes = [event for event in timeline.events if event.kind == 'address change']
+
+    """
+    This method moves the cursor forward to the supplied time, applying the events before that time and the address
+    changes received by that time, the same as the timeline queries. The times must not go backwards.
+    This has a Big O time complexity of O(K), with K being the number of events passed, so advancing through the whole
+    day is O(N) for the N events.
+    This has a Big O space complexity of O(P + T), with P being the number of packages and T the number of trucks.
+    """
+    def advance(self, time):
+        if self.time is not None and time < self.time:
+            raise ValueError('The timeline cursor can only move forward in time.')
+        self.time = time
+        events = self.timeline.events
+        while self.position < len(events) and events[self.position].time < time:
+            event = events[self.position]
+            if event.status is not None:
+                self.statuses[event.package_id] = event.status
+            if event.kind == 'delivery' or event.kind == 'return':
+                self.miles[event.truck] = event.miles
+            self.position += 1
+        changes = self.address_changes
+        while self.address_position < len(changes) and changes[self.address_position].time <= time:
+            package_id = changes[self.address_position].package_id
+            self.address_indexes[package_id] = self.address_indexes.get(package_id, 0) + 1
+            self.address_position += 1
+
+    """
+    This method returns the status of the supplied package at the time of the cursor.
+    This has a Big O space and time complexity of O(1).
+    """
+    def package_status(self, package_id):
+        status = self.statuses.get(package_id)
+        if status is None:
+            return self.timeline.initial_status.get(package_id)
+        return status
+
+    """
+    This method returns the address tuple of the supplied package at the time of the cursor, or None when its address
+    never changes.
+    This has a Big O space and time complexity of O(1).
+    """
+    def package_address(self, package_id):
+        addresses = self.timeline.addresses.get(package_id)
+        if addresses is None:
+            return None
+        return addresses[self.address_indexes.get(package_id, 0)]
+
+    """
+    This method returns the miles the supplied truck has driven by the time of the cursor.
+    This has a Big O space and time complexity of O(1).
+    """
+    def truck_miles(self, truck):
+        return self.miles.get(truck, 0.0)
+
+    """
+    This method returns the ids of the packages whose address changes have been received by the time of the cursor,
+    in the order they were received.
+    This has a Big O time complexity of O(C), with C being the number of address changes received.
+    This has a Big O space complexity of O(C).
+    """
+    def address_changes_received(self):
+        return [event.package_id for event in self.address_changes[:self.address_position]]
@@ -0,0 +1,295 @@
+"""
+This class holds the distances between every delivery location as a dense, symmetric matrix of floats. Each location
+key from the distance file is given an integer location id when the file is loaded, so looking up a distance is a
+single index into a flat array instead of a search through the key list. For matrices too large to hold in memory,
+the disk distance matrix reads the distances from the binary cache file as they are needed.
+"""
+import array
+import csv
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+
+class DistanceMatrix:
+    # Binary cache layout: magic, version, location count, byte length of the key index and SHA-256 of the source file.
+    cache_magic = b'WGUPSDM\0'
+    cache_version = 1
+    cache_header = struct.Struct('<8sIQQ32s')
+
+    """
+    This is the initializer for the distance matrix, taking the list of location keys and a flat buffer of
+    size * size floats in row major order. The buffer can be an array or any memoryview of doubles.
+    This has a Big O time complexity of O(N), with N being the number of locations, to build the key index.
+    This has a Big O space complexity of O(N^2) for the distances held in the buffer.
+    """
+    def __init__(self, keys, distances):
+        self.keys = list(keys)
+        self.size = len(self.keys)
+        self.distances = distances
+        self.key_index = {}
+        for location_id in range(self.size):
+            self.key_index[self.keys[location_id]] = location_id
+
+    """
+    This method loads a lower triangular distance file, where the first column of each row is the location key and
+    the remaining cells hold the distances to the locations before it, into a symmetric matrix. The first line of the
+    file is skipped.
+    This has a Big O time complexity of O(N^2), because every cell of the N rows and N columns is read once.
+    This has a Big O space complexity of O(N^2) for the matrix.
+    """
+    @classmethod
+    def from_csv(cls, filename):
+        keys = []
+        rows = []
+        with open(filename) as distances:
+            distance_data = csv.reader(distances, delimiter=',')
+            next(distance_data)
+            for distance in distance_data:
+                keys.append(distance[0])
+                rows.append(distance[1:len(keys) + 1])
+
+        size = len(keys)
+        matrix = array.array('d', bytes(8 * size * size))
+        for row in range(size):
+            row_offset = row * size
+            for column in range(row + 1):
+                cell = rows[row][column]
+                if cell == '':
+                    continue
+                miles = float(cell)
+                matrix[row_offset + column] = miles
+                matrix[column * size + row] = miles
+        return cls(keys, matrix)
+
+    """
+    This method returns the SHA-256 digest of the supplied file, read in blocks so the file is never held in memory.
+    This has a Big O time complexity of O(B), with B being the size of the file in bytes.
+    This has a Big O space complexity of O(1).
+    """
+    @staticmethod
+    def file_digest(filename):
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as source:
+            for block in iter(lambda: source.read(1 << 20), b''):
+                digest.update(block)
+        return digest.digest()
+
+    """
+    This method writes the matrix to a binary cache file made from the supplied source digest: a fixed header, the
+    location keys separated by new lines, padding to the next multiple of 8 bytes, then the size * size distances as
+    little endian doubles. The file is written next to the cache and renamed over it, so a reader never sees a half
+    written cache.
+    This has a Big O time complexity of O(N^2), with N being the number of locations.
+    This has a Big O space complexity of O(N) for the key index, the distances are written from the buffer in place
+    on a little endian machine, and from a byte swapped copy of O(N^2) on a big endian one.
+    """
+    def write_cache(self, cache_filename, source_digest):
+        key_index = '\n'.join(self.keys).encode()
+        header = self.cache_header.pack(self.cache_magic, self.cache_version, self.size, len(key_index), source_digest)
+        padding = -(len(header) + len(key_index)) % 8
+        temporary_filename = cache_filename + '.tmp'
+        with open(temporary_filename, 'wb') as cache:
+            cache.write(header)
+            cache.write(key_index)
+            cache.write(bytes(padding))
+            if sys.byteorder == 'little':
+                cache.write(memoryview(self.distances).cast('B'))
+            else:
+                distances = array.array('d', self.distances)
+                distances.byteswap()
+                cache.write(distances.tobytes())
+        os.replace(temporary_filename, cache_filename)
+
+    """
+    This method maps a binary cache file written by write_cache and returns the matrix it holds, with the distances
+    read in place from the mapped file rather than copied. On a big endian machine the little endian distances cannot
+    be read in place, so they are copied out and byte swapped. None is returned when the file is missing, is not a
+    cache of this version, is cut short, or was made from a source file with a different digest.
+    This has a Big O time complexity of O(N), with N being the number of locations, for the key index. The distances
+    are only paged in from the disk as they are used, or O(N^2) to copy them on a big endian machine.
+    This has a Big O space complexity of O(N) in memory, the N^2 distances stay in the mapped file.
+    """
+    @classmethod
+    def from_cache(cls, cache_filename, source_digest):
+        try:
+            with open(cache_filename, 'rb') as cache:
+                mapped = mmap.mmap(cache.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        layout = cls.cache_layout(mapped[:cls.cache_header.size], len(mapped), source_digest)
+        if layout is None:
+            mapped.close()
+            return None
+        size, key_start, key_length, data_start = layout
+        keys = mapped[key_start:key_start + key_length].decode().split('\n') if size > 0 else []
+        if sys.byteorder == 'little':
+            distances = memoryview(mapped)[data_start:data_start + 8 * size * size].cast('d')
+        else:
+            distances = array.array('d')
+            distances.frombytes(mapped[data_start:data_start + 8 * size * size])
+            distances.byteswap()
+            mapped.close()
+        return cls(keys, distances)
+
+    """
+    This method checks the supplied header bytes of a binary cache file of the supplied length against the source
+    digest, and returns the location count, where the key index starts, its length and where the distances start, or
+    None when the file is not a complete cache of this version made from the same source.
+    This has a Big O space and time complexity of O(1).
+    """
+    @classmethod
+    def cache_layout(cls, header, file_length, source_digest):
+        if len(header) < cls.cache_header.size:
+            return None
+        magic, version, size, key_length, digest = cls.cache_header.unpack_from(header, 0)
+        key_start = cls.cache_header.size
+        data_start = key_start + key_length + -(key_start + key_length) % 8
+        if magic != cls.cache_magic or version != cls.cache_version or digest != source_digest or \
+                file_length != data_start + 8 * size * size:
+            return None
+        return size, key_start, key_length, data_start
+
+    """
+    This method loads the distance file through the binary cache. When the cache was made from the same distance file
+    it is mapped in place, otherwise the distance file is parsed and a new cache is written for the next start. The
+    cache defaults to the distance file name with .cache added. When mapped is False the cache is opened as a disk
+    distance matrix instead, and the distance file is only parsed to write the cache when there is none. When the
+    cache cannot be written the parsed matrix is returned and used from memory.
+    This has a Big O time complexity of O(B) to check the digest of the B bytes of the distance file when the cache is
+    used, or O(N^2) to parse and write it when it is not.
+    This has a Big O space complexity of O(N) when the cache is used, or O(N^2) when the file is parsed.
+    """
+    @classmethod
+    def load(cls, filename, cache_filename=None, mapped=True):
+        if cache_filename is None:
+            cache_filename = filename + '.cache'
+        source_digest = cls.file_digest(filename)
+        if not mapped:
+            distance_matrix = DiskDistanceMatrix.open(cache_filename, source_digest)
+            if distance_matrix is None:
+                parsed_matrix = cls.from_csv(filename)
+                try:
+                    parsed_matrix.write_cache(cache_filename, source_digest)
+                except OSError:
+                    return parsed_matrix
+                distance_matrix = DiskDistanceMatrix.open(cache_filename, source_digest)
+                if distance_matrix is None:
+                    return parsed_matrix
+            return distance_matrix
+        distance_matrix = cls.from_cache(cache_filename, source_digest)
+        if distance_matrix is None:
+            distance_matrix = cls.from_csv(filename)
+            try:
+                distance_matrix.write_cache(cache_filename, source_digest)
+            except OSError:
+                pass
+        return distance_matrix
+
+    """
+    This method returns the integer location id for the supplied location key.
+    This has a Big O space and time complexity of O(1), because it is a single dictionary lookup.
+    """
+    def location_id(self, key):
+        return self.key_index[key]
+
+    """
+    This method returns the miles between the two supplied location ids.
+    This has a Big O space and time complexity of O(1), because it is a single index into the flat matrix.
+    """
+    def distance(self, location_1, location_2):
+        return self.distances[location_1 * self.size + location_2]
+
+    """
+    This method returns the row of distances from the supplied location id to every other location.
+    This has a Big O time and space complexity of O(N), for the N locations in the row.
+    """
+    def row(self, location_id):
+        start = location_id * self.size
+        return self.distances[start:start + self.size]
+
+    """
+    This method returns a new distance matrix holding only the supplied location keys, in the order supplied, with
+    the distances between them copied out of this matrix.
+    This has a Big O time and space complexity of O(K^2), with K being the number of supplied keys.
+    """
+    def submatrix(self, keys):
+        location_ids = [self.location_id(key) for key in keys]
+        matrix = array.array('d')
+        for location_id in location_ids:
+            row = self.row(location_id)
+            matrix.extend([row[other_id] for other_id in location_ids])
+        return DistanceMatrix(keys, matrix)
+
+    """
+    This method releases the file the distances are read from. A matrix held in memory or in a mapped cache has none
+    to release, so this does nothing, and the disk distance matrix closes its cache file.
+    This has a Big O space and time complexity of O(1).
+    """
+    def close(self):
+        pass
+
+
+class DiskDistanceMatrix(DistanceMatrix):
+    """
+    This is the initializer for the disk distance matrix, taking the location keys, the open binary cache file and
+    where its distances start. No distances are held in memory, each lookup reads them from the file, so the matrix
+    is used through a distance resolver that keeps the rows in use.
+    This has a Big O time complexity of O(N), with N being the number of locations, to build the key index.
+    This has a Big O space complexity of O(N) for the keys.
+    """
+    def __init__(self, keys, cache_file, data_start):
+        super().__init__(keys, None)
+        self.cache_file = cache_file
+        self.data_start = data_start
+
+    """
+    This method opens a binary cache file written by write_cache and returns a disk distance matrix that reads from
+    it, or None when the file is missing or is not a cache of this version made from the source file with the
+    supplied digest.
+    This has a Big O time complexity of O(N), with N being the number of locations, for the key index.
+    This has a Big O space complexity of O(N).
+    """
+    @classmethod
+    def open(cls, cache_filename, source_digest):
+        try:
+            cache_file = open(cache_filename, 'rb')
+        except OSError:
+            return None
+        file_length = os.fstat(cache_file.fileno()).st_size
+        layout = cls.cache_layout(cache_file.read(cls.cache_header.size), file_length, source_digest)
+        if layout is None:
+            cache_file.close()
+            return None
+        size, key_start, key_length, data_start = layout
+        keys = os.pread(cache_file.fileno(), key_length, key_start).decode().split('\n') if size > 0 else []
+        return cls(keys, cache_file, data_start)
+
+    """
+    This method returns the miles between the two supplied location ids, read from the file as a little endian double.
+    This has a Big O space and time complexity of O(1), with one read of the file.
+    """
+    def distance(self, location_1, location_2):
+        offset = self.data_start + 8 * (location_1 * self.size + location_2)
+        return struct.unpack('<d', os.pread(self.cache_file.fileno(), 8, offset))[0]
+
+    """
+    This method returns the row of distances from the supplied location id to every other location, read from the
+    file in one read and byte swapped on a big endian machine.
+    This has a Big O time and space complexity of O(N), for the N locations in the row.
+    """
+    def row(self, location_id):
+        row = array.array('d')
+        row.frombytes(os.pread(self.cache_file.fileno(), 8 * self.size, self.data_start + 8 * self.size * location_id))
+        if sys.byteorder != 'little':
+            row.byteswap()
+        return row
+
+    """
+    This method closes the cache file.
+    This has a Big O space and time complexity of O(1).
+    """
+    def close(self):
+        self.cache_file.close()
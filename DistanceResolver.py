@@ -0,0 +1,98 @@
+"""
+This class resolves distances through a bounded least recently used cache of matrix rows, for distance matrices too
+large to hold in memory as floats, such as a disk distance matrix. Routing looks up many distances from the same stop
+in a row, so the row of the current stop is read once and kept while it is in use, and the least recently used row
+is dropped when the cache is full. The distance matrix is symmetric, so a lookup is also answered from the row of the
+other location when only that row is cached. The hits, misses and evictions of the cache are counted.
+"""
+import array
+import collections
+import DistanceMatrix
+
+
+class DistanceResolver(DistanceMatrix.DistanceMatrix):
+    """
+    This is the initializer for the distance resolver, taking the distance matrix to read rows from and the most rows
+    to keep. The keys and key index are shared with the matrix, not copied.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, distance_matrix, cache_rows=256):
+        if cache_rows < 1:
+            raise ValueError('The distance cache needs room for at least one row.')
+        self.keys = distance_matrix.keys
+        self.size = distance_matrix.size
+        self.distances = None
+        self.key_index = distance_matrix.key_index
+        self.source = distance_matrix
+        self.cache_rows = cache_rows
+        self.rows = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    """
+    This method returns the miles between the two supplied location ids from the cached row of either location,
+    reading the row of the first location when neither is cached.
+    This has a Big O time complexity of O(1) for a hit and O(L) for a miss, with L being the number of locations.
+    This has a Big O space complexity of O(1), the cache holds at most the cache rows of L distances.
+    """
+    def distance(self, location_1, location_2):
+        rows = self.rows
+        row = rows.get(location_1)
+        if row is not None:
+            self.hits += 1
+            rows.move_to_end(location_1)
+            return row[location_2]
+        row = rows.get(location_2)
+        if row is not None:
+            self.hits += 1
+            rows.move_to_end(location_2)
+            return row[location_1]
+        return self.read_row(location_1)[location_2]
+
+    """
+    This method returns the row of distances from the supplied location id to every other location, through the
+    cache.
+    This has a Big O time complexity of O(1) for a hit and O(L) for a miss, with L being the number of locations.
+    This has a Big O space complexity of O(1).
+    """
+    def row(self, location_id):
+        row = self.rows.get(location_id)
+        if row is None:
+            return self.read_row(location_id)
+        self.hits += 1
+        self.rows.move_to_end(location_id)
+        return row
+
+    """
+    This method reads the row of the supplied location id from the matrix into the cache, dropping the least recently
+    used row when the cache is full.
+    This has a Big O time and space complexity of O(L), with L being the number of locations.
+    """
+    def read_row(self, location_id):
+        self.misses += 1
+        row = array.array('d', self.source.row(location_id))
+        self.rows[location_id] = row
+        if len(self.rows) > self.cache_rows:
+            self.rows.popitem(last=False)
+            self.evictions += 1
+        return row
+
+    """
+    This method returns the statistics of the cache: the hits, misses, evictions, the fraction of lookups that were
+    hits, the rows cached and the most rows it can hold.
+    This has a Big O space and time complexity of O(1).
+    """
+    def statistics(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0.0, 'cached_rows': len(self.rows),
+                'cache_rows': self.cache_rows}
+
+    """
+    This method drops the cached rows and closes the matrix the rows are read from.
+    This has a Big O space and time complexity of O(1).
+    """
+    def close(self):
+        self.rows.clear()
+        self.source.close()
@@ -0,0 +1,169 @@
+"""
+This class finds the shortest order to visit a small set of stops with the Held-Karp dynamic program over bitmasks of
+the stops visited, in place of the nearest neighbor order. Packages going to the same location are merged into one
+stop first, so a truck load of many packages is often only a few stops. Sets with more stops than the stop limit are
+left to the nearest neighbor heuristic, and the order found for each set of stops is kept, so planning the same loads
+again does not solve them again. The dynamic program is run one layer of subsets at a time with NumPy when it is
+installed, and with pure Python loops when it is not, and both give the same order.
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ExactRouting:
+    # Most stops the stop limit can be set to, the table of the dynamic program grows as 2^S * S for S stops.
+    largest_stop_limit = 18
+    # Most subsets of stops solved in one NumPy step, to bound the memory of each step.
+    block_size = 4096
+
+    """
+    This is the initializer for the exact routing, taking the distance matrix and the most stops a set can have to be
+    solved exactly.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, distance_matrix, stop_limit=12):
+        if stop_limit < 0 or stop_limit > self.largest_stop_limit:
+            raise ValueError(f'The exact routing stop limit must be from 0 to {self.largest_stop_limit}.')
+        self.distance_matrix = distance_matrix
+        self.stop_limit = stop_limit
+        # Order of the stops found for each (start, end, stops) key, with the stops sorted.
+        self.orders = {}
+        self.hits = 0
+        self.misses = 0
+
+    """
+    This method orders the candidate locations by the shortest route from the start location through every one of
+    them, ending at the end location, or anywhere when the end location is None. It returns the positions of the
+    candidates in the order they are visited, with the candidates at the same location visited together in the order
+    supplied, or None when they are at more locations than the stop limit and the heuristic is to be used instead.
+    This has a Big O time complexity of O(2^S * S^2), with S being the number of distinct locations, or O(N) when the
+    order of the same stops was already found.
+    This has a Big O space complexity of O(2^S * S) for the table of the dynamic program.
+    """
+    def order(self, start_location, candidate_locations, end_location=None):
+        positions_at = {}
+        for position, location in enumerate(candidate_locations):
+            positions_at.setdefault(location, []).append(position)
+        if len(positions_at) > self.stop_limit:
+            return None
+        stops = tuple(sorted(positions_at))
+        key = (start_location, end_location, stops)
+        stop_order = self.orders.get(key)
+        if stop_order is None:
+            self.misses += 1
+            stop_order = self.solve(start_location, stops, end_location)
+            self.orders[key] = stop_order
+        else:
+            self.hits += 1
+        return [position for location in stop_order for position in positions_at[location]]
+
+    """
+    This method returns the supplied stops in the order of the shortest route from the start location through all of
+    them to the end location, or to the last stop when the end location is None. Ties go to the stop that comes first
+    in the stops.
+    This has a Big O time complexity of O(2^S * S^2), with S being the number of stops.
+    This has a Big O space complexity of O(2^S * S).
+    """
+    def solve(self, start_location, stops, end_location=None):
+        count = len(stops)
+        if count < 2:
+            return stops
+        distances = [[self.distance_matrix.distance(stop, other) for other in stops] for stop in stops]
+        starts = [self.distance_matrix.distance(start_location, stop) for stop in stops]
+        if end_location is None:
+            ends = [0.0] * count
+        else:
+            ends = [self.distance_matrix.distance(stop, end_location) for stop in stops]
+        if numpy is not None:
+            costs, parents = self.vectorized_table(distances, starts)
+        else:
+            costs, parents = self.table(distances, starts)
+
+        full = (1 << count) - 1
+        last = 0
+        best = float('inf')
+        for stop in range(count):
+            miles = costs[full * count + stop] + ends[stop]
+            if miles < best:
+                best = miles
+                last = stop
+        order = []
+        mask = full
+        while mask != 0:
+            order.append(stops[last])
+            previous = int(parents[mask * count + last])
+            mask ^= 1 << last
+            last = previous
+        order.reverse()
+        return tuple(order)
+
+    """
+    This method fills the table of the dynamic program with pure Python loops. The cost of a subset of the stops and
+    a last stop in it is the fewest miles from the start through every stop of the subset ending at that stop, and
+    its parent is the stop visited before it. Both are kept in flat lists indexed by subset * S + stop.
+    This has a Big O time complexity of O(2^S * S^2), with S being the number of stops.
+    This has a Big O space complexity of O(2^S * S).
+    """
+    @staticmethod
+    def table(distances, starts):
+        count = len(starts)
+        infinity = float('inf')
+        costs = [infinity] * ((1 << count) * count)
+        parents = [-1] * ((1 << count) * count)
+        for stop in range(count):
+            costs[(1 << stop) * count + stop] = starts[stop]
+        for mask in range(1, 1 << count):
+            if mask & (mask - 1) == 0:
+                continue
+            members = [stop for stop in range(count) if mask >> stop & 1]
+            for stop in members:
+                previous_offset = (mask ^ (1 << stop)) * count
+                best = infinity
+                parent = -1
+                for previous in members:
+                    miles = costs[previous_offset + previous] + distances[previous][stop]
+                    if miles < best:
+                        best = miles
+                        parent = previous
+                costs[mask * count + stop] = best
+                parents[mask * count + stop] = parent
+        return costs, parents
+
+    """
+    This method fills the same table as table with NumPy, solving every subset with the same number of stops at once:
+    the cost of each subset and last stop is the smallest cost of the subset without that stop, plus the miles from
+    its last stop, taken over the whole layer in one gather and one argmin. Subsets of the layer are taken in blocks
+    of block_size to bound the memory of the gather.
+    This has a Big O time complexity of O(2^S * S^2), with S being the number of stops, done in S vectorized layers.
+    This has a Big O space complexity of O(2^S * S).
+    """
+    def vectorized_table(self, distances, starts):
+        count = len(starts)
+        distances_to = numpy.array(distances, dtype=numpy.float64).T
+        bits = numpy.left_shift(1, numpy.arange(count))
+        masks = numpy.arange(1 << count)
+        sizes = (masks[:, None] & bits[None, :] != 0).sum(axis=1)
+        costs = numpy.full((1 << count, count), numpy.inf)
+        parents = numpy.full((1 << count, count), -1, dtype=numpy.int8)
+        costs[bits, numpy.arange(count)] = starts
+        for size in range(2, count + 1):
+            layer = masks[sizes == size]
+            for block_start in range(0, len(layer), self.block_size):
+                block = layer[block_start:block_start + self.block_size]
+                previous_masks = block[:, None] ^ bits[None, :]
+                miles = costs[previous_masks] + distances_to[None, :, :]
+                parent = numpy.argmin(miles, axis=2)
+                best = numpy.take_along_axis(miles, parent[:, :, None], axis=2)[:, :, 0]
+                member = block[:, None] & bits[None, :] != 0
+                costs[block] = numpy.where(member, best, numpy.inf)
+                parents[block] = numpy.where(member, parent, -1)
+        return costs.ravel(), parents.ravel()
+
+    """
+    This method returns the hits and misses of the kept orders, and how many orders are kept, as a dictionary.
+    This has a Big O space and time complexity of O(1).
+    """
+    def statistics(self):
+        return {'hits': self.hits, 'misses': self.misses, 'orders': len(self.orders)}
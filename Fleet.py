@@ -0,0 +1,45 @@
+"""
+This class schedules a fleet of any number of trucks with a limited number of drivers. The times the drivers become
+available are kept in a priority queue, so each truck is sent out with the first driver to become free, and never
+before its own planned departure time.
+"""
+import heapq
+
+
+class Fleet:
+    """
+    This is the initializer for the fleet, taking the list of trucks and the number of drivers. Every driver is
+    available from the start of the day.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, trucks, driver_count):
+        self.trucks = trucks
+        self.driver_count = driver_count
+
+    """
+    This method returns the trucks that have packages loaded in the order they are planned to leave, with trucks
+    planned for the same time kept in fleet order.
+    This has a Big O time complexity of O(N log N), with N being the number of trucks.
+    This has a Big O space complexity of O(N).
+    """
+    def dispatch_order(self):
+        loaded_trucks = [truck for truck in self.trucks if len(truck.loaded_packages) > 0]
+        return sorted(loaded_trucks, key=lambda truck: truck.planned_departure_time)
+
+    """
+    This method sends out every loaded truck. Each truck takes the driver that becomes available first, leaving at
+    the later of its planned departure time and the time that driver is back at the hub. The supplied run function is
+    called with the truck to drive its route, after which the truck last delivery time is the time it is back at the
+    hub and its driver becomes available again. Because each run starts from the planned departure time, the fleet
+    can be dispatched again to simulate the day again.
+    This has a Big O time complexity of O(N log D), with N being the number of trucks and D being the number of
+    drivers, because every truck is one pop and one push on the driver priority queue, plus the cost of the runs.
+    This has a Big O space complexity of O(D) for the driver priority queue.
+    """
+    def dispatch(self, run):
+        driver_available = [0] * self.driver_count
+        for truck in self.dispatch_order():
+            available_time = heapq.heappop(driver_available)
+            truck.begin_run(max(truck.planned_departure_time, available_time))
+            run(truck)
+            heapq.heappush(driver_available, truck.last_delivery_time)
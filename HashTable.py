@@ -1,44 +1,49 @@
 # Direct Hash Table being used, with a resize if more packages are added than there are room for.
+import sys
+
+
 class DirectHashTable:
 
     """
     Based off of direct hash table in ZyBooks chapter 7 section 7.
     Creates the hash table with 41 buckets to accommodate the direct hashing of 40 packages. This can be altered to
     start with different numbers of packages by changing the capacity, or can leave the capacity alone and the resize
-    will be done automatically when a package id of 41 or higher is used.
+    will be done automatically when a package id of 41 or higher is used. Empty buckets hold None, so an empty table
+    is a single list of references with no per bucket objects.
     The big O time complexity of this is O(1), because there are a known number of iterations for the for loop, and
     the rest of the operation have a time complexity of O(1).
     The big o space complexity is O(N) with n being the number of packages.
     """
 
     def __init__(self, capacity=41):
-        self.buckets = []
         self.capacity = capacity
-        for i in range(self.capacity):
-            self.buckets.append([])
+        self.buckets = [None] * self.capacity
+        self.count = 0
 
     """
-    This method is used to add a package to the proper bucket in the list of buckets. It is put in the bucket 
+    This method is used to add a package to the proper bucket in the list of buckets. It is put in the bucket
     corresponding to it's package id number.
-    The Big O time complexity of this method is O(N), it could be O(1) for the single operation if the package being 
-    added is already in the range of the available capacity. However, if the resize method is called it becomes O(N), 
+    The Big O time complexity of this method is O(N), it could be O(1) for the single operation if the package being
+    added is already in the range of the available capacity. However, if the resize method is called it becomes O(N),
     because that is the time complexity of the resize.
     The space complexity is O(N), because it is a direct hash and requires a bucket for every package being stored.
     """
     def add(self, package):
         if package.id >= self.capacity:
             self.resize(package.id)
+        if self.buckets[package.id] is None:
+            self.count += 1
         self.buckets[package.id] = package
 
     """
     The search method takes an integer id number and searches the hash table for that package id number. Using direct
     hashing, it checks the bucket number of the id number, if there is a package there it returns the package, or none
-    if there isn't a package with that id number.
-    This has a Big O space and time complexity of O(1), because it takes one operation to access the bucket to see if 
-    there is a package. 
+    if there isn't a package with that id number or the id number is outside of the table.
+    This has a Big O space and time complexity of O(1), because it takes one operation to access the bucket to see if
+    there is a package.
     """
     def search(self, id_number):
-        if self.buckets[id_number] is not None:
+        if 0 <= id_number < self.capacity:
             return self.buckets[id_number]
         else:
             return None
@@ -46,31 +51,79 @@ class DirectHashTable:
     """
     The remove method checks to see if the supplied package is in the range of the available capacity, if it is it sets
     the bucket to empty.
-    This has a Big O space and time complexity of O(1), because it takes one operation to check if it is in range, 
+    This has a Big O space and time complexity of O(1), because it takes one operation to check if it is in range,
     and one operation to set the bucket to empty if it is. With both being constants the Big O is O(1).
     """
     def remove(self, package):
-        if package.id < self.capacity:
-            self.buckets[package.id] = []
+        if package.id < self.capacity and self.buckets[package.id] is not None:
+            self.buckets[package.id] = None
+            self.count -= 1
 
     """
     This method automatically resizes the direct hash table if a package is added with an id higher than the capacity.
-    This method is called by add method when the resize is required. First it copies the buckets. Then, it increases 
-    the capacity till the capacity is greater than the supplied id number. Then it remakes the buckets using the new 
-    capacity. Finally it copies the packages that were in the old buckets to the new buckets. 
-    The Big O time complexity of this method is O(N). The while loop runs O(N) number of time depending on the 
-    package that is added. The first for loop runs O(N) number of times because the number of capacity is unknown 
-    till the new package is added. The second for loop runs O(N) number of times because the previous capacity is 
-    unknown when it is run during the program. The rest of the operations are O(1), leaving the final complexity at 
-    O(N).
+    This method is called by add method when the resize is required. It increases the capacity till the capacity is
+    greater than the supplied id number, then extends the bucket list with empty buckets in one operation, so the
+    packages already stored are not copied one by one.
+    The Big O time complexity of this method is O(N), for the new empty buckets added to the end of the list.
     The space complexity is O(N), requiring a bucket for every package.
     """
     def resize(self, id_number):
-        temp_buckets = self.buckets
+        old_capacity = self.capacity
         while id_number >= self.capacity:
             self.capacity *= 2
-        self.buckets = []
-        for i in range(self.capacity):
-            self.buckets.append([])
-        for i in range(len(temp_buckets)):
-            self.buckets[i] = temp_buckets[i]
+        self.buckets.extend([None] * (self.capacity - old_capacity))
+
+    """
+    This method returns the number of packages stored in the hash table.
+    The Big O space and time complexity is O(1).
+    """
+    def __len__(self):
+        return self.count
+
+    """
+    This method yields every package stored in the hash table in order of package id, skipping the empty buckets.
+    The Big O time complexity of this method is O(N), with N being the capacity of the hash table.
+    The space complexity is O(1).
+    """
+    def packages(self):
+        for bucket in self.buckets:
+            if bucket is not None:
+                yield bucket
+
+    """
+    This method yields the packages with ids from the start id up to but not including the end id, in order of package
+    id, skipping the empty buckets. Because the ids are the bucket numbers this only looks at the buckets in the range.
+    The Big O time complexity of this method is O(K), with K being the number of ids in the range.
+    The space complexity is O(1).
+    """
+    def range_scan(self, start_id, end_id):
+        for id_number in range(max(start_id, 0), min(end_id, self.capacity)):
+            bucket = self.buckets[id_number]
+            if bucket is not None:
+                yield bucket
+
+    """
+    This method returns a report of the memory used by the hash table as a dictionary of the number of packages, the
+    bytes used by the bucket list, the bytes used by the packages and the strings they hold that are not shared with
+    other packages, the total bytes, and the bytes used for each package.
+    The Big O time complexity of this method is O(N), with N being the capacity of the hash table.
+    The space complexity is O(N) for the set of strings already counted.
+    """
+    def memory_report(self):
+        bucket_bytes = sys.getsizeof(self.buckets)
+        package_bytes = 0
+        counted = set()
+        for package in self.packages():
+            package_bytes += sys.getsizeof(package)
+            for name in package.__slots__:
+                value = getattr(package, name, None)
+                if value is None or id(value) in counted:
+                    continue
+                counted.add(id(value))
+                package_bytes += sys.getsizeof(value)
+        total_bytes = bucket_bytes + package_bytes
+        return {'packages': self.count,
+                'bucket_bytes': bucket_bytes,
+                'package_bytes': package_bytes,
+                'total_bytes': total_bytes,
+                'bytes_per_package': total_bytes / self.count if self.count > 0 else 0.0}
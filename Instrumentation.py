@@ -0,0 +1,241 @@
+"""
+This class collects counters and timers for the stages of the Loading and Delivery class, in total and for each
+truck, and can capture a cProfile profile of everything run inside those stages. The results are written as a text
+report or as JSON. Instrumentation is off unless an instance is given one: every hook is then a single check against
+None and the distance matrix is used as it is, so a run without it costs the same as before. When it is on, distance
+lookups are counted by a counting view of the distance matrix that shares its buffer.
+"""
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+import DistanceMatrix
+
+# Context used in place of a stage timer when instrumentation is off, shared so nothing is made for each stage.
+disabled = contextlib.nullcontext()
+
+
+class CountingDistanceMatrix(DistanceMatrix.DistanceMatrix):
+    """
+    This is the initializer for the counting distance matrix, taking the distance matrix to count the lookups of and
+    the instrumentation the count is added to. The keys, key index and distance buffer are shared, not copied.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, distance_matrix, instrumentation):
+        self.keys = distance_matrix.keys
+        self.size = distance_matrix.size
+        self.distances = distance_matrix.distances
+        self.key_index = distance_matrix.key_index
+        self.source = distance_matrix
+        self.instrumentation = instrumentation
+
+    """
+    This method returns the miles between the two supplied location ids and counts the lookup.
+    This has a Big O space and time complexity of O(1).
+    """
+    def distance(self, location_1, location_2):
+        self.instrumentation.distance_lookups += 1
+        return self.source.distance(location_1, location_2)
+
+    """
+    This method returns the row of distances from the supplied location id to every other location.
+    This has a Big O time and space complexity of O(N), for the N locations in the row.
+    """
+    def row(self, location_id):
+        return self.source.row(location_id)
+
+    """
+    This method closes the distance matrix whose lookups are counted.
+    This has a Big O space and time complexity of O(1).
+    """
+    def close(self):
+        self.source.close()
+
+
+class StageTimer:
+    """
+    This is the initializer for the timer of one run of a stage, taking the instrumentation, the stage name and the
+    name of the truck it is for, or None for the whole stage.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, instrumentation, stage, truck):
+        self.instrumentation = instrumentation
+        self.stage = stage
+        self.truck = truck
+        self.start = 0.0
+        self.lookups = 0
+
+    """
+    This method starts the timer, and the profiler when this is the outermost stage.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __enter__(self):
+        self.instrumentation.start_profile()
+        self.lookups = self.instrumentation.distance_lookups
+        self.start = time.perf_counter()
+        return self
+
+    """
+    This method stops the timer and records the time and any distance lookups made during the stage.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __exit__(self, exception_type, exception, traceback):
+        seconds = time.perf_counter() - self.start
+        instrumentation = self.instrumentation
+        instrumentation.record_time(self.stage, seconds, self.truck)
+        lookups = instrumentation.distance_lookups - self.lookups
+        if lookups > 0:
+            instrumentation.count(self.stage, 'distance_lookups', lookups, self.truck)
+        instrumentation.stop_profile()
+        return False
+
+
+class Instrumentation:
+    # Number of functions listed in the profile part of the report.
+    profile_lines = 25
+
+    """
+    This is the initializer for the instrumentation, taking whether to capture a cProfile profile of the stages.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, profile=False):
+        # Counters of each (stage, truck) pair, as a dictionary of counter name to amount.
+        self.counters = {}
+        # Calls and total seconds of each (stage, truck) pair.
+        self.timers = {}
+        # Distance lookups made through the counting distance matrix, and the matrix they were counted for.
+        self.distance_lookups = 0
+        self.distance_matrix = None
+        self.profiler = cProfile.Profile() if profile else None
+        self.profile_depth = 0
+        self.profiled = False
+
+    """
+    This method returns a context that times one run of the supplied stage, for the supplied truck name or for the
+    whole stage when it is None.
+    This has a Big O space and time complexity of O(1).
+    """
+    def stage(self, stage, truck=None):
+        return StageTimer(self, stage, truck)
+
+    """
+    This method adds the supplied amount to a counter of the supplied stage, for the supplied truck name or for the
+    whole stage when it is None.
+    This has a Big O space and time complexity of O(1).
+    """
+    def count(self, stage, name, amount=1, truck=None):
+        counters = self.counters.setdefault((stage, truck), {})
+        counters[name] = counters.get(name, 0) + amount
+
+    """
+    This method records one run of the supplied stage that took the supplied seconds.
+    This has a Big O space and time complexity of O(1).
+    """
+    def record_time(self, stage, seconds, truck=None):
+        timer = self.timers.setdefault((stage, truck), [0, 0.0])
+        timer[0] += 1
+        timer[1] += seconds
+
+    """
+    This method returns a counting view of the supplied distance matrix, whose lookups are added to this
+    instrumentation.
+    This has a Big O space and time complexity of O(1).
+    """
+    def wrap_distance_matrix(self, distance_matrix):
+        if isinstance(distance_matrix, CountingDistanceMatrix):
+            distance_matrix = distance_matrix.source
+        self.distance_matrix = distance_matrix
+        return CountingDistanceMatrix(distance_matrix, self)
+
+    """
+    This method starts the profiler when profiling and no stage is running yet.
+    This has a Big O space and time complexity of O(1).
+    """
+    def start_profile(self):
+        if self.profiler is None:
+            return
+        if self.profile_depth == 0:
+            self.profiler.enable()
+            self.profiled = True
+        self.profile_depth += 1
+
+    """
+    This method stops the profiler when profiling and the outermost stage has finished.
+    This has a Big O space and time complexity of O(1).
+    """
+    def stop_profile(self):
+        if self.profiler is None:
+            return
+        self.profile_depth -= 1
+        if self.profile_depth == 0:
+            self.profiler.disable()
+
+    """
+    This method returns the functions that took the most cumulative time in the profile as text, or None when not
+    profiling.
+    This has a Big O time complexity of O(F log F), with F being the number of functions profiled.
+    This has a Big O space complexity of O(F).
+    """
+    def profile_report(self):
+        if self.profiler is None:
+            return None
+        if not self.profiled:
+            return 'No stages have run yet.\n'
+        text = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=text)
+        stats.sort_stats('cumulative').print_stats(self.profile_lines)
+        return text.getvalue()
+
+    """
+    This method returns the results as a dictionary that can be written as JSON, with a list of stages in the order
+    they first ran, each holding its truck, calls, seconds and counters, and the statistics of the distance cache when
+    the distances are read through one.
+    This has a Big O time and space complexity of O(S), with S being the number of stage and truck pairs.
+    """
+    def as_dict(self):
+        stages = []
+        for key in list(self.timers) + [key for key in self.counters if key not in self.timers]:
+            calls, seconds = self.timers.get(key, (0, 0.0))
+            stages.append({'stage': key[0], 'truck': key[1], 'calls': calls, 'seconds': seconds,
+                           'counters': dict(self.counters.get(key, {}))})
+        distance_cache = None
+        if hasattr(self.distance_matrix, 'statistics'):
+            distance_cache = self.distance_matrix.statistics()
+        return {'stages': stages, 'distance_lookups': self.distance_lookups, 'distance_cache': distance_cache,
+                'profile': self.profile_report()}
+
+    """
+    This method returns the results as a text report with one line for each stage and truck, followed by the profile
+    when profiling.
+    This has a Big O time and space complexity of O(S), with S being the number of stage and truck pairs.
+    """
+    def report(self):
+        results = self.as_dict()
+        lines = ['{:<30} {:<12} {:>7} {:>11}  {}'.format('Stage', 'Truck', 'Calls', 'Seconds', 'Counters')]
+        for stage in results['stages']:
+            counters = ', '.join(f'{name} {amount}' for name, amount in sorted(stage['counters'].items()))
+            lines.append(f'{stage["stage"]:<30} {stage["truck"] or "":<12} {stage["calls"]:>7} '
+                         f'{stage["seconds"]:>11.6f}  {counters}'.rstrip())
+        lines.append(f'Total distance lookups: {results["distance_lookups"]}')
+        if results['distance_cache'] is not None:
+            lines.append('Distance cache: ' + ', '.join(f'{name} {amount:.3f}' if isinstance(amount, float) else
+                                                        f'{name} {amount}'
+                                                        for name, amount in results['distance_cache'].items()))
+        if results['profile'] is not None:
+            lines += ['', results['profile'].rstrip()]
+        return '\n'.join(lines)
+
+    """
+    This method writes the results to the supplied file, as JSON when its name ends with .json and as the text report
+    otherwise.
+    This has a Big O time and space complexity of O(S), with S being the number of stage and truck pairs.
+    """
+    def write(self, filename):
+        with open(filename, 'w') as output:
+            if filename.endswith('.json'):
+                json.dump(self.as_dict(), output, indent=2)
+                output.write('\n')
+            else:
+                output.write(self.report() + '\n')
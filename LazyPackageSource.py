@@ -0,0 +1,298 @@
+"""
+This class looks up packages in a manifest too large to hold as package objects. The manifest is memory mapped and
+read once to build a compact index, holding for each package id only the byte offset and line number of its row and
+the routing fields, the location id of its address and its deadline, in flat arrays indexed by package id the same way
+as the direct hash table. A full package is only built from its row when it is searched for or shown in a report, and
+reports are read one page at a time, so the memory used stays small however many rows the manifest has.
+"""
+import array
+import csv
+import mmap
+import LoadPlanner
+import Package
+import PackageIngest
+import SimulationTime
+
+
+class LazyPackageSource:
+    """
+    This is the initializer for the lazy package source, mapping the supplied manifest and indexing its rows. When a
+    location index, a dictionary of location key to location id such as the key index of a distance matrix, is
+    supplied the location id of every package is found as it is indexed, otherwise the location ids are left unknown.
+    The start of the day, in milliseconds since midnight, decides which delayed packages are still in route to hub.
+    This has a Big O time complexity of O(N), with N being the number of rows in the manifest.
+    This has a Big O space complexity of O(I), with I being the largest package id, for the index arrays.
+    """
+    def __init__(self, filename, location_index=None, day_start=SimulationTime.clock(8)):
+        self.filename = filename
+        self.location_index = location_index
+        self.day_start = day_start
+        self.capacity = 41
+        # Byte offset and line number of the row of each package id, -1 for an id that is not in the manifest.
+        self.offsets = array.array('q', [-1]) * self.capacity
+        self.line_numbers = array.array('i', [0]) * self.capacity
+        # Location id of the address of each package, -1 when unknown, and its deadline, -1 for EOD.
+        self.location_ids = array.array('i', [-1]) * self.capacity
+        self.deadlines = array.array('i', [-1]) * self.capacity
+        # Package ids in the manifest, in order of package id.
+        self.ids = array.array('q')
+        with open(filename, 'rb') as manifest:
+            try:
+                self.mapped = mmap.mmap(manifest.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                self.mapped = b''
+        try:
+            self.index()
+        except ValueError:
+            self.close()
+            raise
+
+    """
+    This method reads every row of the mapped manifest after the header line and adds it to the index, checking the
+    cells the same way as the manifest ingestor, so a row that is missing cells or has a bad value raises a ValueError
+    naming its line. A package id listed again replaces the row listed before it.
+    This has a Big O time complexity of O(N), with N being the number of rows, plus O(N log N) to sort the ids when
+    the rows are not in order of package id.
+    This has a Big O space complexity of O(I), with I being the largest package id.
+    """
+    def index(self):
+        mapped = self.mapped
+        offset = mapped.find(b'\n') + 1
+        if offset == 0:
+            offset = len(mapped)
+        line_number = 1
+        ordered = True
+        while offset < len(mapped):
+            end = self.row_end(offset, line_number + 1)
+            line_number += 1
+            row = self.read_row(offset, end)
+            if len(row) > 0 and row[0].strip() != '':
+                package_id = self.add_row(line_number, offset, row)
+                if package_id is not None:
+                    if len(self.ids) > 0 and package_id < self.ids[-1]:
+                        ordered = False
+                    self.ids.append(package_id)
+            # A quoted cell can hold line breaks, which are counted so later rows are still named by their own line.
+            line_number += mapped[offset:end].count(b'\n')
+            offset = end + 1
+        if not ordered:
+            self.ids = array.array('q', sorted(self.ids))
+
+    """
+    This method returns the byte offset of the line break that ends the row starting at the supplied offset, or the
+    length of the manifest for the last row. A line break inside a quoted cell does not end the row, so the row goes on
+    until the quotes are balanced, the same way the csv module reads it. A quote that is never closed raises a
+    ValueError naming the supplied line.
+    This has a Big O time complexity of O(R), with R being the length of the row.
+    This has a Big O space complexity of O(R).
+    """
+    def row_end(self, offset, line_number):
+        mapped = self.mapped
+        end = mapped.find(b'\n', offset)
+        if end < 0:
+            end = len(mapped)
+        if mapped.find(b'"', offset, end) < 0:
+            return end
+        while mapped[offset:end].count(b'"') % 2 == 1:
+            if end == len(mapped):
+                raise ValueError(f'Line {line_number} of the manifest has a quoted cell that is never closed.')
+            end = mapped.find(b'\n', end + 1)
+            if end < 0:
+                end = len(mapped)
+        return end
+
+    """
+    This method returns the cells of the row of the manifest between the supplied byte offsets. A row with no quotes
+    is split on its commas, and only a row with quotes is read with the csv module, which keeps the line breaks inside
+    its quoted cells.
+    This has a Big O space and time complexity of O(1), for the fixed number of cells in a row.
+    """
+    def read_row(self, start, end):
+        line = self.mapped[start:end].decode().rstrip('\r')
+        if '"' not in line:
+            return line.split(',') if line != '' else []
+        return next(csv.reader([line], delimiter=','), [])
+
+    """
+    This method checks a manifest row and adds its offset, line number, location id and deadline to the index under
+    its package id, growing the index arrays when the id does not fit. Returns the package id, or None when the id
+    was already indexed.
+    This has a Big O time complexity of O(1), or O(I) when the index arrays grow.
+    This has a Big O space complexity of O(1), or O(I) when the index arrays grow.
+    """
+    def add_row(self, line_number, offset, row):
+        if len(row) < 8:
+            raise ValueError(f'Line {line_number} of the manifest has {len(row)} cells, 8 are needed.')
+        try:
+            package_id = int(row[0])
+            int(row[6])
+            deadline = Package.Package.parse_deadline(row[5].strip())
+        except ValueError as error:
+            raise ValueError(f'Line {line_number} of the manifest is not valid: {error}') from error
+        if package_id < 0:
+            raise ValueError(f'Line {line_number} of the manifest has a negative package id.')
+        location_id = -1
+        if self.location_index is not None:
+            key = row[1] + ' ' + '(' + row[4] + ')'
+            if key not in self.location_index:
+                raise ValueError(f'Package {package_id} is going to {key}, which is not in the distance data.')
+            location_id = self.location_index[key]
+        if package_id >= self.capacity:
+            self.resize(package_id)
+        new_id = self.offsets[package_id] < 0
+        self.offsets[package_id] = offset
+        self.line_numbers[package_id] = line_number
+        self.location_ids[package_id] = location_id
+        self.deadlines[package_id] = -1 if deadline is None else deadline
+        return package_id if new_id else None
+
+    """
+    This method grows the index arrays, doubling the capacity until it is greater than the supplied package id.
+    This has a Big O time and space complexity of O(I), with I being the new capacity.
+    """
+    def resize(self, package_id):
+        old_capacity = self.capacity
+        while package_id >= self.capacity:
+            self.capacity *= 2
+        added = self.capacity - old_capacity
+        self.offsets.extend(array.array('q', [-1]) * added)
+        self.line_numbers.extend(array.array('i', [0]) * added)
+        self.location_ids.extend(array.array('i', [-1]) * added)
+        self.deadlines.extend(array.array('i', [-1]) * added)
+
+    """
+    This method returns the package with the supplied id, built from its row of the manifest with its location id
+    and its status at the start of the day set, or None when the id is not in the manifest. A new package is built
+    every time, none are kept.
+    This has a Big O space and time complexity of O(1), with one index lookup and one row read.
+    """
+    def search(self, package_id):
+        if not 0 <= package_id < self.capacity or self.offsets[package_id] < 0:
+            return None
+        offset = self.offsets[package_id]
+        row = self.read_row(offset, self.row_end(offset, self.line_numbers[package_id]))
+        package = PackageIngest.ManifestIngestor.build_package(self.line_numbers[package_id], row)
+        if self.location_ids[package_id] >= 0:
+            package.location_id = self.location_ids[package_id]
+        package.set_delivery_status(self.initial_status(package))
+        return package
+
+    """
+    This method returns the status the supplied package has at the start of the day, the same as the reports of the
+    simulated day: in route to hub for a package delayed on a flight until after the day starts, and at hub for
+    every other package.
+    This has a Big O space and time complexity of O(1).
+    """
+    def initial_status(self, package):
+        delayed_until = LoadPlanner.LoadPlanner.delayed_until(package.special_notes)
+        if delayed_until is not None and delayed_until > self.day_start:
+            return 'in route to hub'
+        return 'at hub'
+
+    """
+    This method returns the location id of the package with the supplied id from the index, or None when it is not
+    known, without building the package.
+    This has a Big O space and time complexity of O(1).
+    """
+    def location_id(self, package_id):
+        if not 0 <= package_id < self.capacity or self.location_ids[package_id] < 0:
+            return None
+        return self.location_ids[package_id]
+
+    """
+    This method returns the deadline of the package with the supplied id from the index in milliseconds since
+    midnight, or None for a deadline of EOD or an id that is not in the manifest, without building the package.
+    This has a Big O space and time complexity of O(1).
+    """
+    def deadline_time(self, package_id):
+        if not 0 <= package_id < self.capacity or self.deadlines[package_id] < 0:
+            return None
+        return self.deadlines[package_id]
+
+    """
+    This method returns the number of packages in the manifest.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __len__(self):
+        return len(self.ids)
+
+    """
+    This method yields every package in the manifest in order of package id, building each one as it is reached.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(1), because only the package being yielded is held.
+    """
+    def packages(self):
+        for package_id in self.ids:
+            yield self.search(package_id)
+
+    """
+    This method yields the packages with ids from the start id up to but not including the end id, in order of package
+    id, skipping the ids that are not in the manifest.
+    This has a Big O time complexity of O(K), with K being the number of ids in the range.
+    This has a Big O space complexity of O(1).
+    """
+    def range_scan(self, start_id, end_id):
+        for package_id in range(max(start_id, 0), min(end_id, self.capacity)):
+            if self.offsets[package_id] >= 0:
+                yield self.search(package_id)
+
+    """
+    This method returns the number of pages of the supplied size the packages fill.
+    This has a Big O space and time complexity of O(1).
+    """
+    def page_count(self, page_size):
+        if page_size < 1:
+            raise ValueError('A page needs at least one package.')
+        return max(1, -(-len(self.ids) // page_size))
+
+    """
+    This method yields the packages on the supplied page, counting from 1, when the packages are split into pages of
+    the supplied size in order of package id. A page after the last one yields nothing.
+    This has a Big O time complexity of O(P), with P being the page size.
+    This has a Big O space complexity of O(1).
+    """
+    def page(self, page_number, page_size):
+        if page_size < 1:
+            raise ValueError('A page needs at least one package.')
+        if page_number < 1:
+            raise ValueError('Pages are counted from 1.')
+        for package_id in self.ids[(page_number - 1) * page_size:page_number * page_size]:
+            yield self.search(package_id)
+
+    """
+    This method prints the supplied page of packages in the same layout as print_all_packages, followed by the page
+    number and the number of pages. Each package is shown with its status at the start of the day, or, when a delivery
+    timeline and a time are supplied, with its status and address at that time.
+    This has a Big O time complexity of O(P), with P being the page size, or O(P log E) with a timeline of E events.
+    This has a Big O space complexity of O(1).
+    """
+    def print_page(self, page_number, page_size, timeline=None, time=None):
+        print('{:2>4} | {:<45} | {:<20} | {:>5} | {:>5} | {:<6} | {:<8} | {}'.format('ID', 'Address', 'City',
+                                                                                     'State', 'Zip', 'weight',
+                                                                                     'Deadline', 'Status'))
+        for package in self.page(page_number, page_size):
+            if timeline is not None:
+                package = timeline.package_at(package, time)
+            print(package)
+        print(f'Page {page_number} of {self.page_count(page_size)}')
+
+    """
+    This method returns a report of the memory used by the index as a dictionary of the number of packages, the bytes
+    used by the index arrays, which is the total as no packages are kept, and the bytes used for each package.
+    This has a Big O space and time complexity of O(1).
+    """
+    def memory_report(self):
+        index_bytes = sum(len(index) * index.itemsize for index in (self.offsets, self.line_numbers,
+                                                                     self.location_ids, self.deadlines, self.ids))
+        return {'packages': len(self.ids),
+                'index_bytes': index_bytes,
+                'total_bytes': index_bytes,
+                'bytes_per_package': index_bytes / len(self.ids) if len(self.ids) > 0 else 0.0}
+
+    """
+    This method closes the mapped manifest.
+    This has a Big O space and time complexity of O(1).
+    """
+    def close(self):
+        if isinstance(self.mapped, mmap.mmap):
+            self.mapped.close()
@@ -0,0 +1,76 @@
+"""
+These classes are the changes a dispatcher can make while the delivery day is under way: a new delivery address for a
+package, a package that will reach the hub later than planned, and a cancelled package. Each event is applied with
+LoadingAndDelivery.apply_event, which repairs the remaining route of the trucks it affects instead of planning the
+day again.
+"""
+import SimulationTime
+
+
+class AddressChange:
+    # Kind of event, used to apply it and to read it from a dictionary.
+    kind = 'address change'
+
+    """
+    This is the initializer for an address change, taking the time it is received, the package id and the new
+    address, city, state and zip of the package.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, time, package_id, address, city, state, zip_code):
+        self.time = time
+        self.package_id = package_id
+        self.address = (address, city, state, zip_code)
+
+
+class LateArrival:
+    # Kind of event, used to apply it and to read it from a dictionary.
+    kind = 'late arrival'
+
+    """
+    This is the initializer for a late arrival, taking the time it is reported, the package id and the time the
+    package will now arrive at the hub.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, time, package_id, arrival_time):
+        self.time = time
+        self.package_id = package_id
+        self.arrival_time = arrival_time
+
+
+class Cancellation:
+    # Kind of event, used to apply it and to read it from a dictionary.
+    kind = 'cancellation'
+
+    """
+    This is the initializer for a cancellation, taking the time it is received and the package id.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, time, package_id):
+        self.time = time
+        self.package_id = package_id
+
+
+"""
+This function builds an event from a dictionary such as one read from JSON, with the kind, the time as HH:MM:SS, the
+package id and the fields of that kind of event: address, city, state and zip for an address change, and arrival as
+HH:MM:SS for a late arrival. A missing or bad field raises a ValueError.
+This has a Big O space and time complexity of O(1).
+"""
+def event_from_dict(fields):
+    try:
+        kind = fields['kind']
+        time = SimulationTime.parse_clock(str(fields['time']))
+        package_id = int(fields['package'])
+        if kind == AddressChange.kind:
+            return AddressChange(time, package_id, str(fields['address']), str(fields['city']), str(fields['state']),
+                                 str(fields['zip']))
+        if kind == LateArrival.kind:
+            return LateArrival(time, package_id, SimulationTime.parse_clock(str(fields['arrival'])))
+        if kind == Cancellation.kind:
+            return Cancellation(time, package_id)
+    except KeyError as error:
+        raise ValueError(f'The event needs a {error.args[0]}.') from None
+    except (TypeError, ValueError) as error:
+        raise ValueError(f'The event is not valid: {error}') from None
+    raise ValueError(f'{kind!r} is not a kind of event, use {AddressChange.kind!r}, {LateArrival.kind!r} or '
+                     f'{Cancellation.kind!r}.')
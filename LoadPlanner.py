@@ -0,0 +1,560 @@
+"""
+This class plans which packages go on which truck. The special notes of the packages are parsed into constraints
+(packages that can only be on one truck, packages that arrive at the hub late and packages that must be delivered
+together), and the packages are then assigned to trucks within the truck capacities, by package count and by
+weight, packing them into several trips for each truck when they do not fit on one. Packages with deadlines go on the
+earliest truck they can make, and the rest are clustered by location so every truck serves one area, or given to the
+truck of their zone when the locations have been split into zones. The plan for each truck lists the packages of each
+trip in priority levels by deadline, ready for the prioritized nearest neighbor loading.
+"""
+import bisect
+import heapq
+import re
+import SimulationTime
+
+
+class PackageConstraints:
+    """
+    This is the initializer for the constraints of one package: the number of the only truck it can be on, the time
+    it is available at the hub and the ids of the packages it must be delivered with.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, required_truck=None, available_time=None, grouped_with=()):
+        self.required_truck = required_truck
+        self.available_time = available_time
+        self.grouped_with = list(grouped_with)
+
+
+class TruckLoadPlan:
+    """
+    This is the initializer for the plan of one truck, taking its departure time and the lists of package ids for each
+    priority level, earliest deadline first, of its first trip, and the priority levels of every trip when the truck
+    comes back to the hub to be loaded again.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, departure_time, priority_levels, trips=None):
+        self.departure_time = departure_time
+        self.priority_levels = priority_levels
+        self.trips = [priority_levels] if trips is None else trips
+
+
+class LoadUnit:
+    """
+    This is the initializer for a load unit, the packages that must be on the same truck, along with the latest time
+    any of them is available, the truck they are required on, their earliest deadline, their locations and their
+    total weight.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, packages, available_time, required_truck, deadline, locations, weight=0):
+        self.packages = packages
+        self.available_time = available_time
+        self.required_truck = required_truck
+        self.deadline = deadline
+        self.locations = locations
+        self.weight = weight
+
+
+class LoadPlanner:
+    # Most locations of a truck that are compared against when choosing the closest truck for a location.
+    anchor_limit = 8
+    # Patterns used to read the constraints from the special notes.
+    truck_pattern = re.compile(r'only be on truck (\d+)', re.IGNORECASE)
+    delayed_pattern = re.compile(r'until (\d{1,2}):(\d{2}) ?([ap]m)', re.IGNORECASE)
+    grouped_pattern = re.compile(r'delivered with ([\d,\s]+)', re.IGNORECASE)
+    wrong_address_pattern = re.compile(r'wrong address', re.IGNORECASE)
+
+    """
+    This is the initializer for the load planner, taking the distance matrix, the location id of the hub, the time the
+    day starts, the list of address corrections, which are (time received, package id, listed address) tuples, and a
+    dictionary of package id to the time the package arrives at the hub for packages reported as arriving late, and
+    an optional dictionary of location id to the number of the truck whose zone it is in, from 0. A package with a
+    wrong address is held at the hub until its correction is received. When the truck speed in miles per second is
+    supplied, the time each load leaves is estimated from the number of drivers, None for a driver on every truck,
+    and the milliseconds it takes to load a truck again between trips, so loads are chosen by when they leave and no
+    package is placed where it would miss its deadline while another load can make it. After planning, the load unit
+    of every package is kept in unit_of.
+    This has a Big O time complexity of O(N), with N being the number of address corrections.
+    This has a Big O space complexity of O(N).
+    """
+    def __init__(self, distance_matrix, hub_location, day_start, address_corrections=(), arrival_times=None,
+                 zones=None, truck_speed=None, driver_count=None, reload_time=0):
+        self.distance_matrix = distance_matrix
+        self.hub_location = hub_location
+        self.day_start = day_start
+        self.truck_speed = truck_speed
+        self.driver_count = driver_count
+        self.reload_time = reload_time
+        self.correction_times = {}
+        for correction_time, package_id, listed_address in address_corrections:
+            self.correction_times[package_id] = correction_time
+        self.arrival_times = {} if arrival_times is None else arrival_times
+        self.zones = {} if zones is None else zones
+        self.unit_of = {}
+
+    """
+    This method parses the special notes of the supplied package into its constraints. A reported arrival time takes
+    the place of the time in the notes of a package delayed on a flight.
+    This has a Big O space and time complexity of O(1), for the short notes of a package.
+    """
+    def parse_constraints(self, package):
+        constraints = PackageConstraints(available_time=max(self.day_start,
+                                                            self.arrival_times.get(package.id, self.day_start)))
+        notes = package.special_notes
+        if notes == '':
+            return constraints
+        match = self.truck_pattern.search(notes)
+        if match is not None:
+            constraints.required_truck = int(match.group(1))
+        delayed_until = self.delayed_until(notes)
+        if delayed_until is not None and package.id not in self.arrival_times:
+            constraints.available_time = max(constraints.available_time, delayed_until)
+        match = self.grouped_pattern.search(notes)
+        if match is not None:
+            constraints.grouped_with = [int(package_id) for package_id in re.findall(r'\d+', match.group(1))]
+        if self.wrong_address_pattern.search(notes) is not None and package.id in self.correction_times:
+            constraints.available_time = max(constraints.available_time, self.correction_times[package.id])
+        return constraints
+
+    """
+    This method returns the time a package delayed on a flight arrives at the hub, read from its special notes, or None
+    when the notes do not say it is delayed.
+    This has a Big O space and time complexity of O(1), for the short notes of a package.
+    """
+    @classmethod
+    def delayed_until(cls, notes):
+        match = cls.delayed_pattern.search(notes)
+        if match is None:
+            return None
+        return cls.clock_time(int(match.group(1)), int(match.group(2)), match.group(3))
+
+    """
+    This method converts an hour, minute and am or pm into milliseconds since midnight.
+    This has a Big O space and time complexity of O(1).
+    """
+    @staticmethod
+    def clock_time(hours, minutes, meridiem):
+        hours = hours % 12
+        if meridiem.lower() == 'pm':
+            hours += 12
+        return SimulationTime.clock(hours, minutes)
+
+    """
+    This method returns the planned departure time of each of the supplied number of trucks. The first truck leaves at
+    the start of the day, and the next trucks leave when the late packages become available at the hub, so there is a
+    truck for each of them. Trucks past the number of those times are shared out over the times in turn, and with fewer
+    trucks than times the last truck waits for the latest packages, unless the trucks make several trips, when they
+    leave at the earliest times and the later trips take the latest packages.
+    This has a Big O time complexity of O(N log N), with N being the number of different available times.
+    This has a Big O space complexity of O(N).
+    """
+    def departure_times(self, truck_count, available_times, trip_count=1):
+        waves = sorted(set([self.day_start] + [time for time in available_times if time > self.day_start]))
+        if truck_count >= len(waves):
+            return [waves[truck % len(waves)] for truck in range(truck_count)]
+        if trip_count > 1:
+            return waves[:truck_count]
+        return waves[:truck_count - 1] + [waves[-1]]
+
+    """
+    This method builds the load units by joining the packages that must be delivered together, using a union find
+    over the package ids.
+    This has a Big O time complexity of O(N), with N being the number of packages, for the nearly constant union find
+    operations.
+    This has a Big O space complexity of O(N) for the union find parents and the units.
+    """
+    def build_units(self, packages, constraints):
+        parent = {}
+        for package in packages:
+            parent[package.id] = package.id
+
+        def find(package_id):
+            while parent[package_id] != package_id:
+                parent[package_id] = parent[parent[package_id]]
+                package_id = parent[package_id]
+            return package_id
+
+        for package in packages:
+            for other_id in constraints[package.id].grouped_with:
+                if other_id in parent:
+                    parent[find(other_id)] = find(package.id)
+
+        members = {}
+        for package in packages:
+            members.setdefault(find(package.id), []).append(package)
+
+        units = []
+        for unit_packages in members.values():
+            available_time = self.day_start
+            required_truck = None
+            deadline = None
+            locations = []
+            for package in unit_packages:
+                package_constraints = constraints[package.id]
+                available_time = max(available_time, package_constraints.available_time)
+                if package_constraints.required_truck is not None:
+                    if required_truck is not None and required_truck != package_constraints.required_truck:
+                        raise ValueError(f'Package {package.id} must be delivered with packages that are required '
+                                         f'on a different truck.')
+                    required_truck = package_constraints.required_truck
+                package_deadline = package.deadline_time()
+                if package_deadline is not None and (deadline is None or package_deadline < deadline):
+                    deadline = package_deadline
+                if package.location_id not in locations:
+                    locations.append(package.location_id)
+            units.append(LoadUnit(unit_packages, available_time, required_truck, deadline, locations,
+                                  sum([package.weight for package in unit_packages])))
+        return units
+
+    """
+    This method estimates the route of one load the way the trucks are loaded: the packages with deadlines first, a
+    deadline at a time with the nearest location next, then the rest of the supplied locations by nearest neighbor
+    and back to the hub. It takes the (deadline, location id) of each package with a deadline and the locations of
+    the load, and returns the milliseconds the route takes and, in increasing order, the latest time the load can
+    leave for each package with a deadline to be delivered by its deadline.
+    This has a Big O time complexity of O(S^2 + P log P), with S being the number of locations of the load and P the
+    number of packages with deadlines.
+    This has a Big O space complexity of O(S + P).
+    """
+    def route_estimate(self, deadline_stops, locations):
+        distance = self.distance_matrix.distance
+        current_location = self.hub_location
+        miles = 0.0
+        arrival_miles = {}
+
+        def visit(remaining):
+            nonlocal current_location, miles
+            remaining = set(remaining) - set(arrival_miles)
+            while len(remaining) > 0:
+                next_location = min(remaining, key=lambda location: (distance(current_location, location), location))
+                miles += distance(current_location, next_location)
+                arrival_miles[next_location] = miles
+                current_location = next_location
+                remaining.discard(next_location)
+
+        deadline_stops = sorted(deadline_stops)
+        position = 0
+        while position < len(deadline_stops):
+            level_end = position
+            while level_end < len(deadline_stops) and deadline_stops[level_end][0] == deadline_stops[position][0]:
+                level_end += 1
+            visit([location for deadline, location in deadline_stops[position:level_end]])
+            position = level_end
+        visit(locations)
+        miles += distance(current_location, self.hub_location)
+        latest_departures = sorted([deadline - SimulationTime.travel_time(arrival_miles[location], self.truck_speed)
+                                    for deadline, location in deadline_stops])
+        return SimulationTime.travel_time(miles, self.truck_speed), latest_departures
+
+    """
+    This method plans the loads of the supplied number of trucks, each able to hold the supplied capacity of packages
+    and, when a weight capacity is supplied, that many kilos, and returns a TruckLoadPlan for each truck. A truck can
+    make up to the supplied number of trips, coming back to the hub to be loaded again once the packages of the trip
+    are there, and the loads are packed trip by trip, so a later trip is only used once the packages no longer fit on
+    the earlier trips of every truck. The departure time of each truck is planned from the packages unless a list of
+    departures is supplied. Units required on a truck with a deadline or a later available time go on the first trip
+    of that truck with room, and the truck waits for them if they arrive after it was planned to leave, while room is
+    kept on the truck for the other required units, which go on its first trip with room after the deadline units.
+    Units with deadlines go on the earliest leaving load they are available for, with the truck speed supplied the
+    earliest estimated to leave that keeps every deadline, and the rest are placed one location at a time, furthest
+    from the hub first, on a truck already going to that location, else the truck whose zone the location is in, else
+    the truck with the closest of its first few stops, skipping loads that would then miss a deadline. A deadline
+    unit also goes to the truck of its zone when that truck leaves at the same time. While they are placed, room is
+    kept on the loads that leave late enough for the packages that are only available later and are not placed yet,
+    so the few trucks that wait for them are not filled by packages that could go on any truck. A truck with no stops
+    yet is first given the location furthest from the stops of the other trucks.
+    This has a Big O time complexity of O(N log N + L * T + N * T * D), with N being the number of packages, L the
+    number of locations, T the number of truck trips and D the number of times packages become available after the
+    start of the day, as each trip is compared on at most anchor_limit of its stops and the room kept for the waiting
+    packages is checked against running counts for each of those times. With the truck speed supplied, each check of
+    a unit that has deadlines or a new location against the deadlines adds O(S^2 + T log T), with S being the number
+    of locations of the load, for estimating the changed route and when every trip leaves.
+    This has a Big O space complexity of O(N) for the constraints, units and plans.
+    """
+    def plan(self, packages, truck_count, capacity, departures=None, weight_capacity=None, trip_count=1):
+        packages = list(packages)
+        constraints = {}
+        for package in packages:
+            constraints[package.id] = self.parse_constraints(package)
+        units = self.build_units(packages, constraints)
+        self.unit_of = {}
+        for unit in units:
+            for package in unit.packages:
+                self.unit_of[package.id] = unit
+        if departures is None:
+            departures = self.departure_times(truck_count, [unit.available_time for unit in units], trip_count)
+        else:
+            departures = list(departures)
+
+        # Each load is one trip of one truck: load n is trip n // truck_count of truck n % truck_count.
+        load_count = truck_count * trip_count
+        loads = [[] for _ in range(load_count)]
+        room = [capacity] * load_count
+        weight_room = [float('inf') if weight_capacity is None else weight_capacity] * load_count
+        load_locations = [set() for _ in range(load_count)]
+        anchors = [[] for _ in range(load_count)]
+        location_loads = {}
+
+        # Estimated route of each load, None until it is needed again after the load changed, the (deadline,
+        # location) of each of its packages with a deadline, the time all of its packages are at the hub, and the
+        # estimated time every load leaves.
+        routes = [None] * load_count
+        deadline_stops = [[] for _ in range(load_count)]
+        ready = [self.day_start] * load_count
+        estimated_departures = [None]
+
+        def place(unit, load):
+            loads[load].extend(unit.packages)
+            room[load] -= len(unit.packages)
+            weight_room[load] -= unit.weight
+            ready[load] = max(ready[load], unit.available_time)
+            unit_stops = [(package.deadline_time(), package.location_id) for package in unit.packages
+                          if package.deadline_time() is not None]
+            if len(unit_stops) > 0 or any(location not in load_locations[load] for location in unit.locations):
+                deadline_stops[load].extend(unit_stops)
+                routes[load] = None
+            estimated_departures[0] = None
+            for location in unit.locations:
+                if location in load_locations[load]:
+                    continue
+                load_locations[load].add(location)
+                location_loads.setdefault(location, []).append(load)
+                if len(anchors[load]) < self.anchor_limit:
+                    anchors[load].append(location)
+
+        def fits(unit, load):
+            return room[load] >= len(unit.packages) and weight_room[load] >= unit.weight
+
+        # A later trip waits at the hub for its packages, so it can take packages that are not there yet when the
+        # truck first leaves.
+        def leaves_after(load, available_time):
+            return load >= truck_count or departures[load % truck_count] >= available_time
+
+        def eligible(unit, load):
+            return fits(unit, load) and leaves_after(load, unit.available_time) and keeps_room_for_required(unit, load)
+
+        def keeps_room_for_required(unit, load):
+            truck_loads = range(load % truck_count, load_count, truck_count)
+            return sum(room[other] for other in truck_loads) - len(unit.packages) >= reserved[load % truck_count][0] \
+                and sum(weight_room[other] for other in truck_loads) - unit.weight >= reserved[load % truck_count][1]
+
+        def same_departure(load, other):
+            return load // truck_count == other // truck_count and \
+                departures[load % truck_count] == departures[other % truck_count]
+
+        def route_of(load):
+            if routes[load] is None:
+                routes[load] = self.route_estimate(deadline_stops[load], load_locations[load])
+            return routes[load]
+
+        # The trucks are sent out the way the fleet sends them, in order of planned departure with the first driver
+        # back, and each later trip leaves the reload time after the trip before it is back once its packages are at
+        # the hub. A changed load is estimated with its supplied route and time its packages are ready.
+        def schedule(changed_load=None, changed_route=None, changed_ready=None):
+            starts = [0] * load_count
+            drivers = [0] * (truck_count if self.driver_count is None else self.driver_count)
+            for truck in sorted(range(truck_count), key=lambda truck: departures[truck]):
+                truck_loads = range(truck, load_count, truck_count)
+                used = changed_load in truck_loads or any(len(loads[load]) > 0 for load in truck_loads)
+                current_time = max(departures[truck], heapq.heappop(drivers)) if used else departures[truck]
+                driven = False
+                for load in truck_loads:
+                    starts[load] = current_time + self.reload_time if driven else current_time
+                    if load >= truck_count:
+                        starts[load] = max(starts[load], changed_ready if load == changed_load else ready[load])
+                    if load == changed_load or len(loads[load]) > 0:
+                        route = changed_route if load == changed_load else route_of(load)
+                        current_time = starts[load] + route[0]
+                        driven = True
+                if used:
+                    heapq.heappush(drivers, current_time)
+            return starts
+
+        def current_schedule():
+            if estimated_departures[0] is None:
+                estimated_departures[0] = schedule()
+            return estimated_departures[0]
+
+        # A unit keeps the deadlines on a load when, with the estimated times the loads leave, it is on time itself
+        # and no load has more late packages than before. Without a truck speed the deadlines are not checked.
+        def keeps_deadlines(unit, load):
+            if self.truck_speed is None:
+                return True
+            unit_stops = [(package.deadline_time(), package.location_id) for package in unit.packages
+                          if package.deadline_time() is not None]
+            new_locations = [location for location in unit.locations if location not in load_locations[load]]
+            if len(unit_stops) == 0 and (len(new_locations) == 0 or
+                                         not any(len(stops) > 0 for stops in deadline_stops)):
+                return True
+            before = current_schedule()
+            route = self.route_estimate(deadline_stops[load] + unit_stops, list(load_locations[load]) + new_locations)
+            after = schedule(load, route, max(ready[load], unit.available_time))
+            for other in range(load_count):
+                late_before = bisect.bisect_left(route_of(other)[1], before[other])
+                late_after = bisect.bisect_left((route if other == load else route_of(other))[1], after[other])
+                if late_after > late_before:
+                    return False
+            return True
+
+        def departure_order(load):
+            if self.truck_speed is None:
+                return load // truck_count, departures[load % truck_count], load
+            return current_schedule()[load], load
+
+        def no_room(unit):
+            message = f'No truck has room for package {unit.packages[0].id}'
+            if len(unit.packages) > 1:
+                message += f' and the {len(unit.packages) - 1} packages it must be delivered with'
+            return ValueError(message + '.')
+
+        flexible_units = []
+        reserved_units = []
+        reserved = [[0, 0] for _ in range(truck_count)]
+        for unit in units:
+            if unit.required_truck is None:
+                flexible_units.append(unit)
+                continue
+            truck = unit.required_truck - 1
+            if truck >= truck_count:
+                raise ValueError(f'Package {unit.packages[0].id} can only be on truck {unit.required_truck} but the '
+                                 f'fleet only has {truck_count} trucks.')
+            if unit.deadline is None and unit.available_time <= self.day_start:
+                # Without a deadline or a delay the unit does not change when its truck leaves, so it waits until the
+                # deadline packages are placed and room is kept for it on its truck until then.
+                reserved_units.append(unit)
+                reserved[truck][0] += len(unit.packages)
+                reserved[truck][1] += unit.weight
+                continue
+            load = next((load for load in range(truck, load_count, truck_count) if fits(unit, load)), None)
+            if load is None:
+                raise no_room(unit)
+            departures[truck] = max(departures[truck], unit.available_time)
+            place(unit, load)
+
+        deadline_units = [unit for unit in flexible_units if unit.deadline is not None]
+        deadline_units.sort(key=lambda unit: (unit.deadline, -len(unit.packages)))
+        for unit in deadline_units:
+            candidates = [load for load in sorted(range(load_count), key=departure_order) if eligible(unit, load)]
+            if len(candidates) == 0:
+                raise no_room(unit)
+            best_load = next((load for load in candidates if keeps_deadlines(unit, load)), candidates[0])
+            zone_truck = self.zones.get(unit.locations[0])
+            if zone_truck is not None and zone_truck < truck_count:
+                zone_load = best_load - best_load % truck_count + zone_truck
+                if same_departure(zone_load, best_load) and eligible(unit, zone_load) and \
+                        keeps_deadlines(unit, zone_load):
+                    best_load = zone_load
+            for location in unit.locations:
+                for load in location_loads.get(location, ()):
+                    if same_departure(load, best_load) and eligible(unit, load) and keeps_deadlines(unit, load):
+                        best_load = load
+                        break
+            place(unit, best_load)
+
+        for unit in reserved_units:
+            truck = unit.required_truck - 1
+            load = next((load for load in range(truck, load_count, truck_count) if fits(unit, load)), None)
+            if load is None:
+                raise no_room(unit)
+            reserved[truck][0] -= len(unit.packages)
+            reserved[truck][1] -= unit.weight
+            place(unit, load)
+
+        units_by_location = {}
+        for unit in flexible_units:
+            if unit.deadline is None:
+                units_by_location.setdefault(unit.locations[0], []).append(unit)
+        distance = self.distance_matrix.distance
+        locations = sorted(units_by_location, key=lambda location: -distance(self.hub_location, location))
+
+        closest_anchor = {}
+        for location in locations:
+            closest_anchor[location] = min([distance(anchor, location) for load_anchors in anchors
+                                            for anchor in load_anchors], default=distance(self.hub_location, location))
+        for load in range(truck_count):
+            if len(anchors[load]) > 0:
+                continue
+            seed = None
+            for location in locations:
+                if seed is None or closest_anchor[location] > closest_anchor[seed]:
+                    seed = location
+            if seed is None:
+                break
+            anchors[load].append(seed)
+            for location in locations:
+                closest_anchor[location] = min(closest_anchor[location], distance(seed, location))
+
+        # Times the units placed by location become available after the start of the day, and for each of them the
+        # packages available from then on that are not placed yet and the room on the loads leaving late enough.
+        waiting_times = sorted(set([unit.available_time for location in locations
+                                    for unit in units_by_location[location] if unit.available_time > self.day_start]))
+        needed = dict.fromkeys(waiting_times, 0)
+        free = {}
+        for available_time in waiting_times:
+            free[available_time] = sum([room[load] for load in range(load_count) if leaves_after(load, available_time)])
+        for location in locations:
+            for unit in units_by_location[location]:
+                for available_time in waiting_times:
+                    if available_time > unit.available_time:
+                        break
+                    needed[available_time] += len(unit.packages)
+
+        def keeps_room_for_waiting(unit, load):
+            for available_time in waiting_times:
+                if not leaves_after(load, available_time):
+                    break
+                if needed[available_time] > free[available_time] - len(unit.packages):
+                    return False
+            return True
+
+        for location in locations:
+            load_distances = []
+            for load in range(load_count):
+                if location in load_locations[load]:
+                    load_distance = -2.0
+                elif self.zones.get(location) == load % truck_count:
+                    load_distance = -1.0
+                elif len(anchors[load]) == 0:
+                    load_distance = float('inf')
+                else:
+                    load_distance = min([distance(anchor, location) for anchor in anchors[load]])
+                load_distances.append((load // truck_count, load_distance, load))
+            load_distances.sort()
+            for unit in units_by_location[location]:
+                for available_time in waiting_times:
+                    if available_time > unit.available_time:
+                        break
+                    needed[available_time] -= len(unit.packages)
+                best_load = None
+                for trip, load_distance, load in load_distances:
+                    if eligible(unit, load) and keeps_room_for_waiting(unit, load) and keeps_deadlines(unit, load):
+                        best_load = load
+                        break
+                if best_load is None:
+                    best_load = next((load for trip, load_distance, load in load_distances
+                                      if eligible(unit, load) and keeps_room_for_waiting(unit, load)), None)
+                if best_load is None:
+                    best_load = next((load for trip, load_distance, load in load_distances if eligible(unit, load)),
+                                     None)
+                if best_load is None:
+                    raise no_room(unit)
+                place(unit, best_load)
+                for available_time in waiting_times:
+                    if not leaves_after(best_load, available_time):
+                        break
+                    free[available_time] -= len(unit.packages)
+
+        plans = []
+        for truck in range(truck_count):
+            trips = []
+            for load in range(truck, load_count, truck_count):
+                levels = {}
+                for package in loads[load]:
+                    levels.setdefault(package.deadline_time(), []).append(package.id)
+                timed = sorted(deadline for deadline in levels if deadline is not None)
+                priority_levels = [levels[deadline] for deadline in timed]
+                if None in levels:
+                    priority_levels.append(levels[None])
+                if len(priority_levels) > 0 or len(trips) == 0:
+                    trips.append(priority_levels)
+            plans.append(TruckLoadPlan(departures[truck], trips[0], trips))
+        return plans
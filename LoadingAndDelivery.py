@@ -1,364 +1,985 @@
 """
-This class is responsible for loading the package data into the hashtable, the distance data into the adjacency
-matrix and the matrix key list. Also, this class then loads the trucks using a prioritized nearest neighbor
-algorithm. Finally, this class runs the delivery simulations that are requested by the user using the command prompt
-user interface.
+This class is responsible for loading the package data into the hashtable and the distance data into the distance
+matrix. Also, this class then loads the trucks using a prioritized nearest neighbor algorithm. Finally, this class
+simulates the delivery day once into a timeline and answers the requests made by the user using the command prompt user
+interface from it. Times in the simulation are integer milliseconds since midnight.
 """
+import copy
 import Truck
-import Package
 import HashTable
-import csv
-import datetime
+import DistanceMatrix
+import DistanceResolver
+import DeliveryTimeline
+import VectorizedRouting
+import CandidateNeighbors
+import ExactRouting
+import ZoneClustering
+import Instrumentation
+import RouteImprovement
+import Fleet
+import LoadPlanner
+import LiveEvents
+import PackageIngest
+import RoadNetwork
+import TimeWindowRouting
+import SimulationTime
 
 
 class LoadingAndDelivery:
-    # The three delivery trucks.
-    truck_1 = Truck.Truck()
-    truck_2 = Truck.Truck()
-    truck_3 = Truck.Truck()
-    # Package hash table using the Hash Table class.
-    package_hash_table = HashTable.DirectHashTable()
+    # Number of drivers available to drive the trucks.
+    driver_count = 2
+    # Time the delivery day starts.
+    day_start = SimulationTime.clock(8)
     # Truck speed in miles per second.
     truck_speed = 0.005
-    # Adjacency matrix containing the distances between nodes.
-    distance_adjacency_matrix = []
-    for i in range(27):
-        distance_adjacency_matrix.append([])
-    # Key for the adjacency matrix.
-    distance_adjacency_key = []
+    # Time it takes to load a truck again when it comes back to the hub between trips.
+    reload_time = SimulationTime.clock(minutes=10)
+    # Address corrections received during the day: the time received, the package id and the address listed for the 
+    # package before the correction. Packages are loaded with their corrected address from the package file, and a 
+    # correction only applies to a package whose special notes say its address is wrong.
+    address_corrections = [(SimulationTime.clock(10, 20), 9, ('300 State St', 'Salt Lake City', 'UT', '84103'))]
 
     """
-    This initializes the Loading and Delivery class objects, executing the load_package_data, load_distance_data, 
-    and load_trucks_set_departure functions utilizing the provided package file and distance file.
+    This initializes the Loading and Delivery class objects, executing the load_distance_data, load_package_data, 
+    load_trucks_set_departure and build_delivery_timeline functions utilizing the provided package file and distance 
+    file. The distances are loaded first so every package can be given its location id as it is loaded, and all of the 
+    state of the simulation belongs to the instance, so separate instances can run side by side. The options, in the 
+    order of the arguments, are:
+    Improve routes, when True, improves the loaded routes with improve_truck_routes before the day is simulated.
+    Improvement time budget is the most seconds the route improvement spends on each truck.
+    Truck count is the number of trucks in the fleet.
+    Driver count is the number of drivers, each driving one truck at a time.
+    Truck speed, in miles per second, replaces the default speed when it is supplied.
+    Departure times, one for each truck, replace the departure times planned from the packages when they are supplied.
+    Distance matrix is an already loaded distance matrix used in place of the distance file, so it can be shared 
+    between instances, and is left open by close.
+    Truck capacity is the most packages a truck holds on a trip.
+    Use distance cache, when True, loads the distance file through its binary cache, which is mapped in place on later 
+    starts.
+    Time window routing, when True, routes each truck with route_with_time_windows to meet the package deadlines in 
+    place of the prioritized nearest neighbor loading.
+    Routing time budget is the most seconds the time window routing spends on each truck.
+    Neighbor count, when supplied, finds the nearest neighbors of every location once, so the loading and route 
+    improvement only look at that many nearby stops at a time.
+    Zone clustering, when True, splits the package locations into one zone for each truck and loads each truck with the 
+    packages of its zone where the constraints allow.
+    Instrumentation, when supplied, records the time, distance lookups and counters of every stage and truck.
+    Distance cache rows, when supplied, reads the distances from the binary cache file of the distance file as they are 
+    needed and keeps at most that many rows in memory, for distance files too large to hold in memory.
+    Hub key is the location key of the hub the trucks leave from and return to.
+    Road network, when True, reads the distance file as the edge list of a road network and finds the distances between 
+    the hub and the package addresses by its shortest paths.
+    Truck weight capacity, when supplied, is the most kilos a truck holds on a trip.
+    Trip count is the most trips each truck makes, coming back to the hub to be loaded again when its packages do not 
+    fit on one trip.
+    Exact route stops, when supplied, orders each priority level going to at most that many distinct locations by the 
+    exact routing instead of nearest neighbor.
+    Address corrections, as (time received, package id, listed address) tuples, replace the ones of the sample day when 
+    they are supplied.
+    Arrival times, as a dictionary of package ids to the time each package reaches the hub, take the place of the time 
+    in the notes of a package delayed on a flight.
     """
-    def __init__(self, package_filename, distance_filename):
-        self.load_package_data(package_filename)
-        self.load_distance_data(distance_filename)
-        self.load_trucks_set_departure()
+    def __init__(self, package_filename, distance_filename, improve_routes=False, improvement_time_budget=1.0,
+                 truck_count=3, driver_count=2, truck_speed=None, departure_times=None, distance_matrix=None,
+                 truck_capacity=16, use_distance_cache=False, time_window_routing=False, routing_time_budget=1.0,
+                 neighbor_count=None, zone_clustering=False, instrumentation=None, distance_cache_rows=None,
+                 hub_key='HUB', road_network=False, truck_weight_capacity=None, trip_count=1, exact_route_stops=None,
+                 address_corrections=None, arrival_times=None):
+        # Instrumentation the stages are recorded in, None when it is off.
+        self.instrumentation = instrumentation
+        # Most rows of distances kept in memory, None to hold the whole matrix in memory or in a mapped file.
+        self.distance_cache_rows = distance_cache_rows
+        # Location key of the hub the trucks leave from and return to.
+        self.hub_key = hub_key
+        # Whether the distance file is an edge list of a road network rather than a full distance file.
+        self.road_network = road_network
+        self.distance_filename = distance_filename
+        if truck_count < 1 or driver_count < 1:
+            raise ValueError('The fleet needs at least one truck and one driver.')
+        if departure_times is not None and len(departure_times) != truck_count:
+            raise ValueError('A departure time is needed for every truck.')
+        if trip_count < 1:
+            raise ValueError('Every truck needs at least one trip.')
+        if trip_count > 1 and time_window_routing:
+            raise ValueError('Time window routing plans one trip for each truck.')
+        # The delivery trucks.
+        self.trucks = [Truck.Truck(Truck.Truck.name_for_number(number + 1), truck_capacity, truck_weight_capacity)
+                       for number in range(truck_count)]
+        # Most trips each truck makes, coming back to the hub to be loaded again between them.
+        self.trip_count = trip_count
+        self.driver_count = driver_count
+        if truck_speed is not None:
+            self.truck_speed = truck_speed
+        # Planned departure time of each truck, or None to plan them from the packages.
+        self.departure_times = departure_times
+        # Package hash table using the Hash Table class.
+        self.package_hash_table = HashTable.DirectHashTable()
+        # Symmetric float matrix containing the distances between nodes, indexed by location id.
+        self.distance_matrix = None
+        # Location id of the hub in the distance matrix.
+        self.hub_location = 0
+        # NumPy backend for nearest neighbor and route miles, None when NumPy is not installed.
+        self.vectorized_routing = None
+        # Nearest neighbors of every location used to limit the routing to nearby stops, None to look at every stop.
+        self.neighbor_count = neighbor_count
+        self.candidate_neighbors = None
+        # Most distinct locations of a priority level ordered by the exact routing, None to always use nearest neighbor.
+        self.exact_route_stops = exact_route_stops
+        self.exact_routing = None
+        self.zone_clustering = zone_clustering
+        # Timeline of the simulated delivery day used to answer the time queries.
+        self.delivery_timeline = None
+        # Miles saved on each truck by the route improvement, empty when the routes were not improved.
+        self.miles_saved = {}
+        self.improve_routes = improve_routes
+        self.time_window_routing = time_window_routing
+        self.routing_time_budget = routing_time_budget
+        self.improvement_time_budget = improvement_time_budget
+        # Package manifest and the ingestor that streams it into the hash table.
+        self.package_filename = package_filename
+        self.manifest_ingestor = PackageIngest.ManifestIngestor()
+        if address_corrections is not None:
+            self.address_corrections = list(address_corrections)
+        # Corrected address of each package in the address corrections, as loaded from the manifest.
+        self.corrected_addresses = {}
+        # Address changes received as live events, as (time received, package id, old address, new address) tuples.
+        self.address_changes = []
+        # Time each package reported as arriving late reaches the hub.
+        self.arrival_times = {} if arrival_times is None else dict(arrival_times)
+        # Time each cancelled package was cancelled.
+        self.cancellations = {}
+        # Load planner of the current plan, kept for the package constraints when live events are applied.
+        self.load_planner = None
+
+        # Whether the distance matrix was opened here and is closed with close, rather than supplied by the caller.
+        self.owns_distance_matrix = distance_matrix is None
+        try:
+            if distance_matrix is None:
+                self.load_distance_data(distance_filename, use_distance_cache)
+            else:
+                self.use_distance_matrix(distance_matrix)
+            self.load_package_data(package_filename)
+            self.load_trucks_set_departure()
+            if improve_routes:
+                self.improve_truck_routes(improvement_time_budget)
+            self.build_delivery_timeline()
+        except Exception:
+            self.close()
+            raise
+
+    """
+    This method closes the distance matrix when it was opened by the instance, such as a disk distance matrix reading 
+    its cache file, and leaves a distance matrix supplied by the caller open.
+    This has a Big O space and time complexity of O(1).
+    """
+    def close(self):
+        if self.owns_distance_matrix and self.distance_matrix is not None:
+            self.distance_matrix.close()
+
+    """
+    This method returns the instance at the start of a with statement, which closes it at the end.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __enter__(self):
+        return self
 
     """
-    This method loads the pacakge data into the package hash table.
-    The Big O runtime complexity is O(N), with the for loop running once for each package in the file.
+    This method closes the instance at the end of a with statement.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+    """
+    This method loads the pacakge data into the package hash table, streaming the manifest through the manifest 
+    ingestor. Only packages that are new or changed since the last load are built and added, and packages that are no 
+    longer in the manifest are removed. Returns the number of added, changed, unchanged, removed and duplicate 
+    packages.
+    The Big O runtime complexity is O(N) to read the N rows of the file, with only the changed rows being built into 
+    packages and added to the hash table.
     The Big O space complexity is O(N), because the hash table that everything is loaded into has a space complexity 
     of O(N).
     """
     def load_package_data(self, filename):
-        with open(filename) as packages:
-            package_data = csv.reader(packages, delimiter=',')
-            next(package_data)
-            for package in package_data:
-                package_id = int(package[0])
-                address = package[1]
-                city = package[2]
-                state = package[3]
-                zip_code = package[4]
-                delivery_deadline = package[5]
-                weight = int(package[6])
-                notes = package[7]
-                if notes == 'Delayed on flight---will not arrive to depot until 9:05 am':
-                    delivery_status = 'in route to hub'
-                else:
-                    delivery_status = 'at hub'
-                new_package = Package.Package(package_id, address, city, state, zip_code, delivery_deadline, weight,
-                                              notes, delivery_status)
+        with self.instrument('load_package_data'):
+            corrected_ids = set(package_id for correction_time, package_id, listed_address
+                                in self.address_corrections)
+            for new_package in self.manifest_ingestor.ingest(filename):
+                new_package.set_delivery_status(self.initial_status(new_package))
+                self.resolve_location(new_package)
                 self.package_hash_table.add(new_package)
+                if new_package.id in corrected_ids and \
+                        LoadPlanner.LoadPlanner.wrong_address_pattern.search(new_package.special_notes) is not None:
+                    self.corrected_addresses[new_package.id] = (new_package.address, new_package.city,
+                                                                new_package.state, new_package.zip)
+                else:
+                    self.corrected_addresses.pop(new_package.id, None)
+            for package_id in self.manifest_ingestor.removed_ids:
+                self.package_hash_table.remove(self.package_hash_table.search(package_id))
+                self.corrected_addresses.pop(package_id, None)
+            if self.instrumentation is not None:
+                for name, amount in self.manifest_ingestor.counts.items():
+                    self.instrumentation.count('load_package_data', name + '_packages', amount)
+            return self.manifest_ingestor.counts
 
     """
-    This method loads the distances into the distance adjacency matrix and the address keys into the key list.
+    This method returns the status a package has at the start of the day, which is in route to hub for a package that 
+    reaches the hub after the day starts and at hub for every other package.
+    This has a Big O space and time complexity of O(1).
+    """
+    def initial_status(self, package):
+        if self.hub_arrival_time(package) > self.day_start:
+            return 'in route to hub'
+        return 'at hub'
+
+    """
+    This method returns the time the supplied package reaches the hub: the time reported by a late arrival event, or 
+    else the time in its special notes when it is delayed on a flight, or else the start of the day.
+    This has a Big O space and time complexity of O(1).
+    """
+    def hub_arrival_time(self, package):
+        if package.id in self.arrival_times:
+            return self.arrival_times[package.id]
+        delayed_until = LoadPlanner.LoadPlanner.delayed_until(package.special_notes)
+        if delayed_until is None or delayed_until < self.day_start:
+            return self.day_start
+        return delayed_until
+
+    """
+    This method returns the time every one of the supplied packages of a trip has reached the hub, so the trip can be 
+    loaded, or the start of the day for a trip without packages.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(1).
+    """
+    def trip_ready_time(self, packages):
+        return max([self.hub_arrival_time(package) for package in packages], default=self.day_start)
+
+    """
+    This method imports the package manifest again, by default the file the class was initialized with. When any 
+    package was added, changed or removed, the trucks are emptied, loaded again and the day is simulated again, and 
+    when nothing changed the current loads and timeline are kept. The reload is built on a staged copy of the 
+    packages, trucks and manifest fingerprints and only swapped in once it is complete, so a manifest that cannot be 
+    read or planned raises its error and leaves the day as it was. Returns the number of added, changed, unchanged 
+    and removed packages.
+    The Big O runtime complexity is O(N) to read the manifest when nothing changed, and O(N^2) to load the trucks again 
+    when something did.
+    The Big O space complexity is O(N).
+    """
+    def reload_package_data(self, filename=None):
+        with self.instrument('reload_package_data'):
+            if filename is None:
+                filename = self.package_filename
+            staged = self.staged_copy()
+            if staged.road_network:
+                new_keys = [key for key in staged.manifest_location_keys(filename)
+                            if key not in staged.distance_matrix.key_index]
+                if len(new_keys) > 0:
+                    staged.load_road_network(staged.distance_filename, staged.distance_matrix.keys + new_keys)
+            counts = staged.load_package_data(filename)
+            staged.package_filename = filename
+            if counts['added'] > 0 or counts['changed'] > 0 or counts['removed'] > 0:
+                staged.trucks = [Truck.Truck(truck.name, truck.capacity, truck.weight_capacity)
+                                 for truck in self.trucks]
+                staged.miles_saved = {}
+                staged.load_trucks_set_departure()
+                if staged.improve_routes:
+                    staged.improve_truck_routes(staged.improvement_time_budget)
+                staged.build_delivery_timeline()
+            self.__dict__.update(staged.__dict__)
+            return counts
+
+    """
+    This method returns a copy of the instance for a reload to be built on, sharing the packages, trucks and distances 
+    but with its own package hash table, manifest fingerprints and corrected addresses, so loading packages into the 
+    copy leaves the instance as it was.
+    This has a Big O space and time complexity of O(N), with N being the number of packages.
+    """
+    def staged_copy(self):
+        staged = copy.copy(self)
+        staged.package_hash_table = copy.copy(self.package_hash_table)
+        staged.package_hash_table.buckets = list(self.package_hash_table.buckets)
+        staged.manifest_ingestor = copy.copy(self.manifest_ingestor)
+        staged.manifest_ingestor.fingerprints = dict(self.manifest_ingestor.fingerprints)
+        staged.corrected_addresses = dict(self.corrected_addresses)
+        return staged
+
+    """
+    This method loads the distances into the distance matrix, giving every address key an integer location id. When 
+    use cache is True the matrix is mapped from the binary cache of the distance file, which is made the first time. 
+    With distance cache rows the binary cache is always used, and its distances are read from the file as needed. 
+    With a road network the distance file is an edge list, and only the distances between the hub and the addresses 
+    in the package file are found, with load_road_network.
     This has a Big O time complexity of O(N^2), because it has to go through N rows and N columns to add all of the 
-    data to the adjacency matrix.
-    This has a Big O space complexity of O(N^2), because it is a nested list that has N indices, each index having a 
-    list with N indices. The adjacency key list has O(N) for space complexity so the final complexity ends up being 
-    O(N^2).
-    """
-    def load_distance_data(self, filename):
-        with open(filename) as distances:
-            distance_data = csv.reader(distances, delimiter=',')
-            current_row = 0
-            next(distance_data)
-            for distance in distance_data:
-                self.distance_adjacency_key.append(distance[0])
-                for i in range(27):
-                    cell = i + 1
-                    self.distance_adjacency_matrix[current_row].append(distance[cell])
-                current_row += 1
-
-    """
-    This method is used to print all of the packages in the package hash table.
+    data to the matrix, or O(B) to check the B bytes of the distance file against the cache when it is used.
+    This has a Big O space complexity of O(N^2), because the matrix holds a float for every pair of the N locations, 
+    which stay in the mapped file when the cache is used.
+    """
+    def load_distance_data(self, filename, use_cache=False):
+        with self.instrument('load_distance_data'):
+            if self.road_network:
+                self.load_road_network(filename, [self.hub_key] + self.manifest_location_keys(self.package_filename))
+            elif self.distance_cache_rows is not None:
+                self.use_distance_matrix(DistanceMatrix.DistanceMatrix.load(filename, mapped=False))
+            elif use_cache:
+                self.use_distance_matrix(DistanceMatrix.DistanceMatrix.load(filename))
+            else:
+                self.use_distance_matrix(DistanceMatrix.DistanceMatrix.from_csv(filename))
+
+    """
+    This method fills the distance matrix with the shortest road miles between the supplied location keys of the road 
+    network in the supplied edge list file, which are searched in parallel and kept in the binary cache of the edge 
+    list, so an unchanged network and set of locations is not searched again. The keys keep their order, so the 
+    packages already loaded keep their location ids when keys are added to the end.
+    This has a Big O time complexity of O(S * (V + E) log V / P), with S being the number of location keys, V and E 
+    the number of nodes and roads of the network and P the number of cores, or O(B) to check the B bytes of the edge 
+    list against the cache.
+    This has a Big O space complexity of O(V + E + S^2).
+    """
+    def load_road_network(self, filename, location_keys):
+        unique_keys = list(dict.fromkeys(location_keys))
+        self.use_distance_matrix(RoadNetwork.RoadNetwork.load(filename, unique_keys))
+
+    """
+    This method returns the distance matrix key of every package address in the supplied package file, in the order 
+    they are first listed.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(L), with L being the number of addresses.
+    """
+    def manifest_location_keys(self, filename):
+        keys = {}
+        for line_number, row in PackageIngest.ManifestIngestor.read_manifest(filename):
+            keys[self.convert_package_to_key(PackageIngest.ManifestIngestor.build_package(line_number, row))] = None
+        return list(keys)
+
+    """
+    This method sets the supplied distance matrix as the one used for routing, finding the hub location in it, 
+    creating the vectorized routing when NumPy is available, finding the candidate neighbors of every location 
+    when there is a neighbor count and creating the exact routing when there are exact route stops. With distance 
+    cache rows the matrix is used through a distance resolver that keeps that many rows in memory, and with 
+    instrumentation through a view that counts its lookups.
+    This has a Big O space and time complexity of O(1), because the matrix is shared rather than copied, or 
+    O(L^2) time and O(L * K) space with L locations and K candidate neighbors.
+    """
+    def use_distance_matrix(self, distance_matrix):
+        if self.distance_cache_rows is not None and not isinstance(distance_matrix, DistanceResolver.DistanceResolver):
+            distance_matrix = DistanceResolver.DistanceResolver(distance_matrix, self.distance_cache_rows)
+        if self.instrumentation is not None:
+            distance_matrix = self.instrumentation.wrap_distance_matrix(distance_matrix)
+        self.distance_matrix = distance_matrix
+        self.hub_location = self.distance_matrix.location_id(self.hub_key)
+        if VectorizedRouting.VectorizedRouting.available() and self.distance_matrix.distances is not None:
+            self.vectorized_routing = VectorizedRouting.VectorizedRouting(self.distance_matrix)
+        if self.neighbor_count is not None:
+            with self.instrument('build_candidate_neighbors'):
+                self.candidate_neighbors = CandidateNeighbors.CandidateNeighbors(self.distance_matrix,
+                                                                                 self.neighbor_count)
+        if self.exact_route_stops is not None:
+            self.exact_routing = ExactRouting.ExactRouting(self.distance_matrix, self.exact_route_stops)
+
+    """
+    This method returns the hits, misses and evictions of the distance resolver as a dictionary, or None when the 
+    whole matrix is held in memory.
+    This has a Big O space and time complexity of O(1).
+    """
+    def distance_cache_statistics(self):
+        distance_matrix = self.distance_matrix
+        if isinstance(distance_matrix, Instrumentation.CountingDistanceMatrix):
+            distance_matrix = distance_matrix.source
+        if not isinstance(distance_matrix, DistanceResolver.DistanceResolver):
+            return None
+        return distance_matrix.statistics()
+
+    """
+    This method returns the timer for one run of the supplied stage, for the supplied truck name or for the whole 
+    stage when it is None, or a context that does nothing when instrumentation is off.
+    This has a Big O space and time complexity of O(1).
+    """
+    def instrument(self, stage, truck=None):
+        if self.instrumentation is None:
+            return Instrumentation.disabled
+        return self.instrumentation.stage(stage, truck)
+
+    """
+    This method is used to print all of the packages in the package hash table, or the supplied packages instead.
     This has a Big O time complexity of O(N), because it has to go through N packages and print them all.
     This has a Big O space complexity of O(1).
     """
-    def print_all_packages(self):
+    def print_all_packages(self, packages=None):
         print('{:2>4} | {:<45} | {:<20} | {:>5} | {:>5} | {:<6} | {:<8} | {}'.format('ID', 'Address', 'City',
                                                                                      'State', 'Zip', 'weight',
                                                                                      'Deadline', 'Status'))
-        for i in range(self.package_hash_table.capacity - 1):
-            print(self.package_hash_table.search(i + 1))
+        if packages is None:
+            packages = self.package_hash_table.packages()
+        for package in packages:
+            print(package)
 
     """
-    This method takes in the number of miles driven and returns how long it will take using the miles per second speed.
+    This method takes in the number of miles driven and returns how many milliseconds it will take using the miles per 
+    second speed.
     This has a Big O space and time complexity of O(1).
     """
     def time_taken(self, miles):
-        hours = 0
-        minutes = 0
-        seconds = miles / self.truck_speed
-
-        if seconds >= 60:
-            minutes = seconds / 60
-            seconds = seconds % 60
-        if minutes >= 60:
-            hours = minutes / 60
-            minutes = minutes % 60
-
-        return int(hours), int(minutes), int(seconds)
+        return SimulationTime.travel_time(miles, self.truck_speed)
 
     """
-    This method takes two locations and finds them in the adjacency key and then uses the two index values to get the 
-    miles between the two locations.
-    This has a Big O time complexity of O(N), because it has to search the list for the supplied address, 
-    which it might have to go through the entire list to find it making it O(N). Whereas using the indexes from the key 
-    you search 2 possible locations in the adjacency matrix making that part O(1). 
+    This method takes two location keys, finds their location ids and uses them to get the miles between the two 
+    locations.
+    This has a Big O space and time complexity of O(1), because the location ids come from a dictionary and the miles 
+    come from a single index into the distance matrix.
     """
     def distance_between_nodes(self, location_1, location_2):
-        index_1 = self.distance_adjacency_key.index(location_1)
-        index_2 = self.distance_adjacency_key.index(location_2)
-
-        if self.distance_adjacency_matrix[index_1][index_2] == '':
-            return float(self.distance_adjacency_matrix[index_2][index_1])
-        else:
-            return float(self.distance_adjacency_matrix[index_1][index_2])
+        return self.distance_matrix.distance(self.distance_matrix.location_id(location_1),
+                                             self.distance_matrix.location_id(location_2))
 
     """
     This method takes a package and converts the address of the pacakge and the zip from the package into the key for 
-    the adjacency list.
+    the distance matrix.
     This has a Big O space and time complexity of O(1).
     """
-    def convert_package_to_key(self, package):
+    @staticmethod
+    def convert_package_to_key(package):
         key_string = package.address + ' ' + '(' + package.zip + ')'
         return key_string
 
+    """
+    This method sets the location id of the supplied package from its current address, it is called when the package 
+    is loaded and whenever its delivery address changes. An address that is not in the distance data raises a 
+    ValueError.
+    This has a Big O space and time complexity of O(1).
+    """
+    def resolve_location(self, package):
+        key = self.convert_package_to_key(package)
+        try:
+            package.location_id = self.distance_matrix.location_id(key)
+        except KeyError:
+            raise ValueError(f'Package {package.id} is going to {key}, which is not in the distance data.') from None
+
     """
     nearest_neighbor algorithm based off of (Weru, 2021).
     This method finds the next closes package to deliver when supplied with the starting package, a list of possible 
-    next packages, and a code telling if the the truck is just leaving the hub so it can use 'HUB' as the adjacency key.
+    next packages, and a code telling if the the truck is just leaving the hub so it can start from the hub location.
     This has a Big O time complexity of O(N), it has to go through every package in the package list to make sure it 
     chooses the closest next delivery.
     This has a Big O space complexity of O(N), for the package list being used.
     """
     def nearest_neighbor(self, starting_package, package_list, code):
-        distance = 140.0
+        distance = float('inf')
         closest_index = -1
         if code == 'HUB':
-            for i in range(len(package_list)):
-                temp_distance = self.distance_between_nodes('HUB', self.convert_package_to_key(
-                    self.package_hash_table.search(package_list[i])))
-                if temp_distance < distance:
-                    closest_index = i
-                    distance = temp_distance
+            start_location = self.hub_location
         else:
-            for i in range(len(package_list)):
-                temp_distance = self.distance_between_nodes(self.convert_package_to_key(starting_package),
-                                                            self.convert_package_to_key(
-                                                                self.package_hash_table.search(package_list[i])))
-                if temp_distance < distance:
-                    closest_index = i
-                    distance = temp_distance
+            start_location = starting_package.location_id
+        for i in range(len(package_list)):
+            temp_distance = self.distance_matrix.distance(start_location,
+                                                          self.package_hash_table.search(package_list[i]).location_id)
+            if temp_distance < distance:
+                closest_index = i
+                distance = temp_distance
         return closest_index
 
     """
     This method takes three lists of packages with different priority levels, the truck they will be loaded on, 
-    and the estimated departure time of the truck and loads those packages on the truck. It starts by loading all of 
-    the level one priority packages, followed by level two and finally all of the level three packages using the 
-    nearest_neighbor function to pick the next package to load.
-    This has a Big O time complexity of O(N^2), because it has to go through each package making this function O(N), 
-    then it sends it to the nearest neighbor function which is also O(N), making it O(N) * O(N) = O(N^2).
+    and the estimated departure time of the truck and loads those packages on the truck with 
+    priority_load_levels, level one first, followed by level two and finally level three.
+    This has a Big O time complexity of O(N^2), the same as priority_load_levels.
     The Big O space complexity is O(N) for the N number of packages in the lists.
     """
     def priority_load_with_nearest_neighbor(self, level_one_priority, level_two_priority, level_three_priority,
                                             truck, depart_time):
-        last_loaded = None
+        self.priority_load_levels([level_one_priority, level_two_priority, level_three_priority], truck, depart_time)
 
-        while len(level_one_priority) > 0 or len(level_two_priority) > 0 or len(level_three_priority) > 0:
-            if last_loaded is None:
-                code = 'HUB'
-            else:
-                code = 'No code'
-            if len(level_one_priority) != 0:
-                index_to_load = self.nearest_neighbor(last_loaded, level_one_priority, code)
-                package_to_load = self.package_hash_table.search(level_one_priority.pop(index_to_load))
-                truck.loaded_packages.append(package_to_load)
-                last_loaded = package_to_load
-                continue
-            if len(level_two_priority) != 0:
-                index_to_load = self.nearest_neighbor(last_loaded, level_two_priority, code)
-                package_to_load = self.package_hash_table.search(level_two_priority.pop(index_to_load))
-                truck.loaded_packages.append(package_to_load)
-                last_loaded = package_to_load
-                continue
-            if len(level_three_priority) != 0:
-                index_to_load = self.nearest_neighbor(last_loaded, level_three_priority, code)
-                package_to_load = self.package_hash_table.search(level_three_priority.pop(index_to_load))
-                truck.loaded_packages.append(package_to_load)
-                last_loaded = package_to_load
-                continue
-        truck.set_departure_time(depart_time)
+    """
+    This method takes a list of priority levels, each a list of package ids, the truck they will be loaded on, and 
+    the estimated departure time of the truck and loads those packages on the truck. It loads all of the packages of 
+    each level before moving on to the next, picking the next package to load from the candidate neighbors when there 
+    are any, with the vectorized routing when NumPy is available and the nearest_neighbor function when it is not. A 
+    level going to no more locations than the exact route stops is instead ordered by the exact routing, ending at the 
+    hub when it is the last level of the trip.
+    This has a Big O time complexity of O(N^2), because it has to go through each package making this function O(N), 
+    then it finds the nearest neighbor which is also O(N), making it O(N) * O(N) = O(N^2). With NumPy the inner O(N) 
+    is a single vectorized argmin, and with K candidate neighbors it is usually O(K), making it O(N * K). The exact 
+    routing of a level with S locations is O(2^S * S^2), or O(N) when its order was already found.
+    The Big O space complexity is O(N) for the N number of packages in the lists.
+    """
+    def priority_load_levels(self, priority_levels, truck, depart_time):
+        with self.instrument('priority_load_levels', truck.name):
+            # Packages placed by a nearest neighbor pick, counted where the picks are made.
+            nearest_neighbor_picks = 0
+            last_loaded = None
+            last_level = max([level for level in range(len(priority_levels)) if len(priority_levels[level]) > 0],
+                             default=-1)
+
+            for level, priority_list in enumerate(priority_levels):
+                segment_start = len(truck.loaded_packages)
+                if len(priority_list) > 0:
+                    truck.route_segments.append((segment_start, segment_start + len(priority_list)))
+                routing = self.vectorized_routing
+                if self.candidate_neighbors is not None:
+                    routing = self.candidate_neighbors
+                order = None
+                if (routing is not None or self.exact_routing is not None) and len(priority_list) > 0:
+                    packages = [self.package_hash_table.search(package_id) for package_id in priority_list]
+                    if last_loaded is None:
+                        start_location = self.hub_location
+                    else:
+                        start_location = last_loaded.location_id
+                    locations = [package.location_id for package in packages]
+                    if self.exact_routing is not None:
+                        end_location = self.hub_location if level == last_level else None
+                        order = self.exact_routing.order(start_location, locations, end_location)
+                        if order is not None and self.instrumentation is not None:
+                            self.instrumentation.count('priority_load_levels', 'exact_levels', 1, truck.name)
+                    if order is None and routing is not None:
+                        order = routing.nearest_neighbor_order(start_location, locations)
+                        nearest_neighbor_picks += len(order)
+                if order is not None:
+                    for position in order:
+                        truck.loaded_packages.append(packages[position])
+                    last_loaded = packages[order[-1]]
+                    priority_list.clear()
+                    continue
+                while len(priority_list) > 0:
+                    if last_loaded is None:
+                        code = 'HUB'
+                    else:
+                        code = 'No code'
+                    index_to_load = self.nearest_neighbor(last_loaded, priority_list, code)
+                    nearest_neighbor_picks += 1
+                    package_to_load = self.package_hash_table.search(priority_list.pop(index_to_load))
+                    truck.loaded_packages.append(package_to_load)
+                    last_loaded = package_to_load
+            if self.instrumentation is not None:
+                self.instrumentation.count('priority_load_levels', 'nearest_neighbor_picks', nearest_neighbor_picks,
+                                           truck.name)
+            truck.set_planned_departure_time(depart_time)
 
     """
-    This method loads specific packages onto the trucks utilizing priority_load_with_nearest_neighbor, 
-    and the nearest_neighbor methods. It passes the priority package lists to the method and the trucks are loaded 
-    with a priority nearest neighbor.
-    The Big O time complexity is O(N^2) because it calls the priority_load_with_nearest_neighbor method three times.
-    The Big O space complexity is O(N) for the number of packages in the lists.
+    This method returns the total miles of the route of the supplied truck, from the hub through every loaded 
+    package and back to the hub, going back to the hub between trips, using one gather and sum with the vectorized 
+    routing when NumPy is available.
+    This has a Big O time complexity of O(N), with N being the number of packages loaded on the truck.
+    This has a Big O space complexity of O(N) for the list of locations in the route.
+    """
+    def route_miles(self, truck):
+        route = [self.hub_location]
+        for start, end in truck.trip_bounds():
+            route += [package.location_id for package in truck.loaded_packages[start:end]] + [self.hub_location]
+        if self.vectorized_routing is not None:
+            return self.vectorized_routing.route_miles(route)
+        miles = 0.0
+        for i in range(len(route) - 1):
+            miles += self.distance_matrix.distance(route[i], route[i + 1])
+        return miles
+
+    """
+    This method improves the loaded route of every truck with 2-opt and Or-opt moves, keeping the priority levels in 
+    order and not making any deadline package later, and saves the miles saved on each truck in miles_saved. Only 
+    moves near the candidate neighbors of each stop are tried when there are any.
+    This has a Big O time complexity of O(N^2) for each improvement pass, with N being the number of packages on a 
+    truck, and the passes for each truck are limited by the time budget.
+    This has a Big O space complexity of O(N) for the reordered routes.
+    """
+    def improve_truck_routes(self, time_budget=1.0):
+        improver = RouteImprovement.RouteImprover(self.distance_matrix, self.hub_location, self.truck_speed,
+                                                  time_budget, self.candidate_neighbors, self.reload_time,
+                                                  self.trip_ready_time)
+        self.miles_saved = {}
+        for truck in self.trucks:
+            with self.instrument('improve_truck_routes', truck.name):
+                self.miles_saved[truck.name] = improver.improve(truck)
+        return self.miles_saved
+
+    """
+    This method plans the truck loads with the load planner, which reads the special notes of the packages into 
+    constraints and assigns every package that has not been cancelled to a trip of a truck within its capacity, 
+    preferring the truck of its zone with zone clustering, and then loads each trip of each truck with 
+    priority_load_levels using the priority levels and departure time of its plan. Supplied departure times are used 
+    in place of the planned ones. With time window routing the planned packages are routed by route_with_time_windows 
+    instead.
+    The Big O time complexity is O(N^2) because of the prioritized nearest neighbor loading, the planning itself is 
+    O(N log N + L * T) for N packages, L locations and T trucks.
+    The Big O space complexity is O(N) for the number of packages in the plans.
     """
     def load_trucks_set_departure(self):
-        level_one_priority = [15]
-        level_two_priority = [1, 13, 14, 16, 20, 29, 30, 31, 34, 37, 40]
-        level_three_priority = [19, 21, 24]
-        depart_time = datetime.timedelta(hours=8, minutes=0, seconds=0)
-        self.priority_load_with_nearest_neighbor(level_one_priority, level_two_priority, level_three_priority,
-                                                 self.truck_1, depart_time)
-
-        level_one_priority = []
-        level_two_priority = [6, 25]
-        level_three_priority = [3, 4, 8, 10, 11, 17, 18, 23, 28, 32, 33, 36, 38]
-        depart_time = datetime.timedelta(hours=9, minutes=5, seconds=0)
-        self.priority_load_with_nearest_neighbor(level_one_priority, level_two_priority, level_three_priority,
-                                                 self.truck_2, depart_time)
-
-        level_one_priority = []
-        level_two_priority = []
-        level_three_priority = [2, 5, 7, 9, 12, 22, 26, 27, 35, 39]
-        depart_time = datetime.timedelta(hours=10, minutes=20, seconds=0)
-        self.priority_load_with_nearest_neighbor(level_one_priority, level_two_priority, level_three_priority,
-                                                 self.truck_3, depart_time)
-    """
-    This method takes a user entered time, a possible package number, and a code to run the delivery simulation. It 
-    delivers packages that are delivered before the time entered by the user, and returns the report that the user 
-    requested for the delivery status and miles of the deliveries.
-    This has a Big O time complexity of O(N^2), because it resets the trucks and reloads the trucks which has a time 
-    complexity of O(N^2).
-    This has a Big O space complexity of O(N), because of the packages that are loaded.
+        with self.instrument('load_trucks_set_departure'):
+            packages = [package for package in self.package_hash_table.packages()
+                        if package.id not in self.cancellations]
+            zones = None
+            if self.zone_clustering:
+                clustering = ZoneClustering.ZoneClustering(self.distance_matrix, self.hub_location)
+                zones = clustering.zones([package.location_id for package in packages], len(self.trucks))
+            planner = LoadPlanner.LoadPlanner(self.distance_matrix, self.hub_location, self.day_start,
+                                              self.address_corrections, self.arrival_times, zones, self.truck_speed,
+                                              self.driver_count, self.reload_time)
+            self.load_planner = planner
+            plans = planner.plan(packages, len(self.trucks), self.trucks[0].capacity, self.departure_times,
+                                 self.trucks[0].weight_capacity, self.trip_count)
+            if self.time_window_routing:
+                self.route_with_time_windows(planner, plans)
+                return
+            for truck, plan in zip(self.trucks, plans):
+                for priority_levels in plan.trips:
+                    if len(truck.loaded_packages) > 0 and any(len(level) > 0 for level in priority_levels):
+                        truck.trip_starts.append(len(truck.loaded_packages))
+                    self.priority_load_levels(priority_levels, truck, plan.departure_time)
+
+    """
+    This method loads every truck with the packages of its plan and routes them with the time window router, where 
+    the window of each package runs from the time it is available at the hub, read from its special notes by the 
+    supplied planner, to its deadline. The trucks are routed in the order the fleet sends them out, so each route is 
+    built for the time the truck will actually leave once a driver is back at the hub.
+    This has a Big O time complexity of O(N^2), with N being the most packages on one truck, and the routing of each 
+    truck is limited by the routing time budget.
+    This has a Big O space complexity of O(N) for the windows and the routes.
+    """
+    def route_with_time_windows(self, planner, plans):
+        windows = {}
+        for truck, plan in zip(self.trucks, plans):
+            for priority_list in plan.priority_levels:
+                for package_id in priority_list:
+                    package = self.package_hash_table.search(package_id)
+                    windows[package_id] = (planner.parse_constraints(package).available_time, package.deadline_time())
+                    truck.loaded_packages.append(package)
+            truck.set_planned_departure_time(plan.departure_time)
+
+        router = TimeWindowRouting.TimeWindowRouter(self.distance_matrix, self.hub_location, self.truck_speed,
+                                                    self.routing_time_budget)
+        fleet = Fleet.Fleet(self.trucks, self.driver_count)
+
+        def route(truck):
+            with self.instrument('route_with_time_windows', truck.name):
+                router.route(truck, windows)
+        fleet.dispatch(route)
+
+    """
+    This method simulates the whole delivery day once and saves every departure, delivery, return, address change, 
+    late package reaching the hub and cancellation into the delivery timeline. The trucks are sent out by the fleet, 
+    each leaving at its planned departure time or once a driver has returned to the hub, whichever is later.
+    This has a Big O time complexity of O(N log N), with N being the number of packages, for sorting the events.
+    This has a Big O space complexity of O(N) for the events in the timeline.
+    """
+    def build_delivery_timeline(self):
+        with self.instrument('build_delivery_timeline'):
+            if self.instrumentation is not None:
+                self.instrumentation.count('build_delivery_timeline', 'simulation_passes')
+            timeline = DeliveryTimeline.DeliveryTimeline()
+            for package in self.package_hash_table.packages():
+                timeline.set_initial_status(package.id, self.initial_status(package))
+                arrival_time = self.hub_arrival_time(package)
+                if arrival_time > self.day_start:
+                    timeline.add_event(arrival_time, 'arrival', None, package.id, status='at hub')
+            for package_id, cancel_time in self.cancellations.items():
+                timeline.add_event(cancel_time, 'cancellation', None, package_id, status='cancelled')
+            changes = [(correction_time, package_id, listed_address, self.corrected_addresses[package_id])
+                       for correction_time, package_id, listed_address in self.address_corrections
+                       if package_id in self.corrected_addresses] + self.address_changes
+            for change_time, package_id, old_address, new_address in sorted(changes, key=lambda change: change[0]):
+                timeline.add_address_change(change_time, package_id, old_address, new_address)
+
+            fleet = Fleet.Fleet(self.trucks, self.driver_count)
+            fleet.dispatch(lambda truck: self.simulate_truck_run(truck, timeline))
+
+            timeline.finalize()
+            self.delivery_timeline = timeline
+
+    """
+    This method drives the supplied truck through all of its loaded packages and back to the hub, adding the 
+    departure, every delivery and the return to the timeline along with the miles the truck has driven after each. 
+    A truck that makes several trips comes back to the hub after each trip and leaves again with the packages of the 
+    next trip once it has been loaded again, which takes the reload time, and every package of the trip has reached 
+    the hub. Each arrival time is the departure time of the trip plus the time to drive all of the miles of the trip 
+    so far, so rounding does not build up from stop to stop over a long route.
+    This has a Big O time complexity of O(N), with N being the number of packages loaded on the truck.
+    This has a Big O space complexity of O(N) for the events added to the timeline.
+    """
+    def simulate_truck_run(self, truck, timeline):
+        with self.instrument('simulate_truck_run', truck.name):
+            if self.instrumentation is not None:
+                self.instrumentation.count('simulate_truck_run', 'packages_delivered', len(truck.loaded_packages),
+                                           truck.name)
+            truck_name = truck.name
+            loaded_status = truck.loaded_status()
+            departure_time = truck.departure_time
+            trip_start_miles = 0.0
+            for start, end in truck.trip_bounds():
+                trip_packages = truck.loaded_packages[start:end]
+                if start > 0:
+                    departure_time = max(truck.last_delivery_time + self.reload_time,
+                                         self.trip_ready_time(trip_packages))
+                    trip_start_miles = truck.miles_driven
+                timeline.add_event(departure_time, 'departure', truck_name)
+                for package in trip_packages:
+                    timeline.add_event(departure_time, 'loaded', truck_name, package.id, status=loaded_status)
+
+                last_location = self.hub_location
+                for package in trip_packages:
+                    truck.update_miles(self.distance_matrix.distance(last_location, package.location_id))
+                    arrival_time = departure_time + self.time_taken(truck.miles_driven - trip_start_miles)
+                    truck.update_last_delivery_time(arrival_time)
+                    last_location = package.location_id
+                    timeline.add_event(arrival_time, 'delivery', truck_name, package.id, truck.miles_driven,
+                                       truck_name + (' delivered at: ' + SimulationTime.format_clock(arrival_time)))
+
+                truck.update_miles(self.distance_matrix.distance(last_location, self.hub_location))
+                arrival_time = departure_time + self.time_taken(truck.miles_driven - trip_start_miles)
+                truck.update_last_delivery_time(arrival_time)
+                timeline.add_event(arrival_time, 'return', truck_name, miles=truck.miles_driven)
+            truck.update_returned_from_run()
+
+    """
+    This method applies a live event received while the day is under way, an address change, late arrival or 
+    cancellation from LiveEvents, and simulates the day again. Only the remaining route of each truck the event 
+    affects is repaired, the stops a truck has already made or is driving to are kept, and the other trucks keep 
+    their routes. An event for a package that does not exist, was cancelled or was delivered before the event raises 
+    a ValueError. Returns the names of the trucks whose routes were repaired.
+    This has a Big O time complexity of O(N log N), with N being the number of packages, for simulating the day again, 
+    the repair itself is O(N).
+    This has a Big O space complexity of O(N) for the new timeline.
+    """
+    def apply_event(self, event):
+        with self.instrument('apply_event'):
+            package = self.package_hash_table.search(event.package_id)
+            if package is None:
+                raise ValueError(f'Package {event.package_id} was not found.')
+            if package.id in self.cancellations:
+                raise ValueError(f'Package {package.id} was cancelled.')
+            delivery_time = self.delivery_timeline.delivery_time(package.id)
+            if delivery_time is not None and delivery_time < event.time:
+                raise ValueError(f'Package {package.id} was delivered at {SimulationTime.format_clock(delivery_time)}.')
+
+            if event.kind == LiveEvents.AddressChange.kind:
+                repaired = self.apply_address_change(event, package)
+            elif event.kind == LiveEvents.LateArrival.kind:
+                repaired = self.apply_late_arrival(event, package)
+            elif event.kind == LiveEvents.Cancellation.kind:
+                repaired = self.apply_cancellation(event, package)
+            else:
+                raise ValueError(f'{event.kind!r} is not a kind of event.')
+            if self.instrumentation is not None:
+                self.instrumentation.count('apply_event', event.kind.replace(' ', '_') + '_events')
+            self.build_delivery_timeline()
+            return repaired
+
+    """
+    This method changes the address of the package, moving its stop on its truck to the best place in the part of 
+    the route the truck has not driven yet. When the truck is driving to the package it turns to its next best stop. 
+    An address that is not in the distance data raises a ValueError and leaves the package as it was.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(N).
+    """
+    def apply_address_change(self, event, package):
+        old_address = (package.address, package.city, package.state, package.zip)
+        package.change_delivery_address(*event.address)
+        try:
+            self.resolve_location(package)
+        except ValueError:
+            package.change_delivery_address(*old_address)
+            self.resolve_location(package)
+            raise
+        self.address_changes.append((event.time, package.id, old_address, event.address))
+
+        truck, position = self.package_truck(package)
+        if truck is None:
+            return []
+        first_position = min(self.first_open_position(truck, event.time), position)
+        truck.remove_stop(position)
+        self.insert_stop(truck, package, first_position)
+        return [truck.name]
+
+    """
+    This method records the time the package reaches the hub. When the trip carrying it is planned to leave before 
+    then, the package is moved to the truck planned to leave first after it arrives that has not left and has room, 
+    or when there is no such truck, or the package must stay on its truck or with other packages, its truck waits for 
+    it. A package whose trip has already left the hub raises a ValueError, and a package on a later trip of its truck 
+    has not left until that trip does, which waits for it.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(N).
+    """
+    def apply_late_arrival(self, event, package):
+        truck, position = self.package_truck(package)
+        trip_departure_time = None
+        if truck is not None:
+            trip_departure_time = self.delivery_timeline.loaded_time(package.id)
+            if trip_departure_time is None:
+                trip_departure_time = truck.departure_time
+            if trip_departure_time < event.time:
+                raise ValueError(f'Package {package.id} has already left the hub on {truck.name}.')
+        self.arrival_times[package.id] = event.arrival_time
+        package.set_delivery_status(self.initial_status(package))
+        if truck is None:
+            return []
+        # A later trip leaves once the trip before it is back and its packages are at the hub, so it waits for the
+        # package, and the first trip leaves when the truck is planned to leave.
+        if position >= truck.trip_bounds()[0][1]:
+            return [truck.name]
+        if truck.planned_departure_time >= event.arrival_time:
+            return []
+
+        unit = self.load_planner.unit_of.get(package.id)
+        if unit is None or (unit.required_truck is None and len(unit.packages) == 1):
+            candidates = [other for other in self.trucks if other is not truck and
+                          other.planned_departure_time >= event.arrival_time and other.departure_time >= event.time and
+                          other.has_room(0, package.weight)]
+            if len(candidates) > 0:
+                distance = self.distance_matrix.distance
+                target = min(candidates, key=lambda other: (other.planned_departure_time, min(
+                    [distance(stop.location_id, package.location_id) for stop in other.loaded_packages],
+                    default=float('inf'))))
+                truck.remove_stop(position)
+                self.insert_stop(target, package, 0)
+                return [truck.name, target.name]
+        truck.set_planned_departure_time(event.arrival_time)
+        return [truck.name]
+
+    """
+    This method cancels the package, taking its stop out of the route of its truck.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(1).
+    """
+    def apply_cancellation(self, event, package):
+        self.cancellations[package.id] = event.time
+        truck, position = self.package_truck(package)
+        if truck is None:
+            return []
+        truck.remove_stop(position)
+        return [truck.name]
+
+    """
+    This method returns the truck the supplied package is loaded on and its position in the route, or None and None 
+    when it is not loaded.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(1).
+    """
+    def package_truck(self, package):
+        for truck in self.trucks:
+            for position, loaded_package in enumerate(truck.loaded_packages):
+                if loaded_package is package:
+                    return truck, position
+        return None, None
+
+    """
+    This method returns the first position of the route of the supplied truck that can still be changed at the 
+    supplied time. Before the truck leaves the whole route can be changed, and after it leaves the stops it has made 
+    and the stop it is driving to are kept.
+    This has a Big O time complexity of O(N), with N being the number of packages on the truck.
+    This has a Big O space complexity of O(1).
+    """
+    def first_open_position(self, truck, time):
+        if truck.departure_time >= time:
+            return 0
+        position = 0
+        for package in truck.loaded_packages:
+            delivery_time = self.delivery_timeline.delivery_time(package.id)
+            if delivery_time is None or delivery_time >= time:
+                break
+            position += 1
+        return min(position + 1, len(truck.loaded_packages))
+
+    """
+    This method puts the supplied package into the route of the supplied truck, at or after the first position, where 
+    it adds the fewest miles without making any package with a deadline later, using the time window router.
+    This has a Big O time complexity of O(N), with N being the number of packages on the truck.
+    This has a Big O space complexity of O(N).
+    """
+    def insert_stop(self, truck, package, first_position):
+        router = TimeWindowRouting.TimeWindowRouter(self.distance_matrix, self.hub_location, self.truck_speed)
+        budgets = {}
+        for stop in truck.loaded_packages + [package]:
+            deadline = stop.deadline_time()
+            if deadline is not None:
+                budgets[stop.id] = router.mile_budget(deadline, truck.departure_time)
+        position = router.best_position(truck.loaded_packages, package, budgets, first_position)
+        truck.insert_stop(position, package)
+
+    """
+    This method takes a user entered time in milliseconds since midnight, a possible package number, and a code, and 
+    answers the request from the delivery timeline. Packages delivered before the time entered by the user are shown 
+    as delivered, and the report that the user requested for the delivery status and miles of the deliveries is 
+    printed. Each package is shown from a copy holding its state at that time, so the packages themselves keep their 
+    current status and address.
+    This has a Big O time complexity of O(log N) for a single package or the miles, and O(N log N) when printing all 
+    N packages, because each state is found with a binary search of the timeline.
+    This has a Big O space complexity of O(1) for a single package or the miles, and O(N) for the copies when 
+    printing all N packages.
     """
     def run_delivery_simulation(self, provided_time, code, package_number):
-        if provided_time < datetime.timedelta(hours=10, minutes=20, seconds=0):
-            package_to_change = self.package_hash_table.search(9)
-            package_to_change.change_delivery_address('300 State St', 'Salt Lake City', 'UT', '84103')
-        else:
-            print('New address for package nine has been received and updated in the system.')
-        if provided_time > datetime.timedelta(hours=8, minutes=00, seconds=00):
-            last_delivered_package = 'HUB'
-            for package in self.truck_1.loaded_packages:
-                package.set_delivery_status('Loaded in truck one')
-            for package in self.truck_1.loaded_packages:
-                distance = self.distance_between_nodes(last_delivered_package, self.convert_package_to_key(package))
-                h, m, s = self.time_taken(distance)
-                arrival_time = self.truck_1.last_delivery_time + datetime.timedelta(hours=h, minutes=m, seconds=s)
-                if arrival_time < provided_time:
-                    package.package_delivered(arrival_time, 'Truck One')
-                    self.truck_1.update_last_delivery_time(arrival_time)
-                    last_delivered_package = self.convert_package_to_key(package)
-                    self.truck_1.update_miles(distance)
-                else:
-                    break
-            distance = self.distance_between_nodes(last_delivered_package, 'HUB')
-            h, m, s = self.time_taken(distance)
-            arrival_time = self.truck_1.last_delivery_time + datetime.timedelta(hours=h, minutes=m, seconds=s)
-            if arrival_time < provided_time:
-                self.truck_1.update_last_delivery_time(arrival_time)
-                self.truck_1.update_miles(distance)
-                self.truck_1.update_returned_from_run()
-
-        if provided_time > self.truck_2.departure_time:
-            last_delivered_package = 'HUB'
-            for package in self.truck_2.loaded_packages:
-                package.set_delivery_status('Loaded in truck two')
-            for package in self.truck_2.loaded_packages:
-                distance = self.distance_between_nodes(last_delivered_package, self.convert_package_to_key(package))
-                h, m, s = self.time_taken(distance)
-                arrival_time = self.truck_2.last_delivery_time + datetime.timedelta(hours=h, minutes=m, seconds=s)
-                if arrival_time < provided_time:
-                    package.package_delivered(arrival_time, 'Truck Two')
-                    self.truck_2.update_last_delivery_time(arrival_time)
-                    last_delivered_package = self.convert_package_to_key(package)
-                    self.truck_2.update_miles(distance)
-                else:
-                    break
-            distance = self.distance_between_nodes(last_delivered_package, 'HUB')
-            h, m, s = self.time_taken(distance)
-            arrival_time = self.truck_2.last_delivery_time + datetime.timedelta(hours=h, minutes=m, seconds=s)
-            if arrival_time < provided_time:
-                self.truck_2.update_last_delivery_time(arrival_time)
-                self.truck_2.update_miles(distance)
-                self.truck_2.update_returned_from_run()
-        if self.truck_1.returned_from_run and self.truck_2.returned_from_run:
-            if self.truck_1.last_delivery_time < self.truck_2.last_delivery_time:
-                if self.truck_1.last_delivery_time > self.truck_3.departure_time:
-                    self.truck_3.set_departure_time(self.truck_1.last_delivery_time)
+        with self.instrument('run_delivery_simulation'):
+            if self.instrumentation is not None:
+                self.instrumentation.count('run_delivery_simulation', code.replace(' ', '_') + '_queries')
+            timeline = self.delivery_timeline
+            for package_id in timeline.address_changes_received(provided_time):
+                print(f'New address for package {package_id} has been received and updated in the system.')
+
+            truck_miles = [timeline.truck_miles(truck.name, provided_time) for truck in self.trucks]
+            total_miles = sum(truck_miles)
+
+            if code == 'search':
+                print('{:2>4} | {:<45} | {:<20} | {:>5} | {:>5} | {:<6} | {:<8} | {}'.format('ID', 'Address', 'City',
+                                                                                             'State', 'Zip', 'weight',
+                                                                                             'Deadline', 'Status'))
+                package = self.package_hash_table.search(package_number)
+                print(timeline.package_at(package, provided_time))
+                print('')
+
+            if code == 'print all':
+                self.print_all_packages([timeline.package_at(package, provided_time)
+                                         for package in self.package_hash_table.packages()])
+                print('')
+
+            if code == 'search' or code == 'print all' or code == 'miles':
+                for truck, miles in zip(self.trucks, truck_miles):
+                    print(f'{truck.name.capitalize() + " miles:":<20}{miles}')
+                print(f'{"Total miles driven:":<20}{total_miles}')
+
+    """
+    This method returns the total miles driven by every truck over the whole day.
+    This has a Big O time complexity of O(T log N), with T being the number of trucks and N the number of events.
+    This has a Big O space complexity of O(1).
+    """
+    def total_miles(self):
+        end_of_day = SimulationTime.day
+        return sum(self.delivery_timeline.truck_miles(truck.name, end_of_day) for truck in self.trucks)
+
+    """
+    This method returns a list of (package id, lateness) tuples for every package delivered after its deadline, with 
+    the lateness in milliseconds.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(N) for the late packages.
+    """
+    def late_packages(self):
+        late = []
+        for package in self.package_hash_table.packages():
+            deadline = package.deadline_time()
+            delivery_time = self.delivery_timeline.delivery_time(package.id)
+            if deadline is not None and delivery_time is not None and delivery_time > deadline:
+                late.append((package.id, delivery_time - deadline))
+        return late
+
+    """
+    This method prints the lateness report, with the deadline, the delivery time and how late the package was for 
+    every package that has a deadline, followed by the number of late packages and their total lateness.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(1).
+    """
+    def print_lateness_report(self):
+        print('{:>4} | {:<8} | {:<9} | {}'.format('ID', 'Deadline', 'Delivered', 'Late by'))
+        late_count = 0
+        total_lateness = 0
+        for package in self.package_hash_table.packages():
+            deadline = package.deadline_time()
+            if deadline is None:
+                continue
+            delivery_time = self.delivery_timeline.delivery_time(package.id)
+            if delivery_time is None:
+                delivered = 'Not delivered'
+                late_by = ''
             else:
-                if self.truck_2.last_delivery_time > self.truck_3.departure_time:
-                    self.truck_3.set_departure_time(self.truck_2.last_delivery_time)
-        elif self.truck_1.returned_from_run:
-            if self.truck_1.last_delivery_time > self.truck_3.departure_time:
-                self.truck_3.set_departure_time(self.truck_1.last_delivery_time)
-        elif self.truck_2.returned_from_run:
-            if self.truck_2.last_delivery_time > self.truck_3.departure_time:
-                self.truck_3.set_departure_time(self.truck_2.last_delivery_time)
-        else:
-            no_departure = datetime.timedelta(hours=23, minutes=59, seconds=59)
-            self.truck_3.set_departure_time(no_departure)
-        if provided_time > self.truck_3.departure_time:
-            last_delivered_package = 'HUB'
-            for package in self.truck_3.loaded_packages:
-                package.set_delivery_status('Loaded in truck three')
-            for package in self.truck_3.loaded_packages:
-                distance = self.distance_between_nodes(last_delivered_package, self.convert_package_to_key(package))
-                h, m, s = self.time_taken(distance)
-                arrival_time = self.truck_3.last_delivery_time + datetime.timedelta(hours=h, minutes=m, seconds=s)
-                if arrival_time < provided_time:
-                    package.package_delivered(arrival_time, 'Truck Three')
-                    self.truck_3.update_last_delivery_time(arrival_time)
-                    last_delivered_package = self.convert_package_to_key(package)
-                    self.truck_3.update_miles(distance)
-                else:
-                    break
-            distance = self.distance_between_nodes(last_delivered_package, 'HUB')
-            h, m, s = self.time_taken(distance)
-            arrival_time = self.truck_3.last_delivery_time + datetime.timedelta(hours=h, minutes=m, seconds=s)
-            if arrival_time < provided_time:
-                self.truck_3.update_last_delivery_time(arrival_time)
-                self.truck_3.update_miles(distance)
-                self.truck_3.update_returned_from_run()
-
-        total_miles = self.truck_1.miles_driven + self.truck_2.miles_driven + self.truck_3.miles_driven
-
-        if code == 'search':
-            print('{:2>4} | {:<45} | {:<20} | {:>5} | {:>5} | {:<6} | {:<8} | {}'.format('ID', 'Address', 'City',
-                                                                                         'State', 'Zip', 'weight',
-                                                                                         'Deadline', 'Status'))
-            print(self.package_hash_table.search(package_number))
-            print('')
-            print(f'Truck one miles:    {self.truck_1.miles_driven}\n'
-                  f'Truck two miles:    {self.truck_2.miles_driven}\n'
-                  f'Truck three miles:  {self.truck_3.miles_driven}\n'
-                  f'Total miles driven: {total_miles}')
-
-        if code == 'print all':
-            self.print_all_packages()
-            print('')
-            print(f'Truck one miles:    {self.truck_1.miles_driven}\n'
-                  f'Truck two miles:    {self.truck_2.miles_driven}\n'
-                  f'Truck three miles:  {self.truck_3.miles_driven}\n'
-                  f'Total miles driven: {total_miles}')
-
-        if code == 'miles':
-            print(f'Truck one miles:    {self.truck_1.miles_driven}\n'
-                  f'Truck two miles:    {self.truck_2.miles_driven}\n'
-                  f'Truck three miles:  {self.truck_3.miles_driven}\n'
-                  f'Total miles driven: {total_miles}')
-
-        self.truck_1.reset_truck()
-        self.truck_2.reset_truck()
-        self.truck_3.reset_truck()
-        self.load_package_data('packages.csv')
-        self.load_trucks_set_departure()
+                delivered = SimulationTime.format_clock(delivery_time)
+                late_by = 'On time'
+                if delivery_time > deadline:
+                    late_count += 1
+                    total_lateness += delivery_time - deadline
+                    late_by = SimulationTime.format_clock(delivery_time - deadline)
+            print(f'{package.id:>4} | {package.delivery_deadline:<8} | {delivered:<9} | {late_by}')
+        print(f'{"Late packages:":<20}{late_count}')
+        print(f'{"Total lateness:":<20}{SimulationTime.format_clock(total_lateness)}')
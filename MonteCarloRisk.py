@@ -0,0 +1,144 @@
+"""
+This class estimates how likely each package is to meet its deadline when the travel times are not certain. The
+planned routes of a simulated day are driven again in thousands of trials at once with NumPy, where the time of every
+leg of every trial is the planned time multiplied by a random traffic factor. The arrival times are the running sums
+of the leg times from each departure, and the trucks are sent out by the same limited drivers as the fleet, so a truck
+waiting for a driver leaves later when the truck before it is slowed down. NumPy is needed, available() returns False
+when it is not installed.
+"""
+import Fleet
+import SimulationTime
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class MonteCarloRisk:
+    # Percentiles of the return time of each truck that are reported.
+    percentiles = (5, 50, 95)
+
+    """
+    This is the initializer for the Monte Carlo risk, taking a Loading and Delivery instance whose planned routes are
+    driven, the number of trials and the spread of the traffic factor. The factor of each leg is drawn from a log
+    normal distribution with a mean of 1 and the spread as the standard deviation of its logarithm, so a spread of 0
+    drives every trial at the planned speed. A seed can be supplied to draw the same factors every time.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, program, trial_count=10000, spread=0.2, seed=None):
+        if numpy is None:
+            raise ValueError('The Monte Carlo risk estimate needs NumPy.')
+        if trial_count < 1:
+            raise ValueError('At least one trial is needed.')
+        if spread < 0:
+            raise ValueError('The traffic spread cannot be negative.')
+        self.program = program
+        self.trial_count = trial_count
+        self.spread = spread
+        self.random = numpy.random.default_rng(seed)
+
+    """
+    This method returns True when NumPy is installed and the Monte Carlo risk can be estimated.
+    This has a Big O space and time complexity of O(1).
+    """
+    @staticmethod
+    def available():
+        return numpy is not None
+
+    """
+    This method returns the miles of every leg of the route of the supplied truck, from the hub through the packages
+    of each trip and back to the hub, and the legs each trip starts and ends at.
+    This has a Big O time and space complexity of O(N), with N being the number of packages loaded on the truck.
+    """
+    def route_legs(self, truck):
+        program = self.program
+        legs = []
+        trips = []
+        for start, end in truck.trip_bounds():
+            trip_start = len(legs)
+            last_location = program.hub_location
+            for package in truck.loaded_packages[start:end]:
+                legs.append(program.distance_matrix.distance(last_location, package.location_id))
+                last_location = package.location_id
+            legs.append(program.distance_matrix.distance(last_location, program.hub_location))
+            trips.append((trip_start, len(legs)))
+        return numpy.array(legs, dtype=numpy.float64), trips
+
+    """
+    This method drives every trial of the planned day and returns the delivery time of each package and the return
+    time of each truck, in milliseconds since midnight, as dictionaries of arrays with one entry for each trial. Each
+    truck takes the driver that is back at the hub first in its trial, and a truck making several trips leaves again
+    the reload time after it is back, once the packages of the trip are at the hub.
+    This has a Big O time complexity of O(T * (N + R)), with T being the number of trials, N the number of packages
+    and R the number of trucks, done as vectorized operations over the trials.
+    This has a Big O space complexity of O(T * (N + R)).
+    """
+    def simulate(self):
+        program = self.program
+        trial_count = self.trial_count
+        milliseconds_a_mile = SimulationTime.second / program.truck_speed
+        trials = numpy.arange(trial_count)
+        driver_available = numpy.zeros((trial_count, program.driver_count))
+        delivery_times = {}
+        return_times = {}
+        for truck in Fleet.Fleet(program.trucks, program.driver_count).dispatch_order():
+            legs, trips = self.route_legs(truck)
+            factors = self.random.lognormal(-self.spread ** 2 / 2, self.spread, (trial_count, len(legs)))
+            leg_times = factors * (legs * milliseconds_a_mile)
+            driver = numpy.argmin(driver_available, axis=1)
+            departure_times = numpy.maximum(driver_available[trials, driver], truck.planned_departure_time)
+            arrival_times = None
+            for (start, end), (trip_start, trip_end) in zip(truck.trip_bounds(), trips):
+                if arrival_times is not None:
+                    departure_times = numpy.maximum(arrival_times[:, -1] + program.reload_time,
+                                                    program.trip_ready_time(truck.loaded_packages[start:end]))
+                arrival_times = departure_times[:, None] + numpy.cumsum(leg_times[:, trip_start:trip_end], axis=1)
+                for stop, package in enumerate(truck.loaded_packages[start:end]):
+                    delivery_times[package.id] = arrival_times[:, stop]
+            return_times[truck.name] = arrival_times[:, -1]
+            driver_available[trials, driver] = arrival_times[:, -1]
+        return delivery_times, return_times
+
+    """
+    This method runs the trials and returns the estimate as a dictionary holding the number of trials and the spread,
+    the share of the trials each package with a deadline is delivered by its deadline, and the percentiles of the
+    time each truck is back at the hub, in milliseconds since midnight.
+    This has a Big O time complexity of O(T * (N + R)), with T being the number of trials, N the number of packages
+    and R the number of trucks.
+    This has a Big O space complexity of O(T * (N + R)).
+    """
+    def estimate(self):
+        delivery_times, return_times = self.simulate()
+        on_time = {}
+        for package in self.program.package_hash_table.packages():
+            deadline = package.deadline_time()
+            if deadline is not None and package.id in delivery_times:
+                on_time[package.id] = float(numpy.mean(delivery_times[package.id] <= deadline))
+        return_percentiles = {}
+        for truck_name, times in return_times.items():
+            values = numpy.percentile(times, self.percentiles)
+            return_percentiles[truck_name] = {percentile: int(round(value))
+                                              for percentile, value in zip(self.percentiles, values)}
+        return {'trials': self.trial_count, 'spread': self.spread, 'on_time': on_time,
+                'return_percentiles': return_percentiles}
+
+    """
+    This method formats an estimate returned by estimate as a text report, with the on time chance of every package
+    with a deadline and the return time percentiles of every truck.
+    This has a Big O time and space complexity of O(N + R), with N being the number of packages and R the number of
+    trucks.
+    """
+    @staticmethod
+    def format_estimate(estimate):
+        lines = [f'{estimate["trials"]} trials with a traffic spread of {estimate["spread"]}',
+                 '{:>4} | {}'.format('ID', 'On time')]
+        for package_id, chance in sorted(estimate['on_time'].items()):
+            lines.append(f'{package_id:>4} | {chance:>7.2%}')
+        percentiles = MonteCarloRisk.percentiles
+        lines.append('{:<12} | '.format('Truck') + ' | '.join(f'{f"P{percentile} back":>9}'
+                                                              for percentile in percentiles))
+        for truck_name, times in estimate['return_percentiles'].items():
+            lines.append(f'{truck_name:<12} | ' + ' | '.join(f'{SimulationTime.format_clock(times[percentile]):>9}'
+                                                            for percentile in percentiles))
+        return '\n'.join(lines)
@@ -0,0 +1,383 @@
+"""
+This class simulates many depots over many days. Every location in the distance file is served by the depot whose hub
+is closest to it, and each depot is given its own distance matrix of only its hub and those locations, and its own
+fleet. The packages of each day are split between the depots by their address, and the depots are simulated side by
+side on every core with a process pool, each running its days in order with one Loading and Delivery instance for
+each day. Packages that do not fit on the trucks of a depot carry over to its next day, ahead of the new packages.
+The results of every depot and day are combined into one fleet wide mileage and on time report.
+"""
+import concurrent.futures
+import csv
+import os
+import tempfile
+import DistanceMatrix
+import LoadingAndDelivery
+import LoadPlanner
+import PackageIngest
+import SimulationTime
+
+# Header line written at the top of the manifest of each depot and day.
+manifest_header = ['Package ID', 'Address', 'City', 'State', 'Zip', 'Delivery Deadline', 'Mass KILO', 'Special Notes']
+
+
+class Depot:
+    """
+    This is the initializer for a depot, taking its name, the location key of its hub in the distance file, the
+    number of trucks and drivers, the number of packages each truck holds on a trip, the truck speed in miles per
+    second, or None for the normal speed, whether the routes are improved, the most kilos a truck holds on a trip, or
+    None for no limit, and the most trips each truck makes in a day.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, name, hub_key, truck_count=3, driver_count=2, truck_capacity=16, truck_speed=None,
+                 improve_routes=False, truck_weight_capacity=None, trip_count=1):
+        if truck_count < 1 or driver_count < 1:
+            raise ValueError(f'Depot {name} needs at least one truck and one driver.')
+        self.name = name
+        self.hub_key = hub_key
+        self.truck_count = truck_count
+        self.driver_count = driver_count
+        self.truck_capacity = truck_capacity
+        self.truck_speed = truck_speed
+        self.improve_routes = improve_routes
+        self.truck_weight_capacity = truck_weight_capacity
+        self.trip_count = trip_count
+
+    """
+    This method splits the supplied packages waiting at the depot, as (day received, package) tuples, into the ones
+    sent out today and the ones carried over to the next day, both as lists of the same tuples. The packages that must
+    be delivered together are kept together, and they are sent out oldest first, then by earliest deadline, then in
+    the order supplied, until every trip of the trucks is full by count or by weight. A group of packages larger or
+    heavier than one truck, or a package required on a truck the depot does not have, raises a ValueError, because it
+    could never be sent out.
+    This has a Big O time complexity of O(N log N), with N being the number of packages, for sorting the groups.
+    This has a Big O space complexity of O(N).
+    """
+    def select_packages(self, pending):
+        packages = [package for received_day, package in pending]
+        received = {package.id: received_day for received_day, package in pending}
+        planner = LoadPlanner.LoadPlanner(None, None, LoadingAndDelivery.LoadingAndDelivery.day_start)
+        constraints = {package.id: planner.parse_constraints(package) for package in packages}
+        units = planner.build_units(packages, constraints)
+        order = {package.id: position for position, package in enumerate(packages)}
+        units.sort(key=lambda unit: (min([received[package.id] for package in unit.packages]), unit.deadline is None,
+                                     unit.deadline or 0, order[unit.packages[0].id]))
+
+        room = self.truck_count * self.trip_count * self.truck_capacity
+        truck_room = [self.trip_count * self.truck_capacity] * self.truck_count
+        weight_room = float('inf')
+        if self.truck_weight_capacity is not None:
+            weight_room = self.truck_count * self.trip_count * self.truck_weight_capacity
+        dispatched = []
+        carried = []
+        for unit in units:
+            size = len(unit.packages)
+            if size > self.truck_capacity or (self.truck_weight_capacity is not None and
+                                              unit.weight > self.truck_weight_capacity):
+                raise ValueError(f'Package {unit.packages[0].id} must be delivered with {size - 1} other packages, '
+                                 f'more than a truck of depot {self.name} holds.')
+            required = unit.required_truck
+            if required is not None and required > self.truck_count:
+                raise ValueError(f'Package {unit.packages[0].id} can only be on truck {required} but depot '
+                                 f'{self.name} only has {self.truck_count} trucks.')
+            fits = size <= room and unit.weight <= weight_room
+            if required is not None:
+                fits = fits and size <= truck_room[required - 1]
+            if not fits:
+                carried.extend([(received[package.id], package) for package in unit.packages])
+                continue
+            room -= size
+            weight_room -= unit.weight
+            if required is not None:
+                truck_room[required - 1] -= size
+            dispatched.extend([(received[package.id], package) for package in unit.packages])
+        return dispatched, carried
+
+    """
+    This method takes the last group of packages, the one sent out with the lowest priority, off the supplied packages
+    chosen by select_packages, and returns the packages left and the packages of that group, both as lists of (day
+    received, package) tuples, so a load the planner cannot fit can be tried again without it.
+    This has a Big O time and space complexity of O(N), with N being the number of packages.
+    """
+    @staticmethod
+    def split_last_group(dispatched):
+        packages = [package for received_day, package in dispatched]
+        planner = LoadPlanner.LoadPlanner(None, None, LoadingAndDelivery.LoadingAndDelivery.day_start)
+        constraints = {package.id: planner.parse_constraints(package) for package in packages}
+        last_id = packages[-1].id
+        group_ids = next(set([package.id for package in unit.packages])
+                         for unit in planner.build_units(packages, constraints)
+                         if last_id in [package.id for package in unit.packages])
+        return ([entry for entry in dispatched if entry[1].id not in group_ids],
+                [entry for entry in dispatched if entry[1].id in group_ids])
+
+
+class MultiDepotSimulation:
+    """
+    This is the initializer for the multi depot simulation, taking the distance file holding every location of every
+    depot, the list of depots, the most worker processes to run at once, which defaults to the number of cores, and
+    whether the distance file is loaded through its binary cache.
+    This has a Big O time complexity of O(D), with D being the number of depots.
+    This has a Big O space complexity of O(1).
+    """
+    def __init__(self, distance_filename, depots, max_workers=None, use_distance_cache=False):
+        if len(depots) == 0:
+            raise ValueError('At least one depot is needed.')
+        if len(set(depot.name for depot in depots)) != len(depots):
+            raise ValueError('Every depot needs a different name.')
+        self.distance_filename = distance_filename
+        self.depots = list(depots)
+        self.max_workers = max_workers
+        self.use_distance_cache = use_distance_cache
+
+    """
+    This method returns the location keys served by each depot, as a list for each depot starting with its hub. Every
+    location goes to the depot with the closest hub, the first depot listed on a tie, and the hub of a depot is
+    never served by another depot. A hub key that is not in the distance data raises a ValueError.
+    This has a Big O time complexity of O(L * D), with L being the number of locations and D the number of depots.
+    This has a Big O space complexity of O(L).
+    """
+    def depot_locations(self, distance_matrix):
+        hubs = []
+        for depot in self.depots:
+            if depot.hub_key not in distance_matrix.key_index:
+                raise ValueError(f'The hub {depot.hub_key} of depot {depot.name} is not in the distance data.')
+            hubs.append(distance_matrix.location_id(depot.hub_key))
+        hub_depots = {hub: number for number, hub in enumerate(hubs)}
+        locations = [[depot.hub_key] for depot in self.depots]
+        for location_id, key in enumerate(distance_matrix.keys):
+            if location_id in hub_depots:
+                continue
+            depot_number = min(range(len(hubs)), key=lambda number: (distance_matrix.distance(hubs[number],
+                                                                                              location_id), number))
+            locations[depot_number].append(key)
+        return locations
+
+    """
+    This method reads the package manifest of every day and returns, for each depot, a list with the packages it
+    receives each day, and the set of location keys each depot serves outside of its own locations. Packages that
+    must be delivered together all go to the depot of the first of them in the manifest, which then also serves the
+    addresses of the others. A package going to an address that is not in the distance data raises a ValueError.
+    This has a Big O time complexity of O(N), with N being the number of packages over all of the days.
+    This has a Big O space complexity of O(N).
+    """
+    def split_manifests(self, day_manifests, depot_of):
+        depot_days = [[[] for _ in day_manifests] for _ in self.depots]
+        extra_keys = [set() for _ in self.depots]
+        planner = LoadPlanner.LoadPlanner(None, None, LoadingAndDelivery.LoadingAndDelivery.day_start)
+        for day, filename in enumerate(day_manifests):
+            packages = []
+            for line_number, row in PackageIngest.ManifestIngestor.read_manifest(filename):
+                package = PackageIngest.ManifestIngestor.build_package(line_number, row)
+                key = LoadingAndDelivery.LoadingAndDelivery.convert_package_to_key(package)
+                if key not in depot_of:
+                    raise ValueError(f'Package {package.id} on day {day + 1} is going to {key}, which is not in the '
+                                     f'distance data.')
+                packages.append(package)
+            order = {package.id: position for position, package in enumerate(packages)}
+            constraints = {package.id: planner.parse_constraints(package) for package in packages}
+            for unit in planner.build_units(packages, constraints):
+                unit_packages = sorted(unit.packages, key=lambda package: order[package.id])
+                depot_number = None
+                for package in unit_packages:
+                    key = LoadingAndDelivery.LoadingAndDelivery.convert_package_to_key(package)
+                    if depot_number is None:
+                        depot_number = depot_of[key]
+                    elif depot_of[key] != depot_number:
+                        extra_keys[depot_number].add(key)
+                depot_days[depot_number][day].extend(unit_packages)
+            for packages_of_day in depot_days:
+                packages_of_day[day].sort(key=lambda package: order[package.id])
+        return depot_days, extra_keys
+
+    """
+    This method simulates every depot over the days of the supplied manifests, one file for each day in order, and
+    returns the combined results: a result for every depot and day, the fleet wide result of every day, and the fleet
+    wide result of the whole run. The depots are simulated in the process pool, each with its own distance matrix.
+    This has a Big O time complexity of O(L^2 + D * T * N^2 / P), with L being the number of locations, D the number
+    of depots, T the number of days, N the most packages a depot sends out in a day and P the number of worker
+    processes.
+    This has a Big O space complexity of O(L^2) for the distance matrix, and O(L^2 / D) for each depot matrix when the
+    locations are shared out evenly.
+    """
+    def run(self, day_manifests):
+        if self.use_distance_cache:
+            distance_matrix = DistanceMatrix.DistanceMatrix.load(self.distance_filename)
+        else:
+            distance_matrix = DistanceMatrix.DistanceMatrix.from_csv(self.distance_filename)
+        locations = self.depot_locations(distance_matrix)
+        depot_of = {}
+        for depot_number, keys in enumerate(locations):
+            for key in keys:
+                depot_of[key] = depot_number
+        depot_days, extra_keys = self.split_manifests(day_manifests, depot_of)
+
+        tasks = []
+        for depot, keys, extra, days in zip(self.depots, locations, extra_keys, depot_days):
+            submatrix = distance_matrix.submatrix(keys + sorted(extra))
+            tasks.append((depot, submatrix.keys, submatrix.distances, days))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            depot_results = list(executor.map(run_depot, tasks))
+        return self.combine_results(depot_results, len(day_manifests))
+
+    """
+    This method combines the lists of day results of every depot into the results returned by run.
+    This has a Big O time and space complexity of O(D * T), with D being the number of depots and T the number of days.
+    """
+    @staticmethod
+    def combine_results(depot_results, day_count):
+        depot_days = [result for results in depot_results for result in results]
+        days = []
+        for day in range(1, day_count + 1):
+            results = [result for result in depot_days if result['day'] == day]
+            days.append(MultiDepotSimulation.total_results(results, {'day': day}))
+        return {'depot_days': depot_days, 'days': days,
+                'fleet': MultiDepotSimulation.total_results(depot_days, {'days': day_count})}
+
+    """
+    This method adds up the supplied depot and day results into one result, starting from the supplied fields. The
+    packages carried over are those left at the end of the last day in the results of each depot.
+    This has a Big O time and space complexity of O(R), with R being the number of results.
+    """
+    @staticmethod
+    def total_results(results, total):
+        total['total_miles'] = sum([result['total_miles'] for result in results])
+        total['delivered'] = sum([result['delivered'] for result in results])
+        total['late_packages'] = sum([result['late_packages'] for result in results])
+        total['total_lateness_minutes'] = sum([result['total_lateness_minutes'] for result in results])
+        last_days = {}
+        for result in results:
+            previous = last_days.get(result['depot'])
+            if previous is None or result['day'] > previous['day']:
+                last_days[result['depot']] = result
+        total['carried_over'] = sum([result['carried_over'] for result in last_days.values()])
+        if total['delivered'] > 0:
+            total['on_time_rate'] = (total['delivered'] - total['late_packages']) / total['delivered']
+        else:
+            total['on_time_rate'] = 1.0
+        return total
+
+    """
+    This method formats the results of run as a text table with one row for each depot and day, followed by the fleet
+    wide row of each day and of the whole run.
+    This has a Big O time and space complexity of O(D * T), with D being the number of depots and T the number of days.
+    """
+    @staticmethod
+    def format_results(results):
+        row_format = '{:<20} | {:>4} | {:>11} | {:>9} | {:>4} | {:>7} | {:>12} | {:>7} | {}'
+        lines = [row_format.format('Depot', 'Day', 'Total miles', 'Delivered', 'Late', 'On time', 'Minutes late',
+                                   'Carried', 'Last return')]
+        rows = [(result['depot'], result['day'], result) for result in results['depot_days']]
+        rows += [('All depots', result['day'], result) for result in results['days']]
+        rows.append(('All depots', 'All', results['fleet']))
+        for depot, day, result in rows:
+            lines.append(row_format.format(depot, day, f'{result["total_miles"]:.1f}', result['delivered'],
+                                           result['late_packages'], f'{result["on_time_rate"]:.1%}',
+                                           f'{result["total_lateness_minutes"]:.1f}', result['carried_over'],
+                                           result.get('last_return', '')).rstrip())
+        return '\n'.join(lines)
+
+
+"""
+This function writes the supplied packages to a manifest file in the same layout as the package file.
+This has a Big O time complexity of O(N), with N being the number of packages.
+This has a Big O space complexity of O(1).
+"""
+def write_manifest(filename, packages):
+    with open(filename, 'w', newline='') as manifest:
+        writer = csv.writer(manifest)
+        writer.writerow(manifest_header)
+        for package in packages:
+            writer.writerow([package.id, package.address, package.city, package.state, package.zip,
+                             package.delivery_deadline, package.weight, package.special_notes])
+
+
+"""
+This function simulates every day of one depot in a worker process, taking the depot, the location keys and
+distances of its distance matrix and the packages it receives each day, and returns a result dictionary for each day.
+The packages sent out each day are written to a manifest of their own and simulated by a Loading and Delivery
+instance, and the rest carry over to the next day. When the load planner cannot fit the packages chosen, for their
+arrival times, required trucks or held addresses, the group with the lowest priority is carried over and the day is
+loaded again without it. A package is late when it is delivered after its deadline on the day it was received, or on
+any later day, and its lateness counts the days it waited. A package carried over is ready at the start of the
+next day, and an address correction is only applied on the day its package is received, in the depot holding it. Two
+waiting packages with the same id, or a day whose
+first group alone cannot be loaded, raise a ValueError naming the depot and day.
+This has a Big O time complexity of O(T * N^2), with T being the number of days and N the most packages sent out in a
+day, for loading the trucks.
+This has a Big O space complexity of O(K^2 + N), with K being the number of locations of the depot.
+"""
+def run_depot(task):
+    depot, keys, distances, days = task
+    distance_matrix = DistanceMatrix.DistanceMatrix(keys, distances)
+    results = []
+    carried = []
+    with tempfile.TemporaryDirectory() as directory:
+        for day, packages in enumerate(days, start=1):
+            pending = carried + [(day, package) for package in packages]
+            waiting_ids = set()
+            for received_day, package in pending:
+                if package.id in waiting_ids:
+                    raise ValueError(f'Package {package.id} on day {day} of depot {depot.name} has the same id as '
+                                     f'another package waiting at the depot.')
+                waiting_ids.add(package.id)
+            dispatched, carried = depot.select_packages(pending)
+            result = {'depot': depot.name, 'day': day, 'total_miles': 0.0, 'delivered': 0, 'late_packages': 0,
+                      'total_lateness_minutes': 0.0, 'on_time_rate': 1.0, 'carried_over': len(carried),
+                      'last_return': ''}
+            results.append(result)
+            if len(dispatched) == 0:
+                continue
+
+            filename = os.path.join(directory, f'day{day}.csv')
+            program = None
+            while program is None:
+                write_manifest(filename, [package for received_day, package in dispatched])
+                # A package carried over has been at the hub since the day before, with its address corrected, so it is
+                # ready at the start of the day, and only the corrections of packages received today are applied.
+                new_ids = set(package.id for received_day, package in dispatched if received_day == day)
+                arrival_times = {package.id: LoadingAndDelivery.LoadingAndDelivery.day_start
+                                 for received_day, package in dispatched if received_day < day}
+                address_corrections = [correction for correction
+                                       in LoadingAndDelivery.LoadingAndDelivery.address_corrections
+                                       if correction[1] in new_ids]
+                try:
+                    program = LoadingAndDelivery.LoadingAndDelivery(filename, None,
+                                                                    improve_routes=depot.improve_routes,
+                                                                    truck_count=depot.truck_count,
+                                                                    driver_count=depot.driver_count,
+                                                                    truck_speed=depot.truck_speed,
+                                                                    distance_matrix=distance_matrix,
+                                                                    truck_capacity=depot.truck_capacity,
+                                                                    hub_key=depot.hub_key,
+                                                                    truck_weight_capacity=depot.truck_weight_capacity,
+                                                                    trip_count=depot.trip_count,
+                                                                    address_corrections=address_corrections,
+                                                                    arrival_times=arrival_times)
+                except ValueError as error:
+                    dispatched, left = depot.split_last_group(dispatched)
+                    if len(dispatched) == 0:
+                        raise ValueError(f'Depot {depot.name} could not be loaded on day {day}: {error}') from error
+                    carried = left + carried
+            result['carried_over'] = len(carried)
+            timeline = program.delivery_timeline
+            lateness = 0
+            for received_day, package in dispatched:
+                delivery_time = timeline.delivery_time(package.id)
+                if delivery_time is None:
+                    continue
+                result['delivered'] += 1
+                deadline = package.deadline_time()
+                if deadline is None:
+                    deadline = SimulationTime.day
+                late_by = (day - received_day) * SimulationTime.day + delivery_time - deadline
+                if late_by > 0:
+                    result['late_packages'] += 1
+                    lateness += late_by
+            result['total_miles'] = program.total_miles()
+            result['total_lateness_minutes'] = lateness / SimulationTime.minute
+            if result['delivered'] > 0:
+                result['on_time_rate'] = (result['delivered'] - result['late_packages']) / result['delivered']
+            result['last_return'] = SimulationTime.format_clock(max([truck.last_delivery_time
+                                                                     for truck in program.trucks
+                                                                     if len(truck.loaded_packages) > 0]))
+    return results
@@ -1,25 +1,36 @@
 """
 This is the package class containing all the information for the various packages that will be loaded on the trucks.
+The package uses slots instead of an attribute dictionary, and the text fields that repeat across many packages, such
+as the city, deadline and status, are interned so every package with the same value shares one string.
 """
+import sys
+import SimulationTime
 
 
 class Package:
+    __slots__ = ('id', 'address', 'city', 'state', 'zip', 'delivery_deadline', 'deadline', 'weight', 'special_notes',
+                 'delivery_status', 'location_id')
+
     """
-    This is the initializer for the package class, taking the supplied information and saving them.
-    This has a Big O space and time complexity of O(1), with there being 8 single operation becoming one in big o
+    This is the initializer for the package class, taking the supplied information and saving them. The deadline is
+    parsed once here, so a deadline that is not 'EOD' or a time such as '10:30 AM' raises a ValueError. The location id
+    is the index of the package address in the distance matrix and is set when the package is loaded.
+    This has a Big O space and time complexity of O(1), with there being 11 single operation becoming one in big o
     notation.
     """
     def __init__(self, package_id, address, city, state, zip_code, delivery_deadline, weight, special_notes,
                  delivery_status):
         self.id = package_id
-        self.address = address
-        self.city = city
-        self.state = state
-        self.zip = zip_code
-        self.delivery_deadline = delivery_deadline
+        self.address = sys.intern(address)
+        self.city = sys.intern(city)
+        self.state = sys.intern(state)
+        self.zip = sys.intern(zip_code)
+        self.delivery_deadline = sys.intern(delivery_deadline)
+        self.deadline = self.parse_deadline(delivery_deadline)
         self.weight = weight
-        self.special_notes = special_notes
-        self.delivery_status = delivery_status
+        self.special_notes = sys.intern(special_notes)
+        self.delivery_status = sys.intern(delivery_status)
+        self.location_id = None
 
     """
     This defines how the package will be displayed when it is printed to the terminal.
@@ -30,25 +41,57 @@ class Package:
 
     """
     This method is used to change the delivery status of a package to the name of the truck that delivered the 
-    package and the time it was delivered at.
+    package and the time it was delivered at, in milliseconds since midnight.
     This has a Big O time complexity of O(1), with one operation.
     """
     def package_delivered(self, delivery_time, delivery_truck):
-        self.delivery_status = delivery_truck + (' delivered at: ' + str(delivery_time))
+        self.delivery_status = delivery_truck + (' delivered at: ' + SimulationTime.format_clock(delivery_time))
 
     """
-    This method sets the delivery status of a package, with the provided delivery status.
+    This method sets the delivery status of a package, with the provided delivery status, interned like the status the
+    package was created with.
     This has a Big O time complexity of O(1), with one operation.
     """
     def set_delivery_status(self, status):
-        self.delivery_status = status
+        self.delivery_status = sys.intern(status)
 
     """
     This method changes the delivery address of a package, using the supplied address information.
     This has a Big O space and time complexity of O(1).
     """
     def change_delivery_address(self, address, city, state, zipcode):
-        self.address = address
-        self.city = city
-        self.state = state
-        self.zip = zipcode
+        self.address = sys.intern(address)
+        self.city = sys.intern(city)
+        self.state = sys.intern(state)
+        self.zip = sys.intern(zipcode)
+
+    """
+    This method returns the delivery deadline of the package in milliseconds since midnight, or None for a deadline of 
+    'EOD'.
+    This has a Big O space and time complexity of O(1), because the deadline was parsed when the package was made.
+    """
+    def deadline_time(self):
+        return self.deadline
+
+    """
+    This method converts a deadline such as '10:30 AM' into milliseconds since midnight. A deadline of 'EOD' has no 
+    set time and returns None, and any other text raises a ValueError.
+    This has a Big O space and time complexity of O(1).
+    """
+    @staticmethod
+    def parse_deadline(delivery_deadline):
+        if delivery_deadline == 'EOD':
+            return None
+        try:
+            clock, meridiem = delivery_deadline.split(' ')
+            hours, minutes = clock.split(':')
+            hours = int(hours)
+            minutes = int(minutes)
+        except ValueError:
+            raise ValueError(f'{delivery_deadline!r} is not a delivery deadline.') from None
+        if meridiem.upper() not in ('AM', 'PM') or not 1 <= hours <= 12 or not 0 <= minutes < 60:
+            raise ValueError(f'{delivery_deadline!r} is not a delivery deadline.')
+        hours = hours % 12
+        if meridiem.upper() == 'PM':
+            hours += 12
+        return SimulationTime.clock(hours, minutes)
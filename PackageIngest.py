@@ -0,0 +1,110 @@
+"""
+This class streams package manifests into the package store. The manifest is read one row at a time, every row is
+validated and converted into a package once, and a fingerprint of each row is kept so that importing the manifest again
+only builds and applies the packages that are new or have changed. Only the fingerprints are kept between imports, so
+the memory used while reading does not grow with the size of the file.
+"""
+import csv
+import hashlib
+import Package
+
+
+class ManifestIngestor:
+    """
+    This is the initializer for the manifest ingestor, starting with no fingerprints so the first import applies every
+    package.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self):
+        self.fingerprints = {}
+        self.removed_ids = []
+        self.counts = {'added': 0, 'changed': 0, 'unchanged': 0, 'removed': 0, 'duplicate': 0}
+
+    """
+    This method reads the supplied manifest one row at a time, skipping the header line, and yields the line number and
+    the row for every row that is not blank.
+    This has a Big O time complexity of O(N), with N being the number of rows, spread over the rows as they are used.
+    This has a Big O space complexity of O(1), because only one row is held at a time.
+    """
+    @staticmethod
+    def read_manifest(filename):
+        with open(filename, newline='') as packages:
+            package_data = csv.reader(packages, delimiter=',')
+            next(package_data, None)
+            line_number = 1
+            for row in package_data:
+                line_number += 1
+                if len(row) == 0 or row[0].strip() == '':
+                    continue
+                yield line_number, row
+
+    """
+    This method returns the fingerprint of a manifest row, a 64 bit hash of all of its cells.
+    This has a Big O space and time complexity of O(1), for the fixed number of cells in a row.
+    """
+    @staticmethod
+    def fingerprint(row):
+        return hashlib.blake2b('\x1f'.join(row).encode(), digest_size=8).digest()
+
+    """
+    This method validates a manifest row and converts it into a package, with the id and weight converted to integers
+    and the deadline parsed once. A row that is missing cells or has a bad value raises a ValueError naming its line.
+    This has a Big O space and time complexity of O(1).
+    """
+    @staticmethod
+    def build_package(line_number, row):
+        if len(row) < 8:
+            raise ValueError(f'Line {line_number} of the manifest has {len(row)} cells, 8 are needed.')
+        try:
+            return Package.Package(int(row[0]), row[1], row[2], row[3], row[4], row[5].strip(), int(row[6]), row[7],
+                                   'at hub')
+        except ValueError as error:
+            raise ValueError(f'Line {line_number} of the manifest is not valid: {error}') from error
+
+    """
+    This method imports the supplied manifest and yields a package for every row that is new or has changed since the
+    last import, leaving out the rows with the same fingerprint as before. The fingerprint of a row is only kept once
+    its package has been taken, so a row the caller could not apply is yielded again by the next import. A package id
+    listed again in the same manifest is counted as a duplicate instead of added or changed, and is only yielded again
+    when its row differs from the row read before it, which it then replaces. Once every package has been yielded, the
+    ids of the packages that are no longer in the manifest are in removed_ids and the number of added, changed,
+    unchanged, removed and duplicate packages are in counts.
+    This has a Big O time complexity of O(N) to read and fingerprint the N rows, but packages are only built for the
+    C rows that changed, so applying an import is O(C).
+    This has a Big O space complexity of O(N) for the fingerprints, which are 8 bytes for each package.
+    """
+    def ingest(self, filename):
+        counts = {'added': 0, 'changed': 0, 'unchanged': 0, 'removed': 0, 'duplicate': 0}
+        # Fingerprint of the row last read in this import for every package id seen so far.
+        seen = {}
+        for line_number, row in self.read_manifest(filename):
+            fingerprint = self.fingerprint(row)
+            try:
+                package_id = int(row[0])
+            except ValueError as error:
+                raise ValueError(f'Line {line_number} of the manifest has a package id that is not a number.') \
+                    from error
+            duplicate = package_id in seen
+            previous = seen[package_id] if duplicate else self.fingerprints.get(package_id)
+            seen[package_id] = fingerprint
+            if duplicate:
+                counts['duplicate'] += 1
+            elif previous == fingerprint:
+                counts['unchanged'] += 1
+            if previous == fingerprint:
+                continue
+            package = self.build_package(line_number, row)
+            yield package
+            self.fingerprints[package_id] = fingerprint
+            if duplicate:
+                continue
+            if previous is None:
+                counts['added'] += 1
+            else:
+                counts['changed'] += 1
+
+        self.removed_ids = [package_id for package_id in self.fingerprints if package_id not in seen]
+        for package_id in self.removed_ids:
+            del self.fingerprints[package_id]
+        counts['removed'] = len(self.removed_ids)
+        self.counts = counts
@@ -0,0 +1,213 @@
+"""
+This class holds a sparse road network, read from an edge list of the roads between intersections and delivery
+locations, and fills a distance matrix with the shortest road miles between only the locations that are needed, the
+hub and the package addresses, instead of reading a full distance file. The shortest paths from each needed location
+are found with Dijkstra's algorithm, spread over a process pool when there are many of them, and the matrix is kept in
+the same binary cache as a distance file, made from the edge list and the needed locations, so the paths of an
+unchanged network are not searched again.
+"""
+import array
+import concurrent.futures
+import csv
+import hashlib
+import heapq
+import os
+import DistanceMatrix
+
+# Road network and the nodes to find the miles to, set in a worker process when it starts.
+worker_network = None
+worker_targets = None
+
+
+class RoadNetwork:
+    # Least work, as the number of sources times the number of nodes, searched with the process pool. Less work is
+    # searched in this process, where it is quicker than starting the workers.
+    parallel_work = 1 << 20
+
+    """
+    This is the initializer for the road network, taking the key of every node and the roads in compressed sparse row
+    form: the roads leaving node n are at offsets[n] up to offsets[n + 1] of the targets and miles arrays.
+    This has a Big O time complexity of O(V), with V being the number of nodes, to build the key index.
+    This has a Big O space complexity of O(V + E), with E being the number of roads.
+    """
+    def __init__(self, node_keys, offsets, targets, miles):
+        self.node_keys = list(node_keys)
+        self.node_index = {key: node for node, key in enumerate(self.node_keys)}
+        self.offsets = offsets
+        self.targets = targets
+        self.miles = miles
+
+    """
+    This method reads an edge list, where every row after the first line holds the keys of the two ends of a road and
+    its miles, into a road network. Roads can be driven both ways, and a row that is missing cells or has miles that
+    are not a number of zero or more raises a ValueError naming its line.
+    This has a Big O time complexity of O(V + E), with V being the number of nodes and E the number of roads.
+    This has a Big O space complexity of O(V + E).
+    """
+    @classmethod
+    def from_edge_list(cls, filename):
+        node_index = {}
+        node_keys = []
+        ends = array.array('i')
+        edge_miles = array.array('d')
+        with open(filename, newline='') as edges:
+            edge_data = csv.reader(edges, delimiter=',')
+            next(edge_data, None)
+            line_number = 1
+            for row in edge_data:
+                line_number += 1
+                if len(row) == 0 or row[0].strip() == '':
+                    continue
+                if len(row) < 3:
+                    raise ValueError(f'Line {line_number} of the edge list has {len(row)} cells, 3 are needed.')
+                try:
+                    miles = float(row[2])
+                except ValueError:
+                    raise ValueError(f'Line {line_number} of the edge list has miles that are not a number.') from None
+                if not miles >= 0.0:
+                    raise ValueError(f'Line {line_number} of the edge list has negative miles.')
+                for key in row[:2]:
+                    if key not in node_index:
+                        node_index[key] = len(node_keys)
+                        node_keys.append(key)
+                    ends.append(node_index[key])
+                edge_miles.append(miles)
+
+        node_count = len(node_keys)
+        offsets = array.array('i', bytes(4 * (node_count + 1)))
+        for node in ends:
+            offsets[node + 1] += 1
+        for node in range(node_count):
+            offsets[node + 1] += offsets[node]
+        targets = array.array('i', bytes(4 * len(ends)))
+        miles = array.array('d', bytes(8 * len(ends)))
+        filled = array.array('i', offsets[:node_count])
+        for edge in range(len(edge_miles)):
+            start = ends[2 * edge]
+            end = ends[2 * edge + 1]
+            for node, other in ((start, end), (end, start)):
+                targets[filled[node]] = other
+                miles[filled[node]] = edge_miles[edge]
+                filled[node] += 1
+        return cls(node_keys, offsets, targets, miles)
+
+    """
+    This method returns the shortest miles from the source node to each of the target nodes, in the order of the
+    targets, using Dijkstra's algorithm with a heap. The search stops once every target has been reached, and a
+    target that cannot be reached is given infinite miles.
+    This has a Big O time complexity of O((V + E) log V), with V being the number of nodes and E the number of roads,
+    and less when the targets are reached early.
+    This has a Big O space complexity of O(V).
+    """
+    def shortest_miles(self, source, targets):
+        offsets = self.offsets
+        road_targets = self.targets
+        road_miles = self.miles
+        best = [float('inf')] * len(self.node_keys)
+        best[source] = 0.0
+        settled = bytearray(len(self.node_keys))
+        remaining = set(targets)
+        heappop = heapq.heappop
+        heappush = heapq.heappush
+        queue = [(0.0, source)]
+        while queue and remaining:
+            miles, node = heappop(queue)
+            if settled[node]:
+                continue
+            settled[node] = 1
+            remaining.discard(node)
+            for road in range(offsets[node], offsets[node + 1]):
+                other = road_targets[road]
+                other_miles = miles + road_miles[road]
+                if other_miles < best[other]:
+                    best[other] = other_miles
+                    heappush(queue, (other_miles, other))
+        return array.array('d', [best[target] if settled[target] else float('inf') for target in targets])
+
+    """
+    This method returns the shortest miles from every supplied node to every supplied node, as one row of miles for
+    each node. The nodes are searched in a process pool of up to the supplied number of workers, by default one for
+    each core, when there is at least parallel_work to do and more than one worker, and in this process otherwise.
+    This has a Big O time complexity of O(S * (V + E) log V / P), with S being the number of supplied nodes and P the
+    number of worker processes.
+    This has a Big O space complexity of O(S^2) for the rows.
+    """
+    def search(self, nodes, max_workers=None):
+        workers = os.cpu_count() if max_workers is None else max_workers
+        if len(nodes) * len(self.node_keys) < self.parallel_work or workers is None or workers < 2:
+            return [self.shortest_miles(node, nodes) for node in nodes]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=start_worker,
+                                                    initargs=(self.node_keys, self.offsets, self.targets, self.miles,
+                                                              nodes)) as executor:
+            return list(executor.map(search_source, nodes, chunksize=max(1, len(nodes) // 64)))
+
+    """
+    This method returns a distance matrix of the shortest road miles between the supplied location keys, in the order
+    supplied. The miles between two locations are taken from the search of the one listed first, so the matrix is
+    exactly symmetric. A key that is not in the road network, or two locations with no road between them, raise a
+    ValueError.
+    This has a Big O time complexity of O(S * (V + E) log V / P + S^2), with S being the number of locations.
+    This has a Big O space complexity of O(S^2).
+    """
+    def distance_matrix(self, location_keys, max_workers=None):
+        nodes = []
+        for key in location_keys:
+            if key not in self.node_index:
+                raise ValueError(f'{key} is not in the road network.')
+            nodes.append(self.node_index[key])
+        rows = self.search(nodes, max_workers)
+        size = len(nodes)
+        matrix = array.array('d', bytes(8 * size * size))
+        for row in range(size):
+            miles = rows[row]
+            for column in range(row, size):
+                if miles[column] == float('inf'):
+                    raise ValueError(f'There is no road from {location_keys[row]} to {location_keys[column]}.')
+                matrix[row * size + column] = miles[column]
+                matrix[column * size + row] = miles[column]
+        return DistanceMatrix.DistanceMatrix(location_keys, matrix)
+
+    """
+    This method returns the distance matrix of the shortest road miles between the supplied location keys of the
+    supplied edge list, mapped from its binary cache when the cache was made from the same edge list and locations,
+    and otherwise searched and written to the cache for the next start. The cache defaults to the edge list file name
+    with .cache added.
+    This has a Big O time complexity of O(B) to check the digest of the B bytes of the edge list when the cache is
+    used, or the time of distance_matrix when it is not.
+    This has a Big O space complexity of O(S) for S locations when the cache is used, or O(V + E + S^2) when it is not.
+    """
+    @classmethod
+    def load(cls, filename, location_keys, cache_filename=None, max_workers=None):
+        if cache_filename is None:
+            cache_filename = filename + '.cache'
+        digest = hashlib.sha256(DistanceMatrix.DistanceMatrix.file_digest(filename))
+        digest.update('\n'.join(location_keys).encode())
+        source_digest = digest.digest()
+        distance_matrix = DistanceMatrix.DistanceMatrix.from_cache(cache_filename, source_digest)
+        if distance_matrix is None:
+            distance_matrix = cls.from_edge_list(filename).distance_matrix(location_keys, max_workers)
+            try:
+                distance_matrix.write_cache(cache_filename, source_digest)
+            except OSError:
+                pass
+        return distance_matrix
+
+
+"""
+This function starts a worker process by rebuilding the road network from its supplied arrays and keeping the nodes
+to find the miles to.
+This has a Big O time and space complexity of O(V + E), with V being the number of nodes and E the number of roads.
+"""
+def start_worker(node_keys, offsets, targets, miles, target_nodes):
+    global worker_network, worker_targets
+    worker_network = RoadNetwork(node_keys, offsets, targets, miles)
+    worker_targets = target_nodes
+
+
+"""
+This function returns the shortest miles from the supplied source node to every target node in a worker process.
+This has a Big O time complexity of O((V + E) log V), with V being the number of nodes and E the number of roads.
+This has a Big O space complexity of O(V).
+"""
+def search_source(source):
+    return worker_network.shortest_miles(source, worker_targets)
@@ -0,0 +1,288 @@
+"""
+This class improves the routes built by the prioritized nearest neighbor loading using 2-opt and Or-opt moves. Each
+move is scored in constant time from the distance matrix by only looking at the legs it changes, and moves are only
+made inside one priority level of the route so the priority order is kept. A move that shortens the route is only
+kept when it does not make any package that was on time late and does not make the late packages any later in total,
+and the search stops when no move helps or the time budget runs out. A truck that makes several trips has each trip
+improved as a route of its own. When candidate neighbors are supplied, the nearest neighbors of each stop among the
+stops of the route are found first, and a move is only tried where it joins a stop to one of them, so a pass looks at
+a few moves for each stop instead of every pair of stops.
+"""
+import time
+import SimulationTime
+
+
+class RouteImprover:
+    """
+    This is the initializer for the route improver, taking the distance matrix, the location id of the hub, the truck
+    speed in miles per second, the time budget in seconds for improving one truck, the candidate neighbors to
+    limit the moves to, or None to try every move, the milliseconds it takes to load a truck again between trips, and
+    a function returning the time the packages of a trip are all at the hub, or None when they always are.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, distance_matrix, hub_location, truck_speed, time_budget=1.0, candidates=None, reload_time=0,
+                 ready_time=None):
+        self.distance_matrix = distance_matrix
+        self.hub_location = hub_location
+        self.truck_speed = truck_speed
+        self.time_budget = time_budget
+        self.candidates = candidates
+        self.reload_time = reload_time
+        self.ready_time = ready_time
+
+    """
+    This method improves the route of the supplied truck in place and returns the miles saved. The loaded packages
+    are reordered inside each of the truck route segments until no 2-opt or Or-opt move shortens the route or the
+    time budget runs out. With candidate neighbors the neighbors of each stop among the stops of the route are found
+    once, before the first pass. Each trip of the truck is improved in turn, leaving when the trip before it is back
+    at the hub, the truck is loaded again and its packages are at the hub, and no package is moved to another trip.
+    This has a Big O time complexity of O(N^2) for every pass, with N being the number of packages on the truck, and
+    the number of passes is limited by the time budget.
+    This has a Big O space complexity of O(N) for the reordered package list.
+    """
+    def improve(self, truck):
+        packages = truck.loaded_packages
+        if len(packages) < 3:
+            return 0.0
+        segments = truck.route_segments
+        if len(segments) == 0:
+            segments = [(0, len(packages))]
+        departure = truck.departure_time
+        deadlines = {}
+        for package in packages:
+            deadline = package.deadline_time()
+            if deadline is not None:
+                deadlines[package.id] = deadline
+
+        neighbors = None
+        if self.candidates is not None:
+            neighbors = self.candidates.among([package.location_id for package in packages])
+        trips = truck.trip_bounds()
+        miles_before = sum([self.route_miles(packages[start:end]) for start, end in trips])
+        stop_time = time.perf_counter() + self.time_budget
+        miles_after = 0.0
+        for start, end in trips:
+            trip = packages[start:end]
+            if start > 0 and self.ready_time is not None:
+                departure = max(departure, self.ready_time(trip))
+            trip_segments = [(segment_start - start, segment_end - start) for segment_start, segment_end in segments
+                             if start <= segment_start and segment_end <= end]
+            self.improve_trip(trip, trip_segments, departure, deadlines, stop_time, neighbors)
+            packages[start:end] = trip
+            trip_miles = self.route_miles(trip)
+            miles_after += trip_miles
+            departure += SimulationTime.travel_time(trip_miles, self.truck_speed) + self.reload_time
+        return miles_before - miles_after
+
+    """
+    This method improves the route of one trip through the supplied packages in place, reordering the packages inside
+    each of the supplied segments until no 2-opt or Or-opt move shortens the route or the stop time is reached.
+    This has a Big O time complexity of O(N^2) for every pass, with N being the number of packages on the trip.
+    This has a Big O space complexity of O(N) for the reordered package list.
+    """
+    def improve_trip(self, packages, segments, departure, deadlines, stop_time, neighbors):
+        improved = True
+        while improved and time.perf_counter() < stop_time:
+            improved = False
+            for start, end in segments:
+                if self.two_opt_pass(packages, start, end, departure, deadlines, stop_time, neighbors):
+                    improved = True
+                if self.or_opt_pass(packages, start, end, departure, deadlines, stop_time, neighbors):
+                    improved = True
+
+    """
+    This method returns the location id of the package at the supplied position of the route, with the positions
+    before the first package and after the last package being the hub.
+    This has a Big O space and time complexity of O(1).
+    """
+    def location_at(self, packages, position):
+        if position < 0 or position >= len(packages):
+            return self.hub_location
+        return packages[position].location_id
+
+    """
+    This method returns the miles of the route through the supplied packages, starting and ending at the hub.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(1).
+    """
+    def route_miles(self, packages):
+        miles = 0.0
+        for position in range(len(packages) + 1):
+            miles += self.distance_matrix.distance(self.location_at(packages, position - 1),
+                                                   self.location_at(packages, position))
+        return miles
+
+    """
+    This method returns a dictionary of location id to the positions of the route between the start and end position
+    that go to it, used to find the moves near a stop when there are candidate neighbors. None is returned when
+    there are no candidate neighbors.
+    This has a Big O time and space complexity of O(N), with N being the number of packages in the segment.
+    """
+    def segment_positions(self, packages, start, end, neighbors):
+        if neighbors is None:
+            return None
+        positions_at = {}
+        for position in range(start, end):
+            positions_at.setdefault(packages[position].location_id, []).append(position)
+        return positions_at
+
+    """
+    This method returns the total milliseconds the packages with deadlines would be delivered after their deadlines, if
+    the truck left at the departure time and delivered the packages in the supplied order, and the set of the ids of
+    the packages that would be late. Each arrival is timed from the miles driven so far, the same way the delivery day
+    is simulated.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(L), with L being the number of late packages.
+    """
+    def lateness(self, packages, departure, deadlines):
+        if len(deadlines) == 0:
+            return 0, frozenset()
+        late = 0
+        late_ids = set()
+        miles = 0.0
+        last_location = self.hub_location
+        for package in packages:
+            miles += self.distance_matrix.distance(last_location, package.location_id)
+            last_location = package.location_id
+            deadline = deadlines.get(package.id)
+            if deadline is not None:
+                current_time = departure + SimulationTime.travel_time(miles, self.truck_speed)
+                if current_time > deadline:
+                    late += current_time - deadline
+                    late_ids.add(package.id)
+        return late, frozenset(late_ids)
+
+    """
+    This method returns True when a route with the supplied candidate lateness, as returned by lateness, is no worse
+    for the deadlines than the route with the current lateness: no package that was on time is late and the late
+    packages are not later in total.
+    This has a Big O time complexity of O(L), with L being the number of late packages.
+    This has a Big O space complexity of O(1).
+    """
+    @staticmethod
+    def keeps_deadlines(current_lateness, candidate_lateness):
+        return candidate_lateness[0] <= current_lateness[0] and candidate_lateness[1] <= current_lateness[1]
+
+    """
+    This method makes the first shortening 2-opt move it finds for each starting position inside the segment. A 2-opt
+    move reverses the packages between two positions, which only changes the two legs at the ends of the reversed
+    part because the distances are the same in both directions. With the supplied candidate neighbors of the route
+    only the moves from candidate_reversals are tried. Returns True when any move was made.
+    This has a Big O time complexity of O(N^2), with N being the number of packages in the segment, or O(N * K) for
+    the moves checked with K candidate neighbors, plus O(N) for each move made.
+    This has a Big O space complexity of O(N) for the reordered package list.
+    """
+    def two_opt_pass(self, packages, start, end, departure, deadlines, stop_time, neighbors=None):
+        distance = self.distance_matrix.distance
+        improved = False
+        current_lateness = self.lateness(packages, departure, deadlines)
+        positions_at = self.segment_positions(packages, start, end, neighbors)
+        for i in range(start, end - 1):
+            if time.perf_counter() >= stop_time:
+                break
+            if positions_at is None:
+                reversals = [(i, j) for j in range(i + 1, end)]
+            else:
+                reversals = self.candidate_reversals(packages, positions_at, i, start, end, neighbors)
+            for first, last in reversals:
+                a = self.location_at(packages, first - 1)
+                b = self.location_at(packages, first)
+                c = self.location_at(packages, last)
+                d = self.location_at(packages, last + 1)
+                delta = distance(a, c) + distance(b, d) - distance(a, b) - distance(c, d)
+                if delta >= -1e-9:
+                    continue
+                candidate = packages[:first] + packages[first:last + 1][::-1] + packages[last + 1:]
+                candidate_lateness = self.lateness(candidate, departure, deadlines)
+                if not self.keeps_deadlines(current_lateness, candidate_lateness):
+                    continue
+                packages[:] = candidate
+                current_lateness = candidate_lateness
+                improved = True
+                if positions_at is not None:
+                    positions_at = self.segment_positions(packages, start, end, neighbors)
+                    break
+        return improved
+
+    """
+    This method returns the 2-opt moves, as the first and last position to reverse, that make a new leg from the stop
+    before the supplied position or the package at it to one of its candidate neighbors between the start and end
+    positions of the segment. Every 2-opt move that shortens the route makes at least one new leg shorter than a leg
+    it removes, so the moves that join nearby stops are the ones worth trying.
+    This has a Big O time complexity of O(K log K), with K being the number of candidate neighbors.
+    This has a Big O space complexity of O(K).
+    """
+    def candidate_reversals(self, packages, positions_at, position, start, end, neighbors):
+        reversals = set()
+        for neighbor_position in neighbors.positions_near(positions_at, self.location_at(packages, position - 1),
+                                                          start, end):
+            if neighbor_position > position:
+                reversals.add((position, neighbor_position))
+            elif neighbor_position < position - 1:
+                reversals.add((neighbor_position + 1, position - 1))
+        for neighbor_position in neighbors.positions_near(positions_at, self.location_at(packages, position),
+                                                          start, end):
+            if neighbor_position > position + 1:
+                reversals.add((position, neighbor_position - 1))
+            elif neighbor_position < position - 1:
+                reversals.add((neighbor_position, position - 1))
+        return sorted(reversals)
+
+    """
+    This method makes the first shortening Or-opt move it finds for each chain of one to three packages inside the
+    segment. An Or-opt move takes the chain out of the route and puts it back between two other packages of the same
+    segment, which only changes the three legs around where it was taken from and where it was put. With candidate
+    neighbors of the route the chain is only put after a neighbor of its first package or before a neighbor of its
+    last package.
+    Returns True when any move was made.
+    This has a Big O time complexity of O(N^2), with N being the number of packages in the segment, or O(N * K) for
+    the moves checked with K candidate neighbors, plus O(N) for each move made.
+    This has a Big O space complexity of O(N) for the reordered package list.
+    """
+    def or_opt_pass(self, packages, start, end, departure, deadlines, stop_time, neighbors=None):
+        distance = self.distance_matrix.distance
+        improved = False
+        current_lateness = self.lateness(packages, departure, deadlines)
+        positions_at = self.segment_positions(packages, start, end, neighbors)
+        for chain_length in range(1, 4):
+            i = start
+            while i + chain_length <= end:
+                if time.perf_counter() >= stop_time:
+                    return improved
+                first = self.location_at(packages, i)
+                last = self.location_at(packages, i + chain_length - 1)
+                before = self.location_at(packages, i - 1)
+                after = self.location_at(packages, i + chain_length)
+                removal_gain = distance(before, first) + distance(last, after) - distance(before, after)
+                moved = False
+                if positions_at is None:
+                    insert_positions = range(start, end + 1)
+                else:
+                    near_first = neighbors.positions_near(positions_at, first, start, end)
+                    near_last = neighbors.positions_near(positions_at, last, start, end)
+                    insert_positions = sorted(set([position + 1 for position in near_first] + near_last +
+                                                  [start, end]))
+                for k in insert_positions:
+                    if i <= k <= i + chain_length:
+                        continue
+                    p = self.location_at(packages, k - 1)
+                    q = self.location_at(packages, k)
+                    delta = distance(p, first) + distance(last, q) - distance(p, q) - removal_gain
+                    if delta >= -1e-9:
+                        continue
+                    chain = packages[i:i + chain_length]
+                    rest = packages[:i] + packages[i + chain_length:]
+                    insert_at = k if k < i else k - chain_length
+                    candidate = rest[:insert_at] + chain + rest[insert_at:]
+                    candidate_lateness = self.lateness(candidate, departure, deadlines)
+                    if not self.keeps_deadlines(current_lateness, candidate_lateness):
+                        continue
+                    packages[:] = candidate
+                    current_lateness = candidate_lateness
+                    improved = True
+                    moved = True
+                    positions_at = self.segment_positions(packages, start, end, neighbors)
+                    break
+                if not moved:
+                    i += 1
+        return improved
@@ -0,0 +1,150 @@
+"""
+This class runs many what-if delivery scenarios, such as different departure times, numbers of trucks and drivers or
+truck speeds, side by side on every core with a process pool. Each scenario is simulated by its own Loading and
+Delivery instance. The distance matrix is loaded once and placed in shared memory, so every worker process reads the
+same distances without them being copied or pickled for each scenario.
+"""
+import concurrent.futures
+from multiprocessing import shared_memory
+import DistanceMatrix
+import LoadingAndDelivery
+import SimulationTime
+
+# Distance matrix of the worker process, attached to the shared memory when the worker starts.
+worker_distance_matrix = None
+# Shared memory block of the worker process, kept open for as long as the worker runs.
+worker_shared_memory = None
+# Package file used by the worker process.
+worker_package_filename = None
+
+
+class Scenario:
+    """
+    This is the initializer for a scenario, taking its name and the settings that differ from the normal day: the
+    number of trucks and drivers, the truck speed in miles per second, the departure time of each truck in
+    milliseconds since midnight, whether the routes are improved, whether the trucks are routed to meet the time
+    windows of the packages, the number of candidate neighbors to route with, whether the locations are split into
+    zones, the most kilos a truck holds on a trip, the most trips each truck makes and the most locations of a priority
+    level to order with the exact routing. Settings left as None use the normal value.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, name, truck_count=3, driver_count=2, truck_speed=None, departure_times=None,
+                 improve_routes=False, time_window_routing=False, neighbor_count=None, zone_clustering=False,
+                 truck_weight_capacity=None, trip_count=1, exact_route_stops=None):
+        self.name = name
+        self.truck_count = truck_count
+        self.driver_count = driver_count
+        self.truck_speed = truck_speed
+        self.departure_times = departure_times
+        self.improve_routes = improve_routes
+        self.time_window_routing = time_window_routing
+        self.neighbor_count = neighbor_count
+        self.zone_clustering = zone_clustering
+        self.truck_weight_capacity = truck_weight_capacity
+        self.trip_count = trip_count
+        self.exact_route_stops = exact_route_stops
+
+
+class ScenarioSweep:
+    """
+    This is the initializer for the scenario sweep, taking the package file and distance file every scenario uses and
+    the most worker processes to run at once, which defaults to the number of cores.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, package_filename, distance_filename, max_workers=None):
+        self.package_filename = package_filename
+        self.distance_filename = distance_filename
+        self.max_workers = max_workers
+
+    """
+    This method runs every supplied scenario in the process pool and returns a list of results in the same order as
+    the scenarios, each a dictionary of the scenario name, the total miles driven, the number of late packages, the
+    total minutes those packages were late and the time the last truck returned to the hub. A scenario that cannot be
+    planned, such as one whose trucks cannot all leave in time, gives a dictionary of its name and the error instead,
+    so the other scenarios still run.
+    This has a Big O time complexity of O(S * N^2 / P), with S being the number of scenarios, N the number of packages
+    and P the number of worker processes, for the loading of every scenario.
+    This has a Big O space complexity of O(L^2 + S), with L being the number of locations, because the distance matrix
+    is held once in shared memory.
+    """
+    def run(self, scenarios):
+        distance_matrix = DistanceMatrix.DistanceMatrix.from_csv(self.distance_filename)
+        matrix_bytes = memoryview(distance_matrix.distances).cast('B')
+        shared = shared_memory.SharedMemory(create=True, size=max(len(matrix_bytes), 1))
+        try:
+            shared.buf[:len(matrix_bytes)] = matrix_bytes
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers, initializer=start_worker,
+                                                        initargs=(shared.name, distance_matrix.keys,
+                                                                  self.package_filename)) as executor:
+                return list(executor.map(run_scenario, scenarios))
+        finally:
+            matrix_bytes.release()
+            shared.close()
+            shared.unlink()
+
+    """
+    This method formats a list of scenario results as a text table with one row for each scenario, showing the error
+    in place of the totals for a scenario that failed.
+    This has a Big O time and space complexity of O(S), with S being the number of scenarios.
+    """
+    @staticmethod
+    def format_results(results):
+        lines = ['{:<30} | {:>11} | {:>13} | {:>15} | {}'.format('Scenario', 'Total miles', 'Late packages',
+                                                               'Minutes late', 'Last return')]
+        for result in results:
+            if 'error' in result:
+                lines.append(f'{result["scenario"]:<30} | failed: {result["error"]}')
+                continue
+            lines.append(f'{result["scenario"]:<30} | {result["total_miles"]:>11.1f} | '
+                         f'{result["late_packages"]:>13} | {result["total_lateness_minutes"]:>15.1f} | '
+                         f'{result["last_return"]}')
+        return '\n'.join(lines)
+
+
+"""
+This function starts a worker process by attaching to the shared memory that holds the distance matrix and wrapping
+it in a distance matrix with the supplied location keys. The distances are read in place, not copied.
+This has a Big O time complexity of O(L), with L being the number of locations, for the key index.
+This has a Big O space complexity of O(L).
+"""
+def start_worker(shared_memory_name, keys, package_filename):
+    global worker_distance_matrix, worker_shared_memory, worker_package_filename
+    worker_shared_memory = shared_memory.SharedMemory(name=shared_memory_name)
+    size = len(keys)
+    distances = worker_shared_memory.buf[:size * size * 8].cast('d')
+    worker_distance_matrix = DistanceMatrix.DistanceMatrix(keys, distances)
+    worker_package_filename = package_filename
+
+
+"""
+This function simulates the supplied scenario in a worker process and returns its result dictionary, or a dictionary
+of its name and the error when the scenario cannot be planned.
+This has a Big O time complexity of O(N^2), with N being the number of packages, for loading the trucks.
+This has a Big O space complexity of O(N).
+"""
+def run_scenario(scenario):
+    try:
+        program = LoadingAndDelivery.LoadingAndDelivery(worker_package_filename, None,
+                                                        improve_routes=scenario.improve_routes,
+                                                        truck_count=scenario.truck_count,
+                                                        driver_count=scenario.driver_count,
+                                                        truck_speed=scenario.truck_speed,
+                                                        departure_times=scenario.departure_times,
+                                                        distance_matrix=worker_distance_matrix,
+                                                        time_window_routing=scenario.time_window_routing,
+                                                        neighbor_count=scenario.neighbor_count,
+                                                        zone_clustering=scenario.zone_clustering,
+                                                        truck_weight_capacity=scenario.truck_weight_capacity,
+                                                        trip_count=scenario.trip_count,
+                                                        exact_route_stops=scenario.exact_route_stops)
+    except ValueError as error:
+        return {'scenario': scenario.name, 'error': str(error)}
+    with program:
+        late = program.late_packages()
+        last_return = max([truck.last_delivery_time for truck in program.trucks if len(truck.loaded_packages) > 0],
+                          default=program.day_start)
+        return {'scenario': scenario.name,
+                'total_miles': program.total_miles(),
+                'late_packages': len(late),
+                'total_lateness_minutes': sum([lateness for package_id, lateness in late]) / SimulationTime.minute,
+                'last_return': SimulationTime.format_clock(last_return)}
@@ -0,0 +1,70 @@
+"""
+This module holds the time arithmetic of the simulation. Every time of day in the simulation is an integer number of
+milliseconds since midnight, so adding travel times is exact integer addition with no objects made for each stop.
+Times are only converted to and from hours, minutes and seconds where they are entered or shown to the user.
+"""
+import datetime
+
+# Milliseconds in a second, a minute, an hour and a day.
+second = 1000
+minute = 60 * second
+hour = 60 * minute
+day = 24 * hour
+
+
+"""
+This function returns the time of day for the supplied hours, minutes and seconds, in milliseconds since midnight.
+This has a Big O space and time complexity of O(1).
+"""
+def clock(hours=0, minutes=0, seconds=0):
+    return hours * hour + minutes * minute + int(round(seconds * second))
+
+
+"""
+This function parses a time of day written as HH:MM or HH:MM:SS into milliseconds since midnight, raising a ValueError
+for any other text. The hour can only be 24 for 24:00 or 24:00:00, the end of the day.
+This has a Big O space and time complexity of O(1).
+"""
+def parse_clock(text):
+    parts = text.strip().split(':')
+    if len(parts) not in (2, 3) or not all(part.isdigit() for part in parts):
+        raise ValueError(f'{text!r} is not a time, use HH:MM:SS.')
+    hours, minutes, seconds = [int(part) for part in parts] + [0] * (3 - len(parts))
+    if hours > 24 or minutes >= 60 or seconds >= 60 or (hours == 24 and (minutes > 0 or seconds > 0)):
+        raise ValueError(f'{text!r} is not a time, use HH:MM:SS.')
+    return clock(hours, minutes, seconds)
+
+
+"""
+This function returns the milliseconds it takes to drive the supplied miles at the supplied speed in miles per
+second, rounded to the nearest millisecond.
+This has a Big O space and time complexity of O(1).
+"""
+def travel_time(miles, speed):
+    return int(round(miles * second / speed))
+
+
+"""
+This function converts a timedelta into milliseconds, so times entered as timedeltas can be used by the simulation.
+This has a Big O space and time complexity of O(1).
+"""
+def from_timedelta(time):
+    return time // datetime.timedelta(milliseconds=1)
+
+
+"""
+This function converts milliseconds into a timedelta.
+This has a Big O space and time complexity of O(1).
+"""
+def to_timedelta(milliseconds):
+    return datetime.timedelta(milliseconds=milliseconds)
+
+
+"""
+This function formats a time in milliseconds as H:MM:SS, the same way a timedelta is shown, leaving out the part of
+a second that has not passed yet.
+This has a Big O space and time complexity of O(1).
+"""
+def format_clock(milliseconds):
+    seconds = milliseconds // second
+    return f'{seconds // 3600}:{seconds // 60 % 60:02}:{seconds % 60:02}'
@@ -0,0 +1,177 @@
+"""
+This class routes a truck so that its packages arrive within their time windows. Each package has a window from the
+time it is available at the hub to its delivery deadline. The route is built by inserting one package at a time at the
+position that adds the fewest miles without making any package later. The slack of every position, the most miles that
+can be added before it without making a later package late, and the number of packages after it that are already late
+are kept up to date, so each position is checked in constant time.
+"""
+import time
+import SimulationTime
+
+
+class TimeWindowRouter:
+    """
+    This is the initializer for the time window router, taking the distance matrix, the location id of the hub, the
+    truck speed in miles per second and the time budget in seconds for routing one truck.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, distance_matrix, hub_location, truck_speed, time_budget=1.0):
+        self.distance_matrix = distance_matrix
+        self.hub_location = hub_location
+        self.truck_speed = truck_speed
+        self.time_budget = time_budget
+
+    """
+    This method returns the order the packages are inserted in: packages with deadlines first, earliest deadline
+    first, then the rest, with the packages furthest from the hub first in both.
+    This has a Big O time complexity of O(N log N), with N being the number of packages.
+    This has a Big O space complexity of O(N).
+    """
+    def insertion_order(self, packages, windows):
+        distance = self.distance_matrix.distance
+
+        def key(package):
+            due = windows[package.id][1]
+            return (due is None, due if due is not None else 0, -distance(self.hub_location, package.location_id))
+        return sorted(packages, key=key)
+
+    """
+    This method routes the loaded packages of the supplied truck, which has already been given its departure time, in
+    place and sets the time the truck is back at the hub as its last delivery time. The windows are a dictionary of
+    package id to the (available time, deadline) of the package, with a deadline of None for end of day packages. The
+    truck cannot leave before all of its packages are available, so when one is available later the truck is planned
+    to leave then instead. When the time budget runs out, the packages not yet routed are added to the end of the
+    route in insertion order.
+    This has a Big O time complexity of O(N^2), with N being the number of packages on the truck, because each of the
+    N insertions checks and updates every position of the route.
+    This has a Big O space complexity of O(N) for the route, the miles and the slack.
+    """
+    def route(self, truck, windows):
+        packages = truck.loaded_packages
+        ready_time = max([windows[package.id][0] for package in packages], default=truck.departure_time)
+        if ready_time > truck.departure_time:
+            truck.set_planned_departure_time(ready_time)
+        departure = truck.departure_time
+        budgets = {}
+        for package in packages:
+            due = windows[package.id][1]
+            if due is not None:
+                budgets[package.id] = self.mile_budget(due, departure)
+
+        stop_time = time.perf_counter() + self.time_budget
+        route = []
+        remaining = self.insertion_order(packages, windows)
+        for count, package in enumerate(remaining):
+            if time.perf_counter() >= stop_time:
+                route.extend(remaining[count:])
+                break
+            self.insert(route, package, budgets)
+
+        truck.loaded_packages = route
+        truck.route_segments = [(0, len(route))] if len(route) > 0 else []
+        miles = self.route_miles(route)
+        truck.update_last_delivery_time(departure + SimulationTime.travel_time(miles, self.truck_speed))
+        return route
+
+    """
+    This method returns the miles a truck leaving at the supplied departure time can drive before the supplied
+    deadline, the budget of a package with that deadline.
+    This has a Big O space and time complexity of O(1).
+    """
+    def mile_budget(self, deadline, departure):
+        return (deadline - departure) * self.truck_speed / SimulationTime.second
+
+    """
+    This method inserts the supplied package into the route at the best position found by best_position.
+    This has a Big O time complexity of O(N), with N being the number of packages in the route.
+    This has a Big O space complexity of O(N).
+    """
+    def insert(self, route, package, budgets):
+        route.insert(self.best_position(route, package, budgets), package)
+
+    """
+    This method returns the position of the route, at or after the first position, where the supplied package adds
+    the fewest miles while keeping every package within the miles it can be driven before its deadline, its budget.
+    When every position makes some package later, the package goes where the lateness added, counted in miles past
+    the budgets, is the least. The lateness added at a position is the lateness of the new package, plus the added
+    miles for each package after it that is already late, plus the added miles past the slack for the packages after
+    it that are not late yet.
+    This has a Big O time complexity of O(N), with N being the number of packages in the route, to find the position
+    and to update the miles and slack.
+    This has a Big O space complexity of O(N).
+    """
+    def best_position(self, route, package, budgets, first_position=0):
+        distance = self.distance_matrix.distance
+        hub = self.hub_location
+        location = package.location_id
+        budget = budgets.get(package.id)
+        miles, slack, late_after = self.route_slack(route, budgets)
+
+        best_position = first_position
+        best_late = float('inf')
+        best_added = float('inf')
+        previous = hub if first_position == 0 else route[first_position - 1].location_id
+        previous_miles = 0.0 if first_position == 0 else miles[first_position - 1]
+        for position in range(first_position, len(route) + 1):
+            following = route[position].location_id if position < len(route) else hub
+            to_package = distance(previous, location)
+            added = to_package + distance(location, following) - distance(previous, following)
+            late = max(0.0, added - slack[position]) + added * late_after[position]
+            if budget is not None:
+                late += max(0.0, previous_miles + to_package - budget)
+            if late <= 1e-9:
+                late = 0.0
+            if late < best_late or (late == best_late and added < best_added):
+                best_late = late
+                best_added = added
+                best_position = position
+            if position < len(route):
+                previous = following
+                previous_miles = miles[position]
+        return best_position
+
+    """
+    This method returns the miles driven when each package of the route is delivered, the slack before each position,
+    the most miles that can be added there without a later package that is on time going past its budget, and the
+    number of packages after each position that are already past their budgets. The slack after the last package is
+    infinite.
+    This has a Big O time complexity of O(N), with N being the number of packages in the route.
+    This has a Big O space complexity of O(N).
+    """
+    def route_slack(self, route, budgets):
+        distance = self.distance_matrix.distance
+        miles = []
+        total = 0.0
+        previous = self.hub_location
+        for package in route:
+            total += distance(previous, package.location_id)
+            miles.append(total)
+            previous = package.location_id
+
+        slack = [float('inf')] * (len(route) + 1)
+        late_after = [0] * (len(route) + 1)
+        for position in range(len(route) - 1, -1, -1):
+            slack[position] = slack[position + 1]
+            late_after[position] = late_after[position + 1]
+            budget = budgets.get(route[position].id)
+            if budget is None:
+                continue
+            if budget - miles[position] < -1e-9:
+                late_after[position] += 1
+            else:
+                slack[position] = min(slack[position], max(budget - miles[position], 0.0))
+        return miles, slack, late_after
+
+    """
+    This method returns the miles of the route through the supplied packages, starting and ending at the hub.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(1).
+    """
+    def route_miles(self, route):
+        distance = self.distance_matrix.distance
+        miles = 0.0
+        previous = self.hub_location
+        for package in route:
+            miles += distance(previous, package.location_id)
+            previous = package.location_id
+        return miles + distance(previous, self.hub_location)
@@ -0,0 +1,286 @@
+"""
+This class runs a local HTTP tracking service for the simulated delivery day on asyncio. The day is simulated once and
+the status changes of every package are kept in a tracking index, so a lookup of where a package is at a time, or of
+the miles the fleet has driven, is a binary search of the index and never simulates the day again. When the manifest
+changes the day is simulated again in a worker thread into a new index, which then replaces the old one in a single
+assignment, so every request is answered from either the old or the new day and never a mix of them. Live events,
+such as address changes, are applied the same way.
+"""
+import asyncio
+import json
+import os
+import urllib.parse
+import LiveEvents
+import SimulationTime
+
+
+class TrackingIndex:
+    """
+    This is the initializer for the tracking index, taking a Loading and Delivery instance that has simulated its day
+    and a version number. The details of every package are copied out of the package hash table and the delivery
+    timeline is kept as it is, so the index does not change when the instance simulates the day again.
+    This has a Big O time complexity of O(N), with N being the number of packages.
+    This has a Big O space complexity of O(N) for the package details.
+    """
+    def __init__(self, program, version):
+        self.version = version
+        self.timeline = program.delivery_timeline
+        self.truck_names = [truck.name for truck in program.trucks]
+        self.packages = {}
+        for package in program.package_hash_table.packages():
+            self.packages[package.id] = {'id': package.id, 'address': package.address, 'city': package.city,
+                                         'state': package.state, 'zip': package.zip, 'weight': package.weight,
+                                         'deadline': package.delivery_deadline}
+
+    """
+    This method returns the details of the supplied package at the supplied time, or None when there is no such
+    package.
+    This has a Big O time complexity of O(log N), with N being the number of events for the package.
+    This has a Big O space complexity of O(1).
+    """
+    def package(self, package_id, time):
+        details = self.packages.get(package_id)
+        if details is None:
+            return None
+        record = dict(details)
+        address = self.timeline.package_address(package_id, time)
+        if address is not None:
+            record['address'], record['city'], record['state'], record['zip'] = address
+        record['status'] = self.timeline.package_status(package_id, time)
+        return record
+
+    """
+    This method returns the miles each truck has driven by the supplied time and the total miles of the fleet.
+    This has a Big O time complexity of O(T log N), with T being the number of trucks and N the number of events.
+    This has a Big O space complexity of O(T).
+    """
+    def miles(self, time):
+        truck_miles = {name: self.timeline.truck_miles(name, time) for name in self.truck_names}
+        return {'truck_miles': truck_miles, 'total_miles': sum(truck_miles.values())}
+
+
+class TrackingService:
+    # Reason phrases of the status codes the service answers with.
+    reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+    """
+    This is the initializer for the tracking service, taking the Loading and Delivery instance to serve, the host and
+    port to listen on and how often in seconds to check the manifest for changes, with 0 to only refresh when asked.
+    The instance is only used to simulate the day again, requests are answered from the tracking index.
+    This has a Big O time complexity of O(N), with N being the number of packages, to build the first index.
+    This has a Big O space complexity of O(N).
+    """
+    def __init__(self, program, host='127.0.0.1', port=8080, watch_interval=0.0):
+        self.program = program
+        self.host = host
+        self.port = port
+        self.watch_interval = watch_interval
+        self.index = TrackingIndex(program, 1)
+        self.refresh_lock = None
+        self.server = None
+        self.watch_task = None
+        self.last_error = None
+
+    """
+    This method imports the manifest again in a worker thread and, when anything changed, builds a new tracking index
+    and swaps it in. Only one refresh runs at a time. Returns the number of added, changed, unchanged, removed and
+    duplicate packages and the version of the index.
+    This has a Big O time complexity of O(N^2) when the manifest changed, for loading the trucks again, and O(N)
+    otherwise.
+    This has a Big O space complexity of O(N) for the new index.
+    """
+    async def refresh(self):
+        async with self.refresh_lock:
+            loop = asyncio.get_running_loop()
+            counts = await loop.run_in_executor(None, self.reload)
+            self.last_error = None
+            return dict(counts, version=self.index.version)
+
+    """
+    This method imports the manifest again and builds a new tracking index when anything changed. It runs in a worker
+    thread, and the index is swapped in with one assignment once it is complete. A manifest that cannot be read or
+    planned raises its error and leaves both the day and the index as they were.
+    This has the same Big O time and space complexity as refresh.
+    """
+    def reload(self):
+        counts = self.program.reload_package_data()
+        if counts['added'] > 0 or counts['changed'] > 0 or counts['removed'] > 0:
+            self.index = TrackingIndex(self.program, self.index.version + 1)
+        return counts
+
+    """
+    This method applies the supplied live event in a worker thread, repairing the routes it affects, and swaps in a
+    new tracking index. Events are applied one at a time, and never while the manifest is being imported. Returns the
+    names of the trucks whose routes were repaired and the version of the index.
+    This has a Big O time complexity of O(N log N), with N being the number of packages, to simulate the day again.
+    This has a Big O space complexity of O(N) for the new index.
+    """
+    async def apply_event(self, event):
+        async with self.refresh_lock:
+            loop = asyncio.get_running_loop()
+            repaired = await loop.run_in_executor(None, self.apply_event_now, event)
+            return {'repaired_trucks': repaired, 'version': self.index.version}
+
+    """
+    This method applies the supplied live event and builds a new tracking index. It runs in a worker thread.
+    This has the same Big O time and space complexity as apply_event.
+    """
+    def apply_event_now(self, event):
+        repaired = self.program.apply_event(event)
+        self.index = TrackingIndex(self.program, self.index.version + 1)
+        return repaired
+
+    """
+    This method checks the modification time of the manifest every watch interval and refreshes the index when the
+    file has changed. A manifest that cannot be read or imported is saved as the last error and the current index is
+    kept.
+    This has a Big O time complexity of O(1) for each check, plus a refresh when the manifest changed.
+    This has a Big O space complexity of O(1).
+    """
+    async def watch_manifest(self):
+        filename = self.program.package_filename
+        modified = os.stat(filename).st_mtime_ns
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            try:
+                current = os.stat(filename).st_mtime_ns
+            except OSError:
+                continue
+            if current != modified:
+                modified = current
+                try:
+                    await self.refresh()
+                except (ValueError, OSError) as error:
+                    self.last_error = str(error)
+
+    """
+    This method answers one request, taking the method, the path, the query string values and the body, and returns
+    the status code and the dictionary to send back as JSON. The routes are GET /packages/<id>?time=HH:MM:SS for the
+    details of a package, GET /miles?time=HH:MM:SS for the miles of the fleet, GET /health for the version of the
+    index, POST /refresh to import the manifest again and POST /events with a JSON event, as read by
+    LiveEvents.event_from_dict, to apply a live event. The health shows the last error from importing the manifest,
+    if the last import failed.
+    This has a Big O time complexity of O(log N) for a lookup, with N being the number of events for the package.
+    This has a Big O space complexity of O(1).
+    """
+    async def respond(self, method, path, query, body=b''):
+        index = self.index
+        parts = [part for part in path.split('/') if part != '']
+        if parts == ['events']:
+            if method != 'POST':
+                return 405, {'error': 'Use POST to send an event.'}
+            try:
+                fields = json.loads(body or b'null')
+                if not isinstance(fields, dict):
+                    raise ValueError('The event must be a JSON object.')
+                return 200, await self.apply_event(LiveEvents.event_from_dict(fields))
+            except json.JSONDecodeError as error:
+                return 400, {'error': f'The event is not valid JSON: {error.msg}.'}
+            except ValueError as error:
+                return 400, {'error': str(error)}
+        if parts == ['refresh']:
+            if method != 'POST':
+                return 405, {'error': 'Use POST to refresh.'}
+            try:
+                return 200, await self.refresh()
+            except (ValueError, OSError) as error:
+                self.last_error = str(error)
+                return 400, {'error': self.last_error}
+        if method != 'GET':
+            return 405, {'error': f'Use GET for {path}.'}
+        if parts == ['health']:
+            return 200, {'version': index.version, 'packages': len(index.packages), 'last_error': self.last_error}
+        if parts != ['miles'] and (len(parts) != 2 or parts[0] != 'packages'):
+            return 404, {'error': f'There is nothing at {path}.'}
+        try:
+            time = SimulationTime.parse_clock(query.get('time', [''])[0])
+        except ValueError as error:
+            return 400, {'error': str(error)}
+        if parts[0] == 'miles':
+            return 200, dict(index.miles(time), time=SimulationTime.format_clock(time), version=index.version)
+        if not parts[1].isdigit():
+            return 400, {'error': f'{parts[1]!r} is not a package id.'}
+        record = index.package(int(parts[1]), time)
+        if record is None:
+            return 404, {'error': f'Package {parts[1]} was not found.'}
+        return 200, {'time': SimulationTime.format_clock(time), 'version': index.version, 'package': record}
+
+    """
+    This method serves the requests of one connection, keeping the connection open between requests unless the
+    client asks to close it.
+    This has a Big O time complexity of O(R), with R being the number of requests on the connection.
+    This has a Big O space complexity of O(1).
+    """
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if request_line == b'':
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.send(writer, 400, {'error': 'The request line is not valid.'}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length', '0') or '0')
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    await self.send(writer, 400, {'error': 'The Content-Length header is not valid.'}, False)
+                    break
+                body = await reader.readexactly(length) if length > 0 else b''
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                url = urllib.parse.urlsplit(target)
+                try:
+                    status, answer = await self.respond(method, url.path, urllib.parse.parse_qs(url.query), body)
+                except Exception as error:
+                    status, answer = 500, {'error': str(error)}
+                await self.send(writer, status, answer, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    """
+    This method writes a response with the supplied status code and dictionary as the JSON body.
+    This has a Big O space and time complexity of O(B), with B being the size of the body.
+    """
+    async def send(self, writer, status, body, keep_alive):
+        payload = json.dumps(body).encode()
+        writer.write(f'HTTP/1.1 {status} {self.reasons[status]}\r\nContent-Type: application/json\r\n'
+                     f'Content-Length: {len(payload)}\r\nConnection: {"keep-alive" if keep_alive else "close"}'
+                     f'\r\n\r\n'.encode() + payload)
+        await writer.drain()
+
+    """
+    This method starts listening for connections, and starts watching the manifest when a watch interval was given.
+    This has a Big O space and time complexity of O(1).
+    """
+    async def start(self):
+        self.refresh_lock = asyncio.Lock()
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        if self.watch_interval > 0:
+            self.watch_task = asyncio.create_task(self.watch_manifest())
+        return self.server
+
+    """
+    This method starts the service and serves requests until it is stopped.
+    This has a Big O space and time complexity of O(1), apart from the requests served.
+    """
+    async def serve_forever(self):
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
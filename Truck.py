@@ -1,19 +1,53 @@
 """
 This class contains the delivery truck information.
 """
-import datetime
+import SimulationTime
 
 
 class Truck:
+    # Words used to name the trucks by their number.
+    number_words = ['Zero', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine', 'Ten', 'Eleven',
+                    'Twelve', 'Thirteen', 'Fourteen', 'Fifteen', 'Sixteen', 'Seventeen', 'Eighteen', 'Nineteen',
+                    'Twenty']
+
     """
-    This is the initializer for the truck objects, with predefined information saved in for each truck.
-    This has a Big O time complexity of O(1), with 5 single operations.
+    This is the initializer for the truck objects, with predefined information saved in for each truck. The route 
+    segments are the start and end positions in the loaded packages of each priority level that was loaded, and the 
+    capacity is the most packages the truck can hold on one trip, and the weight capacity the most kilos, or None for 
+    no limit. The trip starts are the positions in the loaded packages where the truck has come back to the hub and is 
+    loaded again, after its first trip. The planned departure time is when the truck is loaded to leave, and the 
+    departure time is when it actually leaves once it has a driver. Times are in milliseconds since midnight.
+    This has a Big O time complexity of O(1), with 11 single operations.
     """
-    def __init__(self):
+    def __init__(self, name='Truck', capacity=16, weight_capacity=None):
+        self.name = name
+        self.capacity = capacity
+        self.weight_capacity = weight_capacity
+        self.trip_starts = []
         self.miles_driven = 0
         self.loaded_packages = []
-        self.departure_time = datetime.timedelta(hours=8, minutes=0, seconds=0)
-        self.last_delivery_time = datetime.timedelta(hours=8, minutes=0, seconds=0)
+        self.route_segments = []
+        self.planned_departure_time = SimulationTime.clock(8)
+        self.departure_time = SimulationTime.clock(8)
+        self.last_delivery_time = SimulationTime.clock(8)
+        self.returned_from_run = False
+
+    """
+    This method sets the time the truck is planned to leave once it is loaded, and sets it as the departure time.
+    This has a Big O space and time complexity of O(1).
+    """
+    def set_planned_departure_time(self, departure_time):
+        self.planned_departure_time = departure_time
+        self.set_departure_time(departure_time)
+
+    """
+    This method starts a new run of the truck leaving at the supplied departure time, clearing the miles driven and 
+    the returned from run flag from any earlier simulation of the run.
+    This has a Big O space and time complexity of O(1).
+    """
+    def begin_run(self, departure_time):
+        self.set_departure_time(departure_time)
+        self.miles_driven = 0
         self.returned_from_run = False
 
     """
@@ -54,6 +88,107 @@ class Truck:
     def reset_truck(self):
         self.miles_driven = 0
         self.loaded_packages = []
-        self.departure_time = datetime.timedelta(hours=8, minutes=0, seconds=0)
-        self.last_delivery_time = datetime.timedelta(hours=8, minutes=0, seconds=0)
+        self.route_segments = []
+        self.trip_starts = []
+        self.planned_departure_time = SimulationTime.clock(8)
+        self.departure_time = SimulationTime.clock(8)
+        self.last_delivery_time = SimulationTime.clock(8)
         self.returned_from_run = False
+
+    """
+    This method returns the start and end positions in the loaded packages of every trip the truck makes.
+    The Big O time and space complexity is O(T), with T being the number of trips.
+    """
+    def trip_bounds(self):
+        starts = [0] + self.trip_starts
+        ends = self.trip_starts + [len(self.loaded_packages)]
+        return list(zip(starts, ends))
+
+    """
+    This method returns True when the trip holding the supplied position, or the first trip when the truck has no 
+    packages, has room for one more package of the supplied weight.
+    The Big O time complexity is O(N), with N being the number of packages on the trip.
+    The Big O space complexity is O(T), with T being the number of trips.
+    """
+    def has_room(self, position, weight):
+        for start, end in self.trip_bounds():
+            if position <= end:
+                break
+        if end - start >= self.capacity:
+            return False
+        if self.weight_capacity is None:
+            return True
+        return sum([package.weight for package in self.loaded_packages[start:end]]) + weight <= self.weight_capacity
+
+    """
+    This method returns the name for the truck with the supplied number, such as 'Truck Three' for truck 3. Numbers 
+    past twenty are written as digits.
+    The Big O space and time complexity is O(1).
+    """
+    @staticmethod
+    def name_for_number(number):
+        if number < len(Truck.number_words):
+            return 'Truck ' + Truck.number_words[number]
+        return 'Truck ' + str(number)
+
+    """
+    This method returns the delivery status of a package that has been loaded on this truck and has left the hub.
+    The Big O space and time complexity is O(1).
+    """
+    def loaded_status(self):
+        return 'Loaded in ' + self.name.lower()
+
+    """
+    This method takes the package at the supplied position out of the route and returns it, shrinking the route 
+    segment and trip it was in and moving the later segments and trips back by one.
+    The Big O time complexity is O(N + S), with N being the number of loaded packages and S the number of segments.
+    The Big O space complexity is O(S).
+    """
+    def remove_stop(self, position):
+        package = self.loaded_packages.pop(position)
+        segments = []
+        for start, end in self.route_segments:
+            if position < start:
+                start -= 1
+                end -= 1
+            elif position < end:
+                end -= 1
+            if end > start:
+                segments.append((start, end))
+        self.route_segments = segments
+        trip_starts = []
+        for start in self.trip_starts:
+            if position < start:
+                start -= 1
+            if 0 < start < len(self.loaded_packages) and start not in trip_starts:
+                trip_starts.append(start)
+        self.trip_starts = trip_starts
+        return package
+
+    """
+    This method puts the supplied package into the route at the supplied position, growing the first route segment 
+    that the position is in or at the end of, and the trip holding that segment, and moving the later segments and 
+    trips forward by one.
+    The Big O time complexity is O(N + S), with N being the number of loaded packages and S the number of segments.
+    The Big O space complexity is O(S).
+    """
+    def insert_stop(self, position, package):
+        self.loaded_packages.insert(position, package)
+        segments = []
+        grown = False
+        joins_later_trip = False
+        for start, end in self.route_segments:
+            if not grown and start <= position <= end:
+                # A segment starting at a trip boundary belongs to the later trip, and so does the stop it grows by.
+                joins_later_trip = start == position and position in self.trip_starts
+                end += 1
+                grown = True
+            elif grown or position < start:
+                start += 1
+                end += 1
+            segments.append((start, end))
+        if not grown:
+            segments.append((position, position + 1))
+        self.route_segments = segments
+        self.trip_starts = [start + 1 if start > position or (start == position and not joins_later_trip) else start
+                            for start in self.trip_starts]
@@ -0,0 +1,71 @@
+"""
+This class is the NumPy backend for the nearest neighbor loading and the route mileage. It views the distance matrix
+as a NumPy array without copying it, so the closest remaining stop is picked with one masked argmin over a row of the
+matrix, and the miles of a whole route are found with one gather and sum. NumPy is optional, when it is not installed
+the available() check returns False and the pure Python loops are used instead.
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class VectorizedRouting:
+    """
+    This is the initializer for the vectorized routing, wrapping the flat buffer of the supplied distance matrix in
+    a two dimensional NumPy array. The buffer is shared, not copied.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, distance_matrix):
+        self.size = distance_matrix.size
+        self.matrix = numpy.frombuffer(distance_matrix.distances, dtype=numpy.float64).reshape(self.size, self.size)
+
+    """
+    This method returns True when NumPy is installed and the vectorized routing can be used.
+    This has a Big O space and time complexity of O(1).
+    """
+    @staticmethod
+    def available():
+        return numpy is not None
+
+    """
+    This method returns the position in the candidate locations of the closest location to the start location that
+    is still remaining. The remaining argument is a boolean array with one entry per candidate.
+    This has a Big O time complexity of O(N), with N being the number of candidates, done in one vectorized pass.
+    This has a Big O space complexity of O(N) for the gathered row of distances.
+    """
+    def closest(self, start_location, candidate_locations, remaining):
+        distances = numpy.where(remaining, self.matrix[start_location, candidate_locations], numpy.inf)
+        return int(numpy.argmin(distances))
+
+    """
+    This method orders the candidate locations by nearest neighbor, starting from the start location and always
+    moving to the closest remaining candidate. It returns the positions of the candidates in the order they are
+    visited. Ties go to the candidate that comes first in the list, the same as the pure Python nearest neighbor.
+    This has a Big O time complexity of O(N^2), with N being the number of candidates, but each of the N picks is a
+    single vectorized argmin.
+    This has a Big O space complexity of O(N).
+    """
+    def nearest_neighbor_order(self, start_location, candidate_locations):
+        candidate_locations = numpy.asarray(candidate_locations, dtype=numpy.intp)
+        remaining = numpy.ones(len(candidate_locations), dtype=bool)
+        order = []
+        current_location = start_location
+        for _ in range(len(candidate_locations)):
+            position = self.closest(current_location, candidate_locations, remaining)
+            remaining[position] = False
+            order.append(position)
+            current_location = candidate_locations[position]
+        return order
+
+    """
+    This method returns the total miles of a route given as a list of location ids, by gathering the distance of
+    every leg from the matrix at once and adding them together.
+    This has a Big O time complexity of O(N), with N being the number of locations in the route.
+    This has a Big O space complexity of O(N) for the gathered legs.
+    """
+    def route_miles(self, route_locations):
+        route_locations = numpy.asarray(route_locations, dtype=numpy.intp)
+        if len(route_locations) < 2:
+            return 0.0
+        return float(self.matrix[route_locations[:-1], route_locations[1:]].sum())
@@ -0,0 +1,90 @@
+"""
+This class splits the delivery locations into one zone for each truck, so every truck serves one area of the region.
+Only the distance matrix is known, not where the locations are on a map, so the zones are found with k-medoids: the
+first centers are spread out by always taking the location furthest from the centers so far, every location joins
+its closest center, and each center then moves to the member closest to a sample of the other members of its zone.
+"""
+import random
+
+
+class ZoneClustering:
+    # Most members of a zone that a new center is compared against.
+    sample_size = 32
+    # Rounds of moving the centers and assigning the locations again.
+    iterations = 4
+
+    """
+    This is the initializer for the zone clustering, taking the distance matrix, the location id of the hub and the
+    random seed used to sample the members of the zones.
+    This has a Big O space and time complexity of O(1).
+    """
+    def __init__(self, distance_matrix, hub_location, seed=2021):
+        self.distance_matrix = distance_matrix
+        self.hub_location = hub_location
+        self.seed = seed
+
+    """
+    This method splits the supplied location ids into the supplied number of zones and returns a dictionary of
+    location id to zone number, from 0. The same locations always give the same zones.
+    This has a Big O time complexity of O(L * Z * I + L * S), with L being the number of locations, Z the number of
+    zones, I the iterations and S the sample size.
+    This has a Big O space complexity of O(L).
+    """
+    def zones(self, locations, zone_count):
+        locations = sorted(set(locations))
+        if len(locations) == 0 or zone_count < 1:
+            return {}
+        centers = self.first_centers(locations, zone_count)
+        zone_of = self.assign(locations, centers)
+        sampler = random.Random(self.seed)
+        for _ in range(self.iterations):
+            members = [[] for _ in centers]
+            for location in locations:
+                members[zone_of[location]].append(location)
+            moved = [self.medoid(zone_members, sampler) if len(zone_members) > 0 else center
+                     for zone_members, center in zip(members, centers)]
+            if moved == centers:
+                break
+            centers = moved
+            zone_of = self.assign(locations, centers)
+        return zone_of
+
+    """
+    This method picks the first centers of the zones, starting with the location furthest from the hub and then
+    always taking the location furthest from every center picked so far.
+    This has a Big O time complexity of O(L * Z), with L being the number of locations and Z the number of zones.
+    This has a Big O space complexity of O(L).
+    """
+    def first_centers(self, locations, zone_count):
+        distance = self.distance_matrix.distance
+        closest = {location: distance(self.hub_location, location) for location in locations}
+        centers = []
+        for _ in range(min(zone_count, len(locations))):
+            center = max(locations, key=lambda location: (closest[location], -location))
+            centers.append(center)
+            for location in locations:
+                closest[location] = min(closest[location], distance(center, location))
+        return centers
+
+    """
+    This method returns a dictionary of each supplied location to the number of its closest center.
+    This has a Big O time complexity of O(L * Z), with L being the number of locations and Z the number of centers.
+    This has a Big O space complexity of O(L).
+    """
+    def assign(self, locations, centers):
+        distance = self.distance_matrix.distance
+        zone_of = {}
+        for location in locations:
+            zone_of[location] = min(range(len(centers)), key=lambda zone: (distance(centers[zone], location), zone))
+        return zone_of
+
+    """
+    This method returns the member of a zone with the least total distance to a sample of the members, the new
+    center of the zone.
+    This has a Big O time complexity of O(M * S), with M being the number of members and S the sample size.
+    This has a Big O space complexity of O(S).
+    """
+    def medoid(self, members, sampler):
+        distance = self.distance_matrix.distance
+        sample = members if len(members) <= self.sample_size else sampler.sample(members, self.sample_size)
+        return min(members, key=lambda member: (sum([distance(member, other) for other in sample]), member))
@@ -0,0 +1 @@
+# Lets the tests in the tests directory import the modules at the top of the repository.
@@ -6,76 +6,223 @@ called methods.
 The total space complexity is O(N^2), because that is achieved in the adjacency matrix with N being the addresses
 served, the space complexity for the package hash table is O(N) with n being the packages.
 """
+import argparse
+import asyncio
+import json
+import sys
+import BatchQuery
+import Instrumentation
+import LazyPackageSource
+import LiveEvents
 import LoadingAndDelivery
-import datetime
+import MonteCarloRisk
+import SimulationTime
+import TrackingService
 
-user_entry = ''
-program_1 = LoadingAndDelivery.LoadingAndDelivery('packages.csv', 'distances.csv')
 
 """
 This allows the user to select what they wish to have happen, entered the requested information, and then begins the 
 simulation in the Loading And Delivery class.
 """
-while user_entry != 'exit':
-    print(f'Welcome to the WGUPS System, enter the number for the operation you wish to choose:')
-    print(f'1: view single package details.')
-    print(f'2: view all package details.')
-    print(f'3: view total miles driven.')
-    print(f'4: exit program.')
-    user_entry = input('Which number option would you like to choose? ')
-    package_number = -1
+def interactive(program_1):
+    user_entry = ''
+    while user_entry != 'exit':
+        print(f'Welcome to the WGUPS System, enter the number for the operation you wish to choose:')
+        print(f'1: view single package details.')
+        print(f'2: view all package details.')
+        print(f'3: view total miles driven.')
+        print(f'4: exit program.')
+        user_entry = input('Which number option would you like to choose? ')
+        package_number = -1
 
-    if user_entry == '1':
-        package_number = int(input('What package number would you like to look up? '))
-        time_input = input('What time in military time would you like to view HH:MM:SS? ').split(':')
-        h = int(time_input[0])
-        m = int(time_input[1])
-        s = int(time_input[2])
-        user_time = datetime.timedelta(hours=h, minutes=m, seconds=s)
-        program_1.run_delivery_simulation(user_time, 'search', package_number)
-        print('')
-        continue_input = input('Would you like to continue? 1 to continue, 2 to exit: ')
-        if continue_input == '1':
-            continue
-        if continue_input == '2':
-            user_entry = 'exit'
-        else:
-            continue
+        if user_entry == '1':
+            package_number = int(input('What package number would you like to look up? '))
+            time_input = input('What time in military time would you like to view HH:MM:SS? ').split(':')
+            h = int(time_input[0])
+            m = int(time_input[1])
+            s = int(time_input[2])
+            user_time = SimulationTime.clock(h, m, s)
+            program_1.run_delivery_simulation(user_time, 'search', package_number)
+            print('')
+            continue_input = input('Would you like to continue? 1 to continue, 2 to exit: ')
+            if continue_input == '1':
+                continue
+            if continue_input == '2':
+                user_entry = 'exit'
+            else:
+                continue
 
-    if user_entry == '2':
-        time_input = input('What time in military time would you like to view HH:MM:SS? ').split(':')
-        h = int(time_input[0])
-        m = int(time_input[1])
-        s = int(time_input[2])
-        user_time = datetime.timedelta(hours=h, minutes=m, seconds=s)
-        program_1.run_delivery_simulation(user_time, 'print all', package_number)
-        print('')
-        continue_input = input('Would you like to continue? 1 to continue, 2 to exit: ')
-        if continue_input == '1':
-            continue
-        if continue_input == '2':
-            user_entry = 'exit'
-        else:
-            continue
+        if user_entry == '2':
+            time_input = input('What time in military time would you like to view HH:MM:SS? ').split(':')
+            h = int(time_input[0])
+            m = int(time_input[1])
+            s = int(time_input[2])
+            user_time = SimulationTime.clock(h, m, s)
+            program_1.run_delivery_simulation(user_time, 'print all', package_number)
+            print('')
+            continue_input = input('Would you like to continue? 1 to continue, 2 to exit: ')
+            if continue_input == '1':
+                continue
+            if continue_input == '2':
+                user_entry = 'exit'
+            else:
+                continue
 
-    if user_entry == '3':
-        time_input = input('What time in military time would you like to view HH:MM:SS? ').split(':')
-        h = int(time_input[0])
-        m = int(time_input[1])
-        s = int(time_input[2])
-        user_time = datetime.timedelta(hours=h, minutes=m, seconds=s)
-        program_1.run_delivery_simulation(user_time, 'miles', package_number)
-        print('')
-        continue_input = input('Would you like to continue? 1 to continue, 2 to exit: ')
-        if continue_input == '1':
-            continue
-        if continue_input == '2':
+        if user_entry == '3':
+            time_input = input('What time in military time would you like to view HH:MM:SS? ').split(':')
+            h = int(time_input[0])
+            m = int(time_input[1])
+            s = int(time_input[2])
+            user_time = SimulationTime.clock(h, m, s)
+            program_1.run_delivery_simulation(user_time, 'miles', package_number)
+            print('')
+            continue_input = input('Would you like to continue? 1 to continue, 2 to exit: ')
+            if continue_input == '1':
+                continue
+            if continue_input == '2':
+                user_entry = 'exit'
+            else:
+                continue
+
+        if user_entry == '4':
             user_entry = 'exit'
+
         else:
             continue
 
-    if user_entry == '4':
-        user_entry = 'exit'
 
-    else:
-        continue
+"""
+This reads the command line options and builds the simulated day. With --batch the queries in the supplied file, or 
+standard input for -, are answered as lines of JSON without the menu, with --serve the day is served by the HTTP 
+tracking service, with --risk the on time risk of the planned routes is printed, with --manifest-page one page of 
+the manifest is printed, otherwise the menu is started. With --instrument or --profile the stages are instrumented 
+and the results are written when the program ends.
+"""
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description='WGUPS package delivery system.')
+    parser.add_argument('--batch', metavar='FILE',
+                        help='answer the package id,time and time,report queries in FILE, or - for standard input, '
+                             'as JSON lines instead of starting the menu')
+    parser.add_argument('--serve', metavar='PORT', type=int,
+                        help='serve package and mileage lookups over HTTP on PORT instead of starting the menu')
+    parser.add_argument('--host', default='127.0.0.1', help='address the HTTP service listens on (default 127.0.0.1)')
+    parser.add_argument('--watch', metavar='SECONDS', type=float, default=2.0,
+                        help='how often the HTTP service checks the package file for changes, 0 to turn it off '
+                             '(default 2)')
+    parser.add_argument('--output', metavar='FILE', help='write the JSON lines to FILE instead of standard output')
+    parser.add_argument('--packages', default='packages.csv', help='package file (default packages.csv)')
+    parser.add_argument('--distances', default='distances.csv', help='distance file (default distances.csv)')
+    parser.add_argument('--road-network', action='store_true',
+                        help='read --distances as an edge list of from,to,miles roads and find the shortest road '
+                             'miles between the hub and the package addresses')
+    parser.add_argument('--events', metavar='FILE',
+                        help='apply the live events in FILE, one JSON object a line, before answering')
+    parser.add_argument('--distance-cache-rows', metavar='ROWS', type=int,
+                        help='read the distances from the binary cache file as needed, keeping at most ROWS rows of '
+                             'them in memory, for distance files too large to hold in memory')
+    parser.add_argument('--instrument', metavar='FILE',
+                        help='record the time and counters of every stage and truck and write them to FILE when the '
+                             'program ends, as JSON for a .json file, as text otherwise, or - for standard error')
+    parser.add_argument('--profile', action='store_true',
+                        help='also capture a cProfile profile of the stages, written with --instrument or to '
+                             'standard error')
+    parser.add_argument('--exact-route-stops', metavar='STOPS', type=int,
+                        help='order each priority level going to at most STOPS distinct addresses by the shortest '
+                             'route, found exactly, instead of nearest neighbor')
+    parser.add_argument('--risk', metavar='TRIALS', type=int,
+                        help='drive the planned routes in TRIALS trials with random traffic and print the chance each '
+                             'package is on time and the return time percentiles of each truck, needs NumPy')
+    parser.add_argument('--traffic-spread', metavar='SPREAD', type=float, default=0.2,
+                        help='standard deviation of the logarithm of the traffic factor of each leg with --risk '
+                             '(default 0.2)')
+    parser.add_argument('--manifest-page', metavar='PAGE', type=int,
+                        help='print page PAGE of the packages in --packages as listed in the manifest, reading only '
+                             'the rows on that page, without simulating the day')
+    parser.add_argument('--page-size', metavar='ROWS', type=int, default=50,
+                        help='packages on each page with --manifest-page (default 50)')
+    parser.add_argument('--time-windows', action='store_true',
+                        help='route the trucks to meet the package time windows')
+    options = parser.parse_args(arguments)
+    if options.manifest_page is not None and (options.manifest_page < 1 or options.page_size < 1):
+        parser.error('--manifest-page counts from 1 and --page-size needs at least one row.')
+    if options.risk is not None:
+        if not MonteCarloRisk.MonteCarloRisk.available():
+            parser.error('--risk needs NumPy.')
+        if options.risk < 1 or options.traffic_spread < 0:
+            parser.error('--risk needs at least one trial and --traffic-spread cannot be negative.')
+
+    instrumentation = None
+    if options.instrument is not None or options.profile:
+        instrumentation = Instrumentation.Instrumentation(profile=options.profile)
+    try:
+        return run(options, instrumentation)
+    finally:
+        if instrumentation is not None:
+            if options.instrument is None or options.instrument == '-':
+                print(instrumentation.report(), file=sys.stderr)
+            else:
+                instrumentation.write(options.instrument)
+
+
+"""
+This prints one page of the manifest when it is asked for, and otherwise builds the simulated day with the supplied 
+command line options and instrumentation, which is None when it is off, applies the live events and then prints the 
+on time risk, answers the batch queries, starts the HTTP tracking service or starts the menu. 
+Returns the exit status.
+"""
+def run(options, instrumentation):
+    if options.manifest_page is not None:
+        source = LazyPackageSource.LazyPackageSource(options.packages)
+        try:
+            source.print_page(options.manifest_page, options.page_size)
+        finally:
+            source.close()
+        return 0
+    with LoadingAndDelivery.LoadingAndDelivery(options.packages, options.distances, use_distance_cache=True,
+                                                time_window_routing=options.time_windows,
+                                                instrumentation=instrumentation,
+                                                distance_cache_rows=options.distance_cache_rows,
+                                                road_network=options.road_network,
+                                                exact_route_stops=options.exact_route_stops) as program_1:
+        if options.events is not None:
+            with open(options.events) as events:
+                for line_number, line in enumerate(events, 1):
+                    if line.strip() == '':
+                        continue
+                    try:
+                        program_1.apply_event(LiveEvents.event_from_dict(json.loads(line)))
+                    except ValueError as error:
+                        print(f'Event on line {line_number} was not applied: {error}', file=sys.stderr)
+        if options.risk is not None:
+            with program_1.instrument('monte_carlo_risk'):
+                risk = MonteCarloRisk.MonteCarloRisk(program_1, options.risk, options.traffic_spread)
+                print(risk.format_estimate(risk.estimate()))
+            return 0
+        if options.serve is not None:
+            service = TrackingService.TrackingService(program_1, options.host, options.serve, options.watch)
+            try:
+                asyncio.run(service.serve_forever())
+            except KeyboardInterrupt:
+                pass
+            return 0
+        if options.batch is None:
+            interactive(program_1)
+            return 0
+
+        batch = BatchQuery.BatchQuery(program_1)
+        queries = sys.stdin if options.batch == '-' else open(options.batch)
+        output = sys.stdout if options.output is None else open(options.output, 'w')
+        try:
+            with program_1.instrument('batch_queries'):
+                answered, errors = batch.run(queries, output)
+        finally:
+            if queries is not sys.stdin:
+                queries.close()
+            if output is not sys.stdout:
+                output.close()
+        print(f'{answered} queries answered, {errors} could not be read.', file=sys.stderr)
+        return 1 if errors > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
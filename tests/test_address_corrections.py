@@ -0,0 +1,36 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import LoadingAndDelivery
+import SimulationTime
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class AddressCorrectionTest(unittest.TestCase):
+    def test_sample_day_correction_is_applied(self):
+        program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename)
+        self.assertEqual(program.delivery_timeline.address_changes_received(SimulationTime.clock(11)), [9])
+
+    def test_correction_needs_the_wrong_address_note(self):
+        with open(package_filename) as packages:
+            manifest = packages.read().replace(',Wrong address listed\n', ',\n')
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'packages.csv')
+            with open(filename, 'w') as packages:
+                packages.write(manifest)
+            program = LoadingAndDelivery.LoadingAndDelivery(filename, distance_filename)
+        self.assertEqual(program.corrected_addresses, {})
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            program.run_delivery_simulation(SimulationTime.clock(11), 'search', 9)
+        self.assertNotIn('New address', output.getvalue())
+        self.assertIn('410 S State St', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
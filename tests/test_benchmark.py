@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+import Benchmark
+import DistanceMatrix
+import LoadingAndDelivery
+
+
+class BenchmarkTest(unittest.TestCase):
+    def test_synthetic_files_load(self):
+        data = Benchmark.SyntheticData(60, 12)
+        with tempfile.TemporaryDirectory() as directory:
+            package_filename = os.path.join(directory, 'packages.csv')
+            distance_filename = os.path.join(directory, 'distances.csv')
+            data.write_packages(package_filename)
+            data.write_distances(distance_filename)
+            distance_matrix = DistanceMatrix.DistanceMatrix.from_csv(distance_filename)
+            program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename, truck_count=6)
+        self.assertEqual(distance_matrix.size, 12)
+        self.assertEqual(len(program.package_hash_table), 60)
+        delivered = [package.id for truck in program.trucks for package in truck.loaded_packages]
+        self.assertEqual(sorted(delivered), list(range(1, 61)))
+
+    def test_small_case_times_every_stage(self):
+        results = Benchmark.Benchmark(samples=5, measure_memory=False).run([(100, 27)], label='test')
+        self.assertEqual(results['label'], 'test')
+        case = results['cases'][0]
+        self.assertEqual((case['packages'], case['locations']), (100, 27))
+        for name in ('load_package_data', 'nearest_neighbor', 'load_trucks_set_departure', 'build_delivery_timeline',
+                     'run_delivery_simulation'):
+            self.assertGreaterEqual(case['stages'][name]['wall_seconds'], 0.0)
+        self.assertEqual(case['stages']['nearest_neighbor']['calls'], 5)
+        report = Benchmark.Benchmark.format_results(results, results)
+        self.assertIn('100 packages, 27 locations', report)
+        self.assertIn('x1.00', report)
+
+    def test_percentiles(self):
+        percentiles = Benchmark.Benchmark.percentiles([0.001 * number for number in range(1, 101)])
+        self.assertAlmostEqual(percentiles['p50_ms'], 51.0)
+        self.assertAlmostEqual(percentiles['p99_ms'], 100.0)
+        self.assertAlmostEqual(percentiles['max_ms'], 100.0)
+        self.assertEqual(Benchmark.Benchmark.percentiles([]), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
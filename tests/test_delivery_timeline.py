@@ -0,0 +1,62 @@
+import contextlib
+import io
+import os
+import unittest
+import LoadingAndDelivery
+import SimulationTime
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class DeliveryTimelineTest(unittest.TestCase):
+    def setUp(self):
+        self.program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename)
+        self.timeline = self.program.delivery_timeline
+
+    def test_package_status_follows_the_day(self):
+        delivery_time = self.timeline.delivery_time(15)
+        self.assertLessEqual(delivery_time, SimulationTime.clock(9))
+        self.assertEqual(self.timeline.package_status(15, SimulationTime.clock(7)), 'at hub')
+        self.assertIn('delivered at', self.timeline.package_status(15, delivery_time + 1))
+        self.assertNotIn('delivered at', self.timeline.package_status(15, delivery_time))
+        self.assertEqual(self.timeline.package_status(6, SimulationTime.clock(8)), 'in route to hub')
+
+    def test_truck_miles_add_up_to_the_day(self):
+        end_of_day = SimulationTime.day
+        self.assertEqual(sum(self.timeline.truck_miles(truck.name, SimulationTime.clock(8)) for truck in
+                             self.program.trucks), 0.0)
+        for truck in self.program.trucks:
+            self.assertLessEqual(self.timeline.truck_miles(truck.name, SimulationTime.clock(10)),
+                                 self.timeline.truck_miles(truck.name, end_of_day))
+        self.assertAlmostEqual(sum(self.program.route_miles(truck) for truck in self.program.trucks),
+                               self.program.total_miles())
+
+    def test_cursor_matches_the_timeline_queries(self):
+        cursor = self.timeline.cursor()
+        for time in range(SimulationTime.clock(8), SimulationTime.clock(14), SimulationTime.clock(minutes=15)):
+            cursor.advance(time)
+            self.assertEqual(cursor.address_changes_received(), self.timeline.address_changes_received(time))
+            for package in self.program.package_hash_table.packages():
+                self.assertEqual(cursor.package_status(package.id), self.timeline.package_status(package.id, time))
+                self.assertEqual(cursor.package_address(package.id), self.timeline.package_address(package.id, time))
+            for truck in self.program.trucks:
+                self.assertEqual(cursor.truck_miles(truck.name), self.timeline.truck_miles(truck.name, time))
+
+    def test_query_leaves_the_packages_unchanged(self):
+        # Package 9 has its wrong address until the correction is received at 10:20, which a query before then shows
+        # without changing the address the package is delivered to.
+        package = self.program.package_hash_table.search(9)
+        status = package.delivery_status
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.program.run_delivery_simulation(SimulationTime.clock(9), 'print all', None)
+        self.assertIn('300 State St', output.getvalue())
+        self.assertEqual(package.address, '410 S State St')
+        self.assertEqual(package.delivery_status, status)
+        self.assertEqual(self.timeline.address_changes_received(SimulationTime.clock(9)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
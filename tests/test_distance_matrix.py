@@ -0,0 +1,104 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import DistanceMatrix
+import LoadingAndDelivery
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class DistanceCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'distances.csv')
+        shutil.copy(os.path.join(root, 'distances.csv'), self.filename)
+        self.parsed = DistanceMatrix.DistanceMatrix.from_csv(self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertSameDistances(self, distance_matrix, expected):
+        self.assertEqual(distance_matrix.keys, expected.keys)
+        for location_id in range(expected.size):
+            self.assertEqual(list(distance_matrix.row(location_id)), list(expected.row(location_id)))
+
+    def test_cache_round_trip(self):
+        DistanceMatrix.DistanceMatrix.load(self.filename)
+        self.assertTrue(os.path.exists(self.filename + '.cache'))
+        mapped = DistanceMatrix.DistanceMatrix.load(self.filename)
+        self.assertIsInstance(mapped.distances, memoryview)
+        self.assertSameDistances(mapped, self.parsed)
+        disk = DistanceMatrix.DistanceMatrix.load(self.filename, mapped=False)
+        try:
+            self.assertIsInstance(disk, DistanceMatrix.DiskDistanceMatrix)
+            self.assertSameDistances(disk, self.parsed)
+            self.assertEqual(disk.distance(0, 1), self.parsed.distance(0, 1))
+        finally:
+            disk.close()
+
+    def test_cache_distances_are_little_endian(self):
+        DistanceMatrix.DistanceMatrix.load(self.filename)
+        with open(self.filename + '.cache', 'rb') as cache:
+            data = cache.read()
+        layout = DistanceMatrix.DistanceMatrix.cache_layout(data, len(data),
+                                                            DistanceMatrix.DistanceMatrix.file_digest(self.filename))
+        data_start = layout[3]
+        self.assertEqual(struct.unpack_from('<d', data, data_start + 8)[0], self.parsed.distance(0, 1))
+
+    def test_changed_distance_file_invalidates_the_cache(self):
+        DistanceMatrix.DistanceMatrix.load(self.filename)
+        with open(self.filename) as distances:
+            lines = distances.read().split('\n')
+        cells = lines[2].split(',')
+        cells[1] = '99.9'
+        lines[2] = ','.join(cells)
+        with open(self.filename, 'w') as distances:
+            distances.write('\n'.join(lines))
+        changed = DistanceMatrix.DistanceMatrix.load(self.filename)
+        self.assertEqual(changed.distance(0, 1), 99.9)
+        self.assertEqual(DistanceMatrix.DistanceMatrix.load(self.filename).distance(0, 1), 99.9)
+
+    def test_unwritable_cache_falls_back_to_memory(self):
+        cache_filename = os.path.join(self.directory, 'missing', 'distances.cache')
+        for mapped in (True, False):
+            distance_matrix = DistanceMatrix.DistanceMatrix.load(self.filename, cache_filename, mapped=mapped)
+            self.assertIsNotNone(distance_matrix)
+            self.assertSameDistances(distance_matrix, self.parsed)
+
+
+class DistanceMatrixTest(unittest.TestCase):
+    def setUp(self):
+        self.distance_matrix = DistanceMatrix.DistanceMatrix.from_csv(os.path.join(root, 'distances.csv'))
+
+    def test_lower_triangle_is_mirrored(self):
+        distance_matrix = self.distance_matrix
+        self.assertEqual(distance_matrix.keys[0], 'HUB')
+        self.assertEqual(distance_matrix.distance(1, 0), 7.2)
+        self.assertEqual(distance_matrix.distance(0, 1), 7.2)
+        self.assertEqual(distance_matrix.distance(3, 2), 9.2)
+        for location_1 in range(distance_matrix.size):
+            self.assertEqual(distance_matrix.distance(location_1, location_1), 0.0)
+            for location_2 in range(location_1):
+                self.assertEqual(distance_matrix.distance(location_1, location_2),
+                                 distance_matrix.distance(location_2, location_1))
+
+    def test_submatrix_keeps_the_distances_between_its_keys(self):
+        keys = [self.distance_matrix.keys[3], 'HUB', self.distance_matrix.keys[1]]
+        submatrix = self.distance_matrix.submatrix(keys)
+        self.assertEqual(submatrix.location_id('HUB'), 1)
+        self.assertEqual(submatrix.distance(0, 1), 11.0)
+        self.assertEqual(submatrix.distance(0, 2), 6.4)
+
+    def test_packages_are_given_location_ids(self):
+        program = LoadingAndDelivery.LoadingAndDelivery(os.path.join(root, 'packages.csv'),
+                                                        os.path.join(root, 'distances.csv'))
+        for package in program.package_hash_table.packages():
+            key = program.distance_matrix.keys[package.location_id]
+            self.assertTrue(key.startswith(package.address), (package.id, key))
+        self.assertEqual(program.hub_location, program.distance_matrix.location_id(program.hub_key))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+import DistanceMatrix
+import DistanceResolver
+import LoadingAndDelivery
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+
+
+class DistanceResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.distance_filename = os.path.join(self.directory, 'distances.csv')
+        shutil.copy(os.path.join(root, 'distances.csv'), self.distance_filename)
+        self.parsed = DistanceMatrix.DistanceMatrix.from_csv(self.distance_filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_least_recently_used_row_is_dropped(self):
+        resolver = DistanceResolver.DistanceResolver(self.parsed, cache_rows=2)
+        self.assertEqual(resolver.distance(1, 2), self.parsed.distance(1, 2))
+        self.assertEqual(resolver.distance(3, 4), self.parsed.distance(3, 4))
+        # The row of location 1 answers a lookup from location 5 too, as the matrix is symmetric.
+        self.assertEqual(resolver.distance(5, 1), self.parsed.distance(5, 1))
+        self.assertEqual(resolver.distance(6, 0), self.parsed.distance(6, 0))
+        statistics = resolver.statistics()
+        self.assertEqual((statistics['hits'], statistics['misses'], statistics['evictions']), (1, 3, 1))
+        self.assertEqual(list(resolver.rows), [1, 6])
+        with self.assertRaises(ValueError):
+            DistanceResolver.DistanceResolver(self.parsed, cache_rows=0)
+
+    def test_disk_matrix_is_closed_with_the_program(self):
+        with LoadingAndDelivery.LoadingAndDelivery(package_filename, self.distance_filename,
+                                                   distance_cache_rows=8) as program:
+            disk_matrix = program.distance_matrix.source
+            self.assertIsInstance(disk_matrix, DistanceMatrix.DiskDistanceMatrix)
+            self.assertEqual(program.late_packages(), [])
+            for location_1 in range(self.parsed.size):
+                for location_2 in range(self.parsed.size):
+                    self.assertEqual(program.distance_matrix.distance(location_1, location_2),
+                                     self.parsed.distance(location_1, location_2))
+        self.assertTrue(disk_matrix.cache_file.closed)
+
+    def test_supplied_matrix_is_left_open(self):
+        disk_matrix = DistanceMatrix.DistanceMatrix.load(self.distance_filename, mapped=False)
+        try:
+            with LoadingAndDelivery.LoadingAndDelivery(package_filename, None, distance_matrix=disk_matrix):
+                pass
+            self.assertFalse(disk_matrix.cache_file.closed)
+        finally:
+            disk_matrix.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import itertools
+import os
+import random
+import unittest
+import DistanceMatrix
+import ExactRouting
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class ExactRoutingTest(unittest.TestCase):
+    def setUp(self):
+        self.distance_matrix = DistanceMatrix.DistanceMatrix.from_csv(distance_filename)
+        self.routing = ExactRouting.ExactRouting(self.distance_matrix)
+
+    def route_miles(self, start_location, stops, end_location):
+        locations = [start_location] + list(stops) + ([] if end_location is None else [end_location])
+        return sum([self.distance_matrix.distance(first, second) for first, second in zip(locations, locations[1:])])
+
+    def shortest_miles(self, start_location, stops, end_location):
+        return min([self.route_miles(start_location, order, end_location) for order in itertools.permutations(stops)])
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        for count in range(1, 8):
+            for end_location in (0, None):
+                stops = tuple(sorted(rng.sample(range(1, self.distance_matrix.size), count)))
+                order = self.routing.solve(0, stops, end_location)
+                self.assertEqual(sorted(order), list(stops))
+                self.assertAlmostEqual(self.route_miles(0, order, end_location),
+                                       self.shortest_miles(0, stops, end_location))
+
+    def test_pure_python_table_matches_numpy_table(self):
+        if ExactRouting.numpy is None:
+            self.skipTest('NumPy is not installed.')
+        stops = (3, 8, 11, 14, 19, 22, 25)
+        distances = [[self.distance_matrix.distance(stop, other) for other in stops] for stop in stops]
+        starts = [self.distance_matrix.distance(0, stop) for stop in stops]
+        costs = self.routing.table(distances, starts)[0]
+        vectorized_costs = self.routing.vectorized_table(distances, starts)[0]
+        for expected, found in zip(costs, vectorized_costs):
+            self.assertAlmostEqual(expected, float(found))
+
+    def test_order_keeps_packages_at_the_same_location_together(self):
+        order = self.routing.order(0, [5, 9, 5, 2], 0)
+        self.assertEqual(sorted(order), [0, 1, 2, 3])
+        self.assertEqual(abs(order.index(0) - order.index(2)), 1)
+        self.routing.order(0, [9, 2, 5], 0)
+        self.assertEqual(self.routing.statistics()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
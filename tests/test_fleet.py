@@ -0,0 +1,47 @@
+import os
+import unittest
+import Fleet
+import LoadingAndDelivery
+import Package
+import SimulationTime
+import Truck
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class FleetTest(unittest.TestCase):
+    def test_trucks_wait_for_the_first_driver_back(self):
+        trucks = []
+        for number, (departure, run_minutes) in enumerate([(8, 90), (8, 30), (8, 45), (9, 20)], start=1):
+            truck = Truck.Truck(Truck.Truck.name_for_number(number))
+            truck.loaded_packages = [Package.Package(number, 'Address', 'City', 'UT', '84100', 'EOD', 1, '', '')]
+            truck.set_planned_departure_time(SimulationTime.clock(departure))
+            truck.run_minutes = run_minutes
+            trucks.append(truck)
+        trucks.append(Truck.Truck('Truck Five'))
+        departures = {}
+
+        def run(truck):
+            departures[truck.name] = truck.departure_time
+            truck.update_last_delivery_time(truck.departure_time + SimulationTime.clock(minutes=truck.run_minutes))
+        Fleet.Fleet(trucks, 2).dispatch(run)
+        # Truck Three waits for the driver of Truck Two, back at 8:30, and Truck Four, planned for 9:00, for the driver
+        # of Truck Three, back at 9:15 before the one of Truck One. The empty truck is not sent.
+        self.assertEqual(departures, {'Truck One': SimulationTime.clock(8), 'Truck Two': SimulationTime.clock(8),
+                                      'Truck Three': SimulationTime.clock(8, 30),
+                                      'Truck Four': SimulationTime.clock(9, 15)})
+
+    def test_more_trucks_than_the_default_fleet(self):
+        program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename, truck_count=5,
+                                                        driver_count=3, truck_capacity=10)
+        self.assertEqual([truck.name for truck in program.trucks],
+                         ['Truck One', 'Truck Two', 'Truck Three', 'Truck Four', 'Truck Five'])
+        delivered = [package.id for truck in program.trucks for package in truck.loaded_packages]
+        self.assertEqual(sorted(delivered), list(range(1, 41)))
+        self.assertEqual(program.late_packages(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import unittest
+import Instrumentation
+import LoadingAndDelivery
+import Truck
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+def nearest_neighbor_picks(instrumentation):
+    return sum([counters.get('nearest_neighbor_picks', 0) for counters in instrumentation.counters.values()])
+
+
+class NearestNeighborPicksTest(unittest.TestCase):
+    def test_every_package_is_picked_by_nearest_neighbor(self):
+        instrumentation = Instrumentation.Instrumentation()
+        LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename, instrumentation=instrumentation)
+        self.assertEqual(nearest_neighbor_picks(instrumentation), 40)
+
+    def test_exact_levels_are_not_counted(self):
+        instrumentation = Instrumentation.Instrumentation()
+        LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename, instrumentation=instrumentation,
+                                              exact_route_stops=12)
+        self.assertEqual(nearest_neighbor_picks(instrumentation), 0)
+
+    def test_pure_python_picks_are_counted(self):
+        instrumentation = Instrumentation.Instrumentation()
+        program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename,
+                                                        instrumentation=instrumentation)
+        program.vectorized_routing = None
+        instrumentation.counters.clear()
+        program.priority_load_levels([[1, 2, 3], [], [4, 5]], Truck.Truck(), program.day_start)
+        self.assertEqual(nearest_neighbor_picks(instrumentation), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
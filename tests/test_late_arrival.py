@@ -0,0 +1,30 @@
+import os
+import unittest
+import LiveEvents
+import LoadingAndDelivery
+import SimulationTime
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class LateArrivalTest(unittest.TestCase):
+    def setUp(self):
+        # Two trucks of ten packages making two trips each, so Truck One leaves again at 10:10:40 with package 10.
+        self.program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename, truck_count=2,
+                                                             truck_capacity=10, trip_count=2)
+
+    def test_package_on_a_later_trip_has_not_left(self):
+        truck, position = self.program.package_truck(self.program.package_hash_table.search(10))
+        self.assertGreaterEqual(position, truck.trip_bounds()[0][1])
+        self.program.apply_event(LiveEvents.LateArrival(SimulationTime.clock(9), 10, SimulationTime.clock(10)))
+        self.assertGreater(self.program.delivery_timeline.delivery_time(10), SimulationTime.clock(10))
+
+    def test_package_on_a_trip_that_left_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.program.apply_event(LiveEvents.LateArrival(SimulationTime.clock(9), 13, SimulationTime.clock(10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+import LazyPackageSource
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+
+
+class LazyPackageSourceTest(unittest.TestCase):
+    def test_delayed_package_is_in_route_to_hub(self):
+        source = LazyPackageSource.LazyPackageSource(package_filename)
+        try:
+            self.assertEqual(source.search(6).delivery_status, 'in route to hub')
+            self.assertEqual(source.search(1).delivery_status, 'at hub')
+        finally:
+            source.close()
+
+    def test_quoted_cell_with_a_line_break(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'quoted.csv')
+            with open(filename, 'w') as packages:
+                packages.write('Package ID,Address,City,State,Zip,Deadline,Weight,Notes\n'
+                               '1,195 W Oakland Ave,Salt Lake City,UT,84115,10:30 AM,21,"Leave at the\nside door"\n'
+                               '2,2530 S 500 E,Salt Lake City,UT,84106,EOD,44,\n')
+            source = LazyPackageSource.LazyPackageSource(filename)
+            try:
+                self.assertEqual(len(source), 2)
+                self.assertEqual(source.search(1).special_notes, 'Leave at the\nside door')
+                self.assertEqual(source.search(2).address, '2530 S 500 E')
+                self.assertEqual(source.line_numbers[2], 4)
+            finally:
+                source.close()
+
+    def test_unsorted_manifest_is_listed_by_package_id(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'unsorted.csv')
+            with open(filename, 'w') as packages:
+                packages.write('Package ID,Address,City,State,Zip,Deadline,Weight,Notes\n'
+                               '3,233 Canyon Rd,Salt Lake City,UT,84103,EOD,2,\n'
+                               '1,195 W Oakland Ave,Salt Lake City,UT,84115,10:30 AM,21,\n'
+                               '2,2530 S 500 E,Salt Lake City,UT,84106,EOD,44,\n')
+            source = LazyPackageSource.LazyPackageSource(filename)
+            try:
+                self.assertEqual([package.id for package in source.packages()], [1, 2, 3])
+                self.assertEqual([package.id for package in source.page(1, 2)], [1, 2])
+            finally:
+                source.close()
+
+    def test_unclosed_quote_is_rejected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'unclosed.csv')
+            with open(filename, 'w') as packages:
+                packages.write('Package ID,Address,City,State,Zip,Deadline,Weight,Notes\n'
+                               '1,195 W Oakland Ave,Salt Lake City,UT,84115,10:30 AM,21,"Leave at the\n'
+                               '2,2530 S 500 E,Salt Lake City,UT,84106,EOD,44,\n')
+            with self.assertRaises(ValueError):
+                LazyPackageSource.LazyPackageSource(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import random
+import tempfile
+import time
+import unittest
+import DistanceMatrix
+import LoadingAndDelivery
+import LoadPlanner
+import Package
+import SimulationTime
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class LoadPlannerTest(unittest.TestCase):
+    def test_late_packages_keep_room_on_the_late_truck(self):
+        # Without the wrong address note package 9 is not held, so only one truck leaves after the delayed packages
+        # arrive at 9:05 and it must keep room for all of them.
+        with open(package_filename) as packages:
+            manifest = packages.read().replace(',Wrong address listed\n', ',\n')
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'packages.csv')
+            with open(filename, 'w') as packages:
+                packages.write(manifest)
+            program = LoadingAndDelivery.LoadingAndDelivery(filename, distance_filename)
+        delivered = [package.id for truck in program.trucks for package in truck.loaded_packages]
+        self.assertEqual(sorted(delivered), list(range(1, 41)))
+        self.assertEqual(program.late_packages(), [])
+
+    def test_large_manifest_with_delayed_packages(self):
+        # Half of the packages are delayed until 9:05 or 10:20 and the three trucks only just hold them all, so room
+        # has to be kept on the late trucks for every delayed package while the others are placed.
+        distance_matrix = DistanceMatrix.DistanceMatrix.from_csv(distance_filename)
+        rng = random.Random(1)
+        packages = []
+        for package_id in range(1, 20001):
+            notes = ''
+            if package_id % 2 == 0:
+                notes = f'Delayed on flight---will not arrive to depot until {rng.choice(["9:05", "10:20"])} am'
+            package = Package.Package(package_id, 'Address', 'City', 'UT', '84100', 'EOD', 1, notes, 'at hub')
+            package.location_id = rng.randrange(1, distance_matrix.size)
+            packages.append(package)
+        planner = LoadPlanner.LoadPlanner(distance_matrix, 0, SimulationTime.clock(8))
+        started = time.perf_counter()
+        plans = planner.plan(packages, 3, 6700)
+        # Placing the units once each against running counts keeps this well under a second, so the bound is loose.
+        self.assertLess(time.perf_counter() - started, 5.0)
+        planned = {}
+        for plan in plans:
+            for package_id in [package_id for level in plan.priority_levels for package_id in level]:
+                planned[package_id] = plan.departure_time
+        self.assertEqual(sorted(planned), list(range(1, 20001)))
+        for package in packages:
+            self.assertGreaterEqual(planned[package.id], planner.unit_of[package.id].available_time)
+
+    def test_smaller_loads_over_several_trips_keep_deadlines(self):
+        # Two drivers share the trucks, so a later trip leaves only once its truck or a driver is back; the loads have
+        # to be chosen by when they leave for the 10:30 packages to make it.
+        for options in (dict(truck_capacity=8, trip_count=3), dict(truck_count=2, trip_count=2, truck_capacity=12),
+                        dict(truck_count=2, trip_count=2, truck_capacity=10)):
+            with self.subTest(**options):
+                program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename, **options)
+                delivered = [package.id for truck in program.trucks for package in truck.loaded_packages]
+                self.assertEqual(sorted(delivered), list(range(1, 41)))
+                self.assertEqual(program.late_packages(), [])
+                for truck in program.trucks:
+                    for start, end in truck.trip_bounds():
+                        self.assertLessEqual(end - start, truck.capacity)
+
+    def test_later_trips_wait_for_their_packages(self):
+        # With two trucks making two trips, the second truck leaves at 9:05 and package 9 rides a later trip, which
+        # waits at the hub until the package can be loaded.
+        program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename, truck_count=2,
+                                                        trip_count=2, truck_capacity=12)
+        self.assertEqual(sorted(truck.planned_departure_time for truck in program.trucks),
+                         [SimulationTime.clock(8), SimulationTime.clock(9, 5)])
+        for package in program.package_hash_table.packages():
+            self.assertGreaterEqual(program.delivery_timeline.loaded_time(package.id),
+                                    program.hub_arrival_time(package))
+
+    def test_weight_limit_holds_on_every_trip(self):
+        program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename,
+                                                        truck_weight_capacity=300, trip_count=3)
+        for truck in program.trucks:
+            for start, end in truck.trip_bounds():
+                self.assertLessEqual(sum(package.weight for package in truck.loaded_packages[start:end]), 300)
+        self.assertEqual(program.late_packages(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
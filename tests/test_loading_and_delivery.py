@@ -0,0 +1,40 @@
+import os
+import unittest
+import LoadingAndDelivery
+import SimulationTime
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class DefaultDayTest(unittest.TestCase):
+    def setUp(self):
+        self.program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename)
+
+    def test_total_miles(self):
+        self.assertAlmostEqual(self.program.total_miles(), 108.6, places=6)
+
+    def test_no_late_packages(self):
+        self.assertEqual(self.program.late_packages(), [])
+
+    def test_every_package_is_delivered_once(self):
+        loaded = [package.id for truck in self.program.trucks for package in truck.loaded_packages]
+        self.assertEqual(sorted(loaded), list(range(1, 41)))
+        end_of_day = SimulationTime.clock(24)
+        for package_id in loaded:
+            self.assertIsNotNone(self.program.delivery_timeline.delivery_time(package_id))
+            self.assertIn('delivered at', self.program.delivery_timeline.package_status(package_id, end_of_day))
+
+    def test_trucks_respect_the_package_rules(self):
+        truck_of = {package.id: truck.name for truck in self.program.trucks for package in truck.loaded_packages}
+        self.assertEqual(len(set(truck_of[package_id] for package_id in (13, 14, 15, 16, 19, 20))), 1)
+        for package_id in (3, 18, 36, 38):
+            self.assertEqual(truck_of[package_id], 'Truck Two')
+        for package_id in (6, 25, 28, 32):
+            self.assertGreaterEqual(self.program.delivery_timeline.delivery_time(package_id),
+                                    SimulationTime.clock(9, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
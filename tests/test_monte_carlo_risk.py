@@ -0,0 +1,58 @@
+import os
+import unittest
+import LoadingAndDelivery
+import MonteCarloRisk
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+@unittest.skipUnless(MonteCarloRisk.MonteCarloRisk.available(), 'NumPy is not installed')
+class MonteCarloRiskTest(unittest.TestCase):
+    def setUp(self):
+        self.program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename)
+
+    def test_no_spread_drives_the_planned_day(self):
+        risk = MonteCarloRisk.MonteCarloRisk(self.program, trial_count=3, spread=0.0, seed=1)
+        delivery_times, return_times = risk.simulate()
+        timeline = self.program.delivery_timeline
+        self.assertEqual(sorted(delivery_times), list(range(1, 41)))
+        # The timeline rounds every leg to a millisecond, so the times can differ by a millisecond a stop.
+        for package_id, times in delivery_times.items():
+            for time in times:
+                self.assertAlmostEqual(time, timeline.delivery_time(package_id), delta=40)
+        for truck in self.program.trucks:
+            if truck.loaded_packages:
+                for time in return_times[truck.name]:
+                    self.assertAlmostEqual(time, truck.last_delivery_time, delta=40)
+
+    def test_estimate_reports_every_deadline_and_truck(self):
+        estimate = MonteCarloRisk.MonteCarloRisk(self.program, trial_count=200, spread=0.2, seed=7).estimate()
+        self.assertEqual((estimate['trials'], estimate['spread']), (200, 0.2))
+        deadline_ids = [package.id for package in self.program.package_hash_table.packages()
+                        if package.deadline_time() is not None]
+        self.assertEqual(sorted(estimate['on_time']), deadline_ids)
+        for chance in estimate['on_time'].values():
+            self.assertTrue(0.0 <= chance <= 1.0)
+        for truck_name, times in estimate['return_percentiles'].items():
+            self.assertEqual(sorted(times), [5, 50, 95])
+            self.assertLessEqual(times[5], times[50])
+            self.assertLessEqual(times[50], times[95])
+        report = MonteCarloRisk.MonteCarloRisk.format_estimate(estimate)
+        self.assertIn('200 trials with a traffic spread of 0.2', report)
+
+    def test_seed_repeats_the_trials(self):
+        first = MonteCarloRisk.MonteCarloRisk(self.program, trial_count=50, seed=3).estimate()
+        second = MonteCarloRisk.MonteCarloRisk(self.program, trial_count=50, seed=3).estimate()
+        self.assertEqual(first, second)
+
+    def test_bad_settings(self):
+        with self.assertRaises(ValueError):
+            MonteCarloRisk.MonteCarloRisk(self.program, trial_count=0)
+        with self.assertRaises(ValueError):
+            MonteCarloRisk.MonteCarloRisk(self.program, spread=-0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
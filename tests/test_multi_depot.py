@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+import DistanceMatrix
+import MultiDepotSimulation
+import PackageIngest
+import SimulationTime
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class MultiDepotSimulationTest(unittest.TestCase):
+    def test_unplannable_packages_carry_over(self):
+        # The four packages delayed until 9:05 and package 9, held until 10:20, fit the room of two trucks of three,
+        # but only the one truck that waits until 10:20 can take them, so two of them wait for the next day.
+        with open(package_filename) as packages:
+            lines = packages.read().split('\n')
+        late_lines = [line for line in lines[1:] if line.split(',')[0] in ('6', '9', '25', '28', '32')]
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'late.csv')
+            with open(filename, 'w') as packages:
+                packages.write('\n'.join([lines[0]] + late_lines) + '\n')
+            depots = [MultiDepotSimulation.Depot('A', 'HUB', truck_count=2, truck_capacity=3)]
+            results = MultiDepotSimulation.MultiDepotSimulation(distance_filename, depots, max_workers=1).run(
+                [filename])
+        self.assertEqual(results['fleet']['delivered'], 3)
+        self.assertEqual(results['fleet']['carried_over'], 2)
+
+    def test_grouped_packages_stay_in_one_depot(self):
+        keys = DistanceMatrix.DistanceMatrix.from_csv(distance_filename).keys
+        depots = [MultiDepotSimulation.Depot('A', 'HUB'), MultiDepotSimulation.Depot('B', keys[15])]
+        simulation = MultiDepotSimulation.MultiDepotSimulation(distance_filename, depots)
+        locations = simulation.depot_locations(DistanceMatrix.DistanceMatrix.from_csv(distance_filename))
+        depot_of = {key: number for number, depot_keys in enumerate(locations) for key in depot_keys}
+        depot_days, extra_keys = simulation.split_manifests([package_filename], depot_of)
+        depot_of_package = {package.id: number for number, days in enumerate(depot_days) for package in days[0]}
+        self.assertEqual(len(depot_of_package), 40)
+        self.assertEqual(len(set(depot_of_package[package_id] for package_id in (13, 14, 15, 16, 19, 20))), 1)
+
+    def test_carried_packages_are_ready_the_next_morning(self):
+        packages = {package.id: package for package in
+                    [PackageIngest.ManifestIngestor.build_package(line_number, row)
+                     for line_number, row in PackageIngest.ManifestIngestor.read_manifest(package_filename)]}
+        distance_matrix = DistanceMatrix.DistanceMatrix.from_csv(distance_filename)
+        depot = MultiDepotSimulation.Depot('A', 'HUB', truck_count=1, truck_capacity=1)
+        # Package 9 waits for its address correction at 10:20 on the day it is received, but once carried over its
+        # address is known, and package 6, delayed until 9:05, is already at the hub.
+        for carried_id, held_until in ((9, SimulationTime.clock(10, 20)), (6, SimulationTime.clock(9, 5))):
+            results = MultiDepotSimulation.run_depot((depot, distance_matrix.keys, distance_matrix.distances,
+                                                      [[packages[1], packages[carried_id]], []]))
+            self.assertEqual([result['delivered'] for result in results], [1, 1])
+            self.assertEqual(results[0]['carried_over'], 1)
+            self.assertLess(SimulationTime.parse_clock(results[1]['last_return']), held_until)
+        results = MultiDepotSimulation.run_depot((depot, distance_matrix.keys, distance_matrix.distances,
+                                                  [[packages[9]]]))
+        self.assertGreater(SimulationTime.parse_clock(results[0]['last_return']), SimulationTime.clock(10, 20))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+import PackageIngest
+
+header = 'Package ID,Address,City,State,Zip,Deadline,Weight,Notes\n'
+rows = {1: '1,195 W Oakland Ave,Salt Lake City,UT,84115,10:30 AM,21,\n',
+        2: '2,2530 S 500 E,Salt Lake City,UT,84106,EOD,44,\n',
+        3: '3,233 Canyon Rd,Salt Lake City,UT,84103,EOD,2,Can only be on truck 2\n'}
+
+
+class ManifestIngestorTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'packages.csv')
+        self.ingestor = PackageIngest.ManifestIngestor()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, *lines):
+        with open(self.filename, 'w') as packages:
+            packages.write(header + ''.join(lines))
+        return self.filename
+
+    def ingest(self, *lines):
+        return [package.id for package in self.ingestor.ingest(self.write(*lines))]
+
+    def test_only_changed_rows_are_applied_again(self):
+        self.assertEqual(self.ingest(rows[1], rows[2], rows[3]), [1, 2, 3])
+        self.assertEqual(self.ingestor.counts['added'], 3)
+        self.assertEqual(self.ingest(rows[1], rows[2].replace(',44,', ',45,'), rows[3]), [2])
+        self.assertEqual(self.ingestor.counts, {'added': 0, 'changed': 1, 'unchanged': 2, 'removed': 0,
+                                                'duplicate': 0})
+        self.assertEqual(self.ingest(rows[1], rows[3]), [])
+        self.assertEqual(self.ingestor.removed_ids, [2])
+        self.assertEqual(self.ingestor.counts['removed'], 1)
+
+    def test_repeated_row_is_counted_as_a_duplicate(self):
+        self.assertEqual(self.ingest(rows[1], rows[2], rows[2]), [1, 2])
+        self.assertEqual(self.ingestor.counts, {'added': 2, 'changed': 0, 'unchanged': 0, 'removed': 0,
+                                                'duplicate': 1})
+        self.assertEqual(self.ingest(rows[1], rows[2], rows[2]), [])
+        self.assertEqual(self.ingestor.counts, {'added': 0, 'changed': 0, 'unchanged': 2, 'removed': 0,
+                                                'duplicate': 1})
+
+    def test_differing_duplicate_replaces_the_row_before_it(self):
+        packages = list(self.ingestor.ingest(self.write(rows[1], rows[2].replace(',44,', ',45,'))))
+        self.assertEqual([package.weight for package in packages], [21, 45])
+        packages = list(self.ingestor.ingest(self.write(rows[1], rows[2], rows[2].replace(',44,', ',46,'))))
+        self.assertEqual([(package.id, package.weight) for package in packages], [(2, 44), (2, 46)])
+        self.assertEqual(self.ingestor.counts['changed'], 1)
+        self.assertEqual(self.ingestor.counts['duplicate'], 1)
+
+    def test_bad_row_names_its_line(self):
+        with self.assertRaisesRegex(ValueError, 'Line 3'):
+            self.ingest(rows[1], '2,2530 S 500 E,Salt Lake City,UT,84106,EOD,heavy,\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import HashTable
+import Package
+
+
+class PackageStoreTest(unittest.TestCase):
+    @staticmethod
+    def package(package_id, status='at hub'):
+        return Package.Package(package_id, '195 W Oakland Ave', 'Salt Lake City', 'UT', '84115', 'EOD', 21, '',
+                               status)
+
+    def test_packages_have_no_attribute_dictionary(self):
+        package = self.package(1)
+        self.assertFalse(hasattr(package, '__dict__'))
+        with self.assertRaises(AttributeError):
+            package.notes = 'Leave at the side door'
+
+    def test_repeated_text_is_shared(self):
+        first = self.package(1)
+        second = self.package(2)
+        self.assertIs(first.city, second.city)
+        first.set_delivery_status(''.join(['Truck One', ' delivered']))
+        second.set_delivery_status(''.join(['Truck One', ' delivered']))
+        self.assertIs(first.delivery_status, second.delivery_status)
+
+    def test_table_grows_for_larger_ids(self):
+        table = HashTable.DirectHashTable()
+        for package_id in (1, 2, 40, 41, 100):
+            table.add(self.package(package_id))
+        table.add(self.package(2, 'in route to hub'))
+        self.assertEqual(len(table), 5)
+        self.assertGreater(table.capacity, 100)
+        self.assertEqual(table.search(2).delivery_status, 'in route to hub')
+        self.assertIsNone(table.search(99))
+        self.assertIsNone(table.search(10000))
+        self.assertEqual([package.id for package in table.range_scan(2, 101)], [2, 40, 41, 100])
+        table.remove(table.search(40))
+        self.assertEqual(len(table), 4)
+        self.assertEqual([package.id for package in table.packages()], [1, 2, 41, 100])
+
+    def test_memory_report_counts_shared_strings_once(self):
+        table = HashTable.DirectHashTable()
+        for package_id in range(1, 41):
+            table.add(self.package(package_id))
+        report = table.memory_report()
+        self.assertEqual(report['packages'], 40)
+        self.assertEqual(report['total_bytes'], report['bucket_bytes'] + report['package_bytes'])
+        self.assertLess(report['bytes_per_package'], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+import RoadNetwork
+
+edges = ('Start,End,Miles\n'
+         'Hub,Corner,2.0\n'
+         'Corner,Bakery,3.0\n'
+         'Hub,Bakery,10.0\n'
+         'Bakery,Library,1.0\n'
+         'Corner,School,4.5\n'
+         'Island,Pier,1.0\n')
+
+
+class RoadNetworkTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = self.write(edges)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, text, name='edges.csv'):
+        filename = os.path.join(self.directory.name, name)
+        with open(filename, 'w') as edge_list:
+            edge_list.write(text)
+        return filename
+
+    def test_shortest_miles_take_the_quicker_way_round(self):
+        network = RoadNetwork.RoadNetwork.from_edge_list(self.filename)
+        distance_matrix = network.distance_matrix(['Hub', 'Bakery', 'Library', 'School'])
+        # The bakery is 5 miles from the hub through the corner, not 10 by the direct road.
+        expected = [[0.0, 5.0, 6.0, 6.5],
+                    [5.0, 0.0, 1.0, 7.5],
+                    [6.0, 1.0, 0.0, 8.5],
+                    [6.5, 7.5, 8.5, 0.0]]
+        self.assertEqual([list(distance_matrix.row(location_id)) for location_id in range(4)], expected)
+        self.assertEqual(distance_matrix.keys, ['Hub', 'Bakery', 'Library', 'School'])
+
+    def test_process_pool_finds_the_same_miles(self):
+        network = RoadNetwork.RoadNetwork.from_edge_list(self.filename)
+        nodes = [network.node_index[key] for key in ('Hub', 'Bakery', 'Library', 'School')]
+        network.parallel_work = 0
+        self.assertEqual(network.search(nodes, max_workers=2), [network.shortest_miles(node, nodes) for node in nodes])
+
+    def test_unknown_and_unreachable_locations(self):
+        network = RoadNetwork.RoadNetwork.from_edge_list(self.filename)
+        with self.assertRaisesRegex(ValueError, 'Museum is not in the road network'):
+            network.distance_matrix(['Hub', 'Museum'])
+        with self.assertRaisesRegex(ValueError, 'no road from Hub to Pier'):
+            network.distance_matrix(['Hub', 'Pier'])
+
+    def test_bad_rows_name_their_line(self):
+        with self.assertRaisesRegex(ValueError, 'Line 3 .* 2 cells'):
+            RoadNetwork.RoadNetwork.from_edge_list(self.write('Start,End,Miles\nHub,Corner,2.0\nHub,Bakery\n'))
+        with self.assertRaisesRegex(ValueError, 'Line 2 .* not a number'):
+            RoadNetwork.RoadNetwork.from_edge_list(self.write('Start,End,Miles\nHub,Corner,far\n'))
+        with self.assertRaisesRegex(ValueError, 'Line 2 .* negative'):
+            RoadNetwork.RoadNetwork.from_edge_list(self.write('Start,End,Miles\nHub,Corner,-1\n'))
+
+    def test_cache_is_used_for_the_same_locations(self):
+        keys = ['Hub', 'Library']
+        searched = RoadNetwork.RoadNetwork.load(self.filename, keys)
+        self.assertTrue(os.path.exists(self.filename + '.cache'))
+        cached = RoadNetwork.RoadNetwork.load(self.filename, keys)
+        self.assertIsInstance(cached.distances, memoryview)
+        self.assertEqual(list(cached.row(0)), list(searched.row(0)))
+        # Other locations are not answered from a cache made for different ones.
+        other = RoadNetwork.RoadNetwork.load(self.filename, ['Hub', 'School'])
+        self.assertEqual(other.distance(0, 1), 6.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import array
+import unittest
+import DistanceMatrix
+import Package
+import RouteImprovement
+import SimulationTime
+
+
+class RouteImprovementTest(unittest.TestCase):
+    def setUp(self):
+        # The hub and three stops on a straight road, at miles 0, 10, 1 and 11, driven at a mile a minute.
+        positions = [0, 10, 1, 11]
+        distances = array.array('d', [abs(start - end) for start in positions for end in positions])
+        matrix = DistanceMatrix.DistanceMatrix(['HUB', 'A', 'B', 'C'], distances)
+        self.improver = RouteImprovement.RouteImprover(matrix, 0, 1 / 60)
+        self.packages = []
+        for package_id in range(1, 4):
+            package = Package.Package(package_id, 'Address', 'City', 'UT', '84100', 'EOD', 1, '', 'at hub')
+            package.location_id = package_id
+            self.packages.append(package)
+        # Package 2 is on time at 8:19 and package 3 is 9 minutes late at 8:29. Visiting package 3 first saves 18 miles
+        # and makes package 3 on time, but package 2 would then be a minute late.
+        self.departure = SimulationTime.clock(8)
+        self.deadlines = {2: SimulationTime.clock(8, 20), 3: SimulationTime.clock(8, 20)}
+
+    def test_two_opt_keeps_on_time_packages_on_time(self):
+        packages = list(self.packages)
+        self.improver.two_opt_pass(packages, 1, 3, self.departure, self.deadlines, float('inf'))
+        self.assertEqual([package.id for package in packages], [1, 2, 3])
+
+    def test_or_opt_keeps_on_time_packages_on_time(self):
+        packages = list(self.packages)
+        self.improver.or_opt_pass(packages, 1, 3, self.departure, self.deadlines, float('inf'))
+        self.assertEqual([package.id for package in packages], [1, 2, 3])
+
+    def test_move_is_made_when_no_package_becomes_late(self):
+        packages = list(self.packages)
+        self.improver.two_opt_pass(packages, 1, 3, self.departure, {3: SimulationTime.clock(8, 20)}, float('inf'))
+        self.assertEqual([package.id for package in packages], [1, 3, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import os
+import unittest
+import ScenarioSweep
+import SimulationTime
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class ScenarioSweepTest(unittest.TestCase):
+    def test_infeasible_scenario_is_reported_as_failed(self):
+        scenarios = [ScenarioSweep.Scenario('Normal day'),
+                     ScenarioSweep.Scenario('Early trucks', departure_times=[SimulationTime.parse_clock('8:00'),
+                                                                             SimulationTime.parse_clock('8:00'),
+                                                                             SimulationTime.parse_clock('9:00')])]
+        results = ScenarioSweep.ScenarioSweep(package_filename, distance_filename, max_workers=1).run(scenarios)
+        self.assertEqual([result['scenario'] for result in results], ['Normal day', 'Early trucks'])
+        self.assertNotIn('error', results[0])
+        self.assertEqual(results[0]['late_packages'], 0)
+        self.assertIn('error', results[1])
+        self.assertIn('Early trucks', ScenarioSweep.ScenarioSweep.format_results(results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import datetime
+import os
+import unittest
+import LoadingAndDelivery
+import SimulationTime
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ParseClockTest(unittest.TestCase):
+    def test_times_of_day(self):
+        self.assertEqual(SimulationTime.parse_clock('10:30'), SimulationTime.clock(10, 30))
+        self.assertEqual(SimulationTime.parse_clock(' 9:05:07 '), SimulationTime.clock(9, 5, 7))
+
+    def test_end_of_day(self):
+        self.assertEqual(SimulationTime.parse_clock('24:00'), SimulationTime.clock(24))
+        self.assertEqual(SimulationTime.parse_clock('24:00:00'), SimulationTime.clock(24))
+
+    def test_past_the_end_of_day_is_rejected(self):
+        for text in ('24:30', '24:00:01', '25:00', '12:60', '12:00:60', '12', 'noon', '-1:00'):
+            with self.assertRaises(ValueError):
+                SimulationTime.parse_clock(text)
+
+
+class SimulationTimeTest(unittest.TestCase):
+    def test_format_matches_timedelta(self):
+        for milliseconds in (0, SimulationTime.clock(8), SimulationTime.clock(10, 20, 30.4), SimulationTime.day - 1):
+            self.assertEqual(SimulationTime.format_clock(milliseconds),
+                             str(SimulationTime.to_timedelta(milliseconds)).split('.')[0])
+            self.assertEqual(SimulationTime.from_timedelta(SimulationTime.to_timedelta(milliseconds)), milliseconds)
+        self.assertEqual(SimulationTime.from_timedelta(datetime.timedelta(hours=9, minutes=5)),
+                         SimulationTime.clock(9, 5))
+
+    def test_travel_time_is_rounded_to_a_millisecond(self):
+        # At 18 miles an hour a mile takes 200 seconds.
+        self.assertEqual(SimulationTime.travel_time(1.0, 0.005), SimulationTime.clock(seconds=200))
+        self.assertEqual(SimulationTime.travel_time(0.1, 0.005), SimulationTime.clock(seconds=20))
+        self.assertIsInstance(SimulationTime.travel_time(3.3, 0.005), int)
+
+    def test_delivery_times_are_integer_milliseconds(self):
+        program = LoadingAndDelivery.LoadingAndDelivery(os.path.join(root, 'packages.csv'),
+                                                        os.path.join(root, 'distances.csv'))
+        for package in program.package_hash_table.packages():
+            delivery_time = program.delivery_timeline.delivery_time(package.id)
+            self.assertIsInstance(delivery_time, int)
+            self.assertTrue(program.delivery_timeline.package_status(package.id, delivery_time + 1).endswith(
+                ' delivered at: ' + SimulationTime.format_clock(delivery_time)))
+
+
+if __name__ == '__main__':
+    unittest.main()
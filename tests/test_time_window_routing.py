@@ -0,0 +1,42 @@
+import os
+import unittest
+import DistanceMatrix
+import LoadingAndDelivery
+import Package
+import SimulationTime
+import TimeWindowRouting
+import Truck
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class TimeWindowRoutingTest(unittest.TestCase):
+    def test_truck_waits_for_a_delayed_package(self):
+        distance_matrix = DistanceMatrix.DistanceMatrix.from_csv(distance_filename)
+        router = TimeWindowRouting.TimeWindowRouter(distance_matrix, 0, 0.005)
+        truck = Truck.Truck('Truck One')
+        windows = {}
+        for package_id, location_id in ((1, 5), (2, 9)):
+            package = Package.Package(package_id, 'Address', 'City', 'UT', '84100', '10:30 AM', 1, '', 'at hub')
+            package.location_id = location_id
+            truck.loaded_packages.append(package)
+            windows[package_id] = (SimulationTime.clock(8), package.deadline_time())
+        windows[2] = (SimulationTime.clock(9, 5), windows[2][1])
+        route = router.route(truck, windows)
+        self.assertEqual(truck.planned_departure_time, SimulationTime.clock(9, 5))
+        self.assertEqual(truck.departure_time, SimulationTime.clock(9, 5))
+        self.assertEqual(truck.last_delivery_time, SimulationTime.clock(9, 5) + SimulationTime.travel_time(
+            router.route_miles(route), 0.005))
+
+    def test_default_day_keeps_deadlines(self):
+        program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename, time_window_routing=True)
+        delivered = [package.id for truck in program.trucks for package in truck.loaded_packages]
+        self.assertEqual(sorted(delivered), list(range(1, 41)))
+        self.assertEqual(program.late_packages(), [])
+        self.assertLess(program.total_miles(), 140)
+
+
+if __name__ == '__main__':
+    unittest.main()
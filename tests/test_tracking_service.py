@@ -0,0 +1,73 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+import LoadingAndDelivery
+import TrackingService
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+class TrackingServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.package_filename = os.path.join(self.directory, 'packages.csv')
+        shutil.copy(os.path.join(root, 'packages.csv'), self.package_filename)
+        self.program = LoadingAndDelivery.LoadingAndDelivery(self.package_filename, distance_filename)
+        self.service = TrackingService.TrackingService(self.program, port=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_manifest(self, old, new):
+        with open(self.package_filename) as packages:
+            text = packages.read()
+        with open(self.package_filename, 'w') as packages:
+            packages.write(text.replace(old, new))
+
+    def test_failed_reload_leaves_the_day_as_it_was(self):
+        # Package 2 gets heavier and is built before package 40 fails on an address missing from the distance data.
+        self.write_manifest('84106,EOD,44,', '84106,EOD,45,')
+        self.write_manifest('40,380 W 2880 S', '40,380 W 2880 South')
+        old_package = self.program.package_hash_table.search(2)
+        with self.assertRaises(ValueError):
+            self.service.reload()
+        self.assertIs(self.program.package_hash_table.search(2), old_package)
+        loaded = [package for truck in self.program.trucks for package in truck.loaded_packages]
+        self.assertTrue(all(self.program.package_hash_table.search(package.id) is package for package in loaded))
+        self.assertEqual(self.service.index.version, 1)
+
+        self.write_manifest('40,380 W 2880 South', '40,380 W 2880 S')
+        counts = self.service.reload()
+        self.assertEqual(counts['changed'], 1)
+        self.assertEqual(self.program.package_hash_table.search(2).weight, 45)
+        self.assertEqual(self.service.index.version, 2)
+
+    def test_refresh_of_a_missing_manifest_is_a_bad_request(self):
+        async def refresh():
+            self.service.refresh_lock = asyncio.Lock()
+            return await self.service.respond('POST', '/refresh', {})
+
+        os.remove(self.package_filename)
+        status, answer = asyncio.run(refresh())
+        self.assertEqual(status, 400)
+        self.assertEqual(answer['error'], self.service.last_error)
+
+    def test_malformed_content_length_is_a_bad_request(self):
+        async def send():
+            server = await self.service.start()
+            async with server:
+                reader, writer = await asyncio.open_connection('127.0.0.1', self.service.port)
+                writer.write(b'POST /events HTTP/1.1\r\nContent-Length: many\r\n\r\n')
+                await writer.drain()
+                status_line = await reader.readline()
+                writer.close()
+                return status_line
+
+        self.assertTrue(asyncio.run(send()).startswith(b'HTTP/1.1 400 '))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import Package
+import Truck
+
+
+class TruckTest(unittest.TestCase):
+    def setUp(self):
+        self.truck = Truck.Truck('Truck One', capacity=4)
+        self.truck.loaded_packages = [self.package(package_id) for package_id in range(1, 7)]
+        self.truck.trip_starts = [3]
+
+    @staticmethod
+    def package(package_id):
+        return Package.Package(package_id, 'Address', 'City', 'UT', '84100', 'EOD', 1, '', 'at hub')
+
+    def assert_segments_inside_trips(self):
+        trips = self.truck.trip_bounds()
+        for start, end in self.truck.route_segments:
+            self.assertTrue(any(trip_start <= start and end <= trip_end for trip_start, trip_end in trips))
+
+    def test_stop_at_a_trip_boundary_joins_the_earlier_trip(self):
+        self.truck.route_segments = [(0, 3), (3, 6)]
+        self.truck.insert_stop(3, self.package(7))
+        self.assertEqual(self.truck.trip_bounds(), [(0, 4), (4, 7)])
+        self.assertEqual(self.truck.route_segments, [(0, 4), (4, 7)])
+        self.assert_segments_inside_trips()
+
+    def test_stop_growing_a_later_trip_segment_joins_that_trip(self):
+        # The last stop of the first trip is in no segment, so the stop grows the segment starting the second trip.
+        self.truck.route_segments = [(0, 2), (3, 6)]
+        self.truck.insert_stop(3, self.package(7))
+        self.assertEqual(self.truck.trip_bounds(), [(0, 3), (3, 7)])
+        self.assertEqual(self.truck.route_segments, [(0, 2), (3, 7)])
+        self.assert_segments_inside_trips()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import random
+import unittest
+from unittest import mock
+import DistanceMatrix
+import LoadingAndDelivery
+import VectorizedRouting
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_filename = os.path.join(root, 'packages.csv')
+distance_filename = os.path.join(root, 'distances.csv')
+
+
+@unittest.skipUnless(VectorizedRouting.VectorizedRouting.available(), 'NumPy is not installed')
+class VectorizedRoutingTest(unittest.TestCase):
+    def setUp(self):
+        self.distance_matrix = DistanceMatrix.DistanceMatrix.from_csv(distance_filename)
+        self.routing = VectorizedRouting.VectorizedRouting(self.distance_matrix)
+
+    def test_nearest_neighbor_order_matches_the_loop(self):
+        rng = random.Random(3)
+        for _ in range(20):
+            candidates = rng.sample(range(1, self.distance_matrix.size), 10)
+            remaining = list(range(len(candidates)))
+            current_location = 0
+            expected = []
+            while len(remaining) > 0:
+                closest = min(remaining, key=lambda position: self.distance_matrix.distance(current_location,
+                                                                                            candidates[position]))
+                expected.append(closest)
+                remaining.remove(closest)
+                current_location = candidates[closest]
+            self.assertEqual(self.routing.nearest_neighbor_order(0, candidates), expected)
+
+    def test_route_miles_match_the_loop(self):
+        route = [0, 5, 9, 2, 14, 0]
+        expected = sum(self.distance_matrix.distance(route[i], route[i + 1]) for i in range(len(route) - 1))
+        self.assertAlmostEqual(self.routing.route_miles(route), expected)
+        self.assertEqual(self.routing.route_miles([0]), 0.0)
+
+    def test_default_day_loads_the_same_without_numpy(self):
+        program = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename)
+        with mock.patch.object(VectorizedRouting.VectorizedRouting, 'available', return_value=False):
+            pure_python = LoadingAndDelivery.LoadingAndDelivery(package_filename, distance_filename)
+        self.assertIsNone(pure_python.vectorized_routing)
+        self.assertEqual([[package.id for package in truck.loaded_packages] for truck in program.trucks],
+                         [[package.id for package in truck.loaded_packages] for truck in pure_python.trucks])
+        self.assertAlmostEqual(program.total_miles(), pure_python.total_miles())
+
+
+if __name__ == '__main__':
+    unittest.main()